@@ -0,0 +1,267 @@
+import asyncio
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+from api.database_engine import engine_settings
+from api.serialization import dumps
+
+# 同時実行数の制限（アドミッション制御）と過負荷時の早期拒否
+# リクエストをルートの種類（クラス）に分け、クラスごとの同時実行数の上限と待ち行列を持つ。
+# DB を使うクラスの合計はメインDBのコネクションプールの容量（DB_POOL_SIZE + DB_MAX_OVERFLOW）までとし、
+# プールの接続待ち（POOL_TIMEOUT まで全員が待って一斉にタイムアウトする）の手前で順番待ちさせる。
+# 待ち行列が一杯、または待ち時間の上限を過ぎたリクエストは 503 と Retry-After を返す。
+# 空きが出たときは優先度の高いクラス（安い読み取り）の待ちから先に通す。
+#   ADMISSION_CONTROL                  有効にするか（既定: true）
+#   ADMISSION_CAPACITY                 DB を使うクラスの同時実行数の合計（既定: DB_POOL_SIZE + DB_MAX_OVERFLOW）
+#   ADMISSION_RETRY_AFTER              503 の Retry-After・秒（既定: 1）
+#   ADMISSION_{クラス}_LIMIT            クラスの同時実行数の上限（クラスは READ / WRITE / SEARCH / SAS / BULK）
+#   ADMISSION_{クラス}_QUEUE            クラスの待ち行列の長さ（0 で待たずに拒否）
+#   ADMISSION_{クラス}_TIMEOUT_MS       待ち時間の上限・ミリ秒
+# 既定値は ROUTE_CLASS_DEFAULTS を参照（上限・待ち行列は容量に対する割合で決める）。
+
+
+@dataclass
+class RouteClass:
+    """
+    ルートの種類ごとの制限。priority が小さいほど、空きが出たときに先に通す。
+    uses_db が False のクラス（SAS 署名など）は、DB の容量の合計に数えない。
+    """
+    name: str
+    limit: int
+    queue: int
+    timeout: float
+    priority: int
+    uses_db: bool = True
+    active: int = 0
+    waiters: deque = field(default_factory=deque)
+    admitted: int = 0
+    rejected: int = 0
+    timed_out: int = 0
+    wait_seconds_max: float = 0.0
+
+
+class Overloaded(Exception):
+    """
+    待ち行列が一杯、または待ち時間の上限を過ぎたため、リクエストを受け付けられない。
+    """
+
+    def __init__(self, route_class: str, reason: str):
+        super().__init__(f"{route_class}: {reason}")
+        self.route_class = route_class
+        self.reason = reason
+
+
+class AdmissionController:
+    """
+    クラスごとの同時実行数と、DB を使うクラスの合計（capacity）を管理する。
+    待っているリクエストは、空きが出るたびに優先度の高いクラスから順に通す。
+    すべてイベントループ上で呼ぶ前提のため、状態の更新にロックは使わない。
+    枠の受け渡しは release() の中で同期的に行うため、後から来たリクエストが待っているリクエストを追い越すことはない。
+    """
+
+    def __init__(self, capacity: int, classes: list[RouteClass]):
+        self.capacity = capacity
+        self.classes = {route_class.name: route_class for route_class in classes}
+        self._by_priority = sorted(classes, key=lambda route_class: route_class.priority)
+        self.active_db = 0
+
+    def _can_run(self, route_class: RouteClass) -> bool:
+        if route_class.active >= route_class.limit:
+            return False
+        return not route_class.uses_db or self.active_db < self.capacity
+
+    def _start(self, route_class: RouteClass):
+        route_class.active += 1
+        route_class.admitted += 1
+        if route_class.uses_db:
+            self.active_db += 1
+
+    async def acquire(self, name: str):
+        """
+        クラス name の枠を1つ確保する。確保できなければ Overloaded を送出する。
+        """
+        route_class = self.classes[name]
+        if self._can_run(route_class):
+            self._start(route_class)
+            return
+        if len(route_class.waiters) >= route_class.queue:
+            route_class.rejected += 1
+            raise Overloaded(name, "queue full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        route_class.waiters.append(waiter)
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), route_class.timeout)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # 期限と同時に枠を渡されていた場合はそのまま通す
+                return
+            waiter.cancel()
+            route_class.timed_out += 1
+            raise Overloaded(name, "wait timeout") from None
+        except BaseException:
+            # 待っている間にクライアントが切断した場合など。渡されていた枠は返す
+            if waiter.done() and not waiter.cancelled():
+                self.release(name)
+            else:
+                waiter.cancel()
+            raise
+        finally:
+            if waiter in route_class.waiters:
+                route_class.waiters.remove(waiter)
+            route_class.wait_seconds_max = max(route_class.wait_seconds_max, time.perf_counter() - started)
+
+    def release(self, name: str):
+        route_class = self.classes[name]
+        route_class.active -= 1
+        if route_class.uses_db:
+            self.active_db -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        """
+        空いた枠を、優先度の高いクラスの待ちから順に渡す。
+        """
+        for route_class in self._by_priority:
+            while route_class.waiters and self._can_run(route_class):
+                waiter = route_class.waiters.popleft()
+                if waiter.done():
+                    continue
+                self._start(route_class)
+                waiter.set_result(None)
+
+    def metrics(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "active_db": self.active_db,
+            "classes": {
+                route_class.name: {
+                    "limit": route_class.limit,
+                    "queue": route_class.queue,
+                    "timeout_ms": round(route_class.timeout * 1000),
+                    "uses_db": route_class.uses_db,
+                    "active": route_class.active,
+                    "waiting": len(route_class.waiters),
+                    "admitted": route_class.admitted,
+                    "rejected": route_class.rejected,
+                    "timed_out": route_class.timed_out,
+                    "wait_seconds_max": route_class.wait_seconds_max,
+                }
+                for route_class in self._by_priority
+            },
+        }
+
+
+# クラスごとの既定値: (上限の容量に対する割合, 待ち行列の容量に対する割合, 待ち時間の上限・ミリ秒, 優先度, DB を使うか)
+# - read:   一覧・詳細などの読み取り。キャッシュに当たれば DB を使わず、最も安いので最優先
+# - write:  作成・更新・削除
+# - search: 人物検索・メンバー検索（1件あたりの負荷が読み取りより重い）
+# - sas:    SAS の発行とブロック分割アップロード（DB は使わず、署名と Blob サービスへの問い合わせだけ。容量の合計には数えない）
+# - bulk:   一括の書き出し・取り込み（接続を長く持つため数を絞り、最後に通す）
+ROUTE_CLASS_DEFAULTS = {
+    "read": (1.0, 8.0, 2000, 0, True),
+    "write": (0.6, 4.0, 5000, 1, True),
+    "search": (0.4, 2.0, 2000, 2, True),
+    "sas": (2.0, 8.0, 1000, 1, False),
+    "bulk": (0.15, 0.3, 1000, 3, True),
+}
+
+# 制限の対象外（監視・ドキュメント）
+EXEMPT_PREFIXES = ("/metrics", "/system/", "/docs", "/redoc", "/openapi.json")
+SEARCH_PATHS = ("/search", "/project-management/members/search")
+SAS_PATHS = ("/generate-sas-token", "/uploads")
+BULK_PATHS = ("/profiles/export", "/profiles/import")
+READ_METHODS = ("GET", "HEAD")
+
+
+def classify(method: str, path: str) -> str | None:
+    """
+    メソッドとパスから、リクエストのクラスを返す。制限の対象外なら None。
+    （ルーティングの前に判定するため、ルートのテンプレートではなくパスの前方一致で決める）
+    """
+    if method == "OPTIONS" or path.startswith(EXEMPT_PREFIXES):
+        return None
+    if path.startswith(BULK_PATHS):
+        return "bulk"
+    if path.startswith(SAS_PATHS):
+        return "sas"
+    if path.startswith(SEARCH_PATHS):
+        return "search"
+    return "read" if method in READ_METHODS else "write"
+
+
+def admission_controller_from_env() -> AdmissionController:
+    """
+    環境変数とメインDBのプール設定から AdmissionController を作る。
+    """
+    pool = engine_settings("DB_")
+    capacity = int(os.getenv("ADMISSION_CAPACITY", str(pool["pool_size"] + pool["max_overflow"])))
+    classes = []
+    for name, (limit_ratio, queue_ratio, timeout_ms, priority, uses_db) in ROUTE_CLASS_DEFAULTS.items():
+        prefix = f"ADMISSION_{name.upper()}_"
+        classes.append(RouteClass(
+            name=name,
+            limit=max(1, int(os.getenv(f"{prefix}LIMIT", str(round(capacity * limit_ratio))))),
+            queue=max(0, int(os.getenv(f"{prefix}QUEUE", str(round(capacity * queue_ratio))))),
+            timeout=int(os.getenv(f"{prefix}TIMEOUT_MS", str(timeout_ms))) / 1000,
+            priority=priority,
+            uses_db=uses_db,
+        ))
+    return AdmissionController(capacity, classes)
+
+
+class AdmissionMiddleware:
+    """
+    リクエストをクラスに分け、AdmissionController の枠を確保してから処理する ASGI ミドルウェア。
+    枠はレスポンス本文の送信が終わるまで持つ（ストリーミングの書き出しは接続を持ち続けるため）。
+    確保できなければ、処理を始めずに 503 と Retry-After を返す。
+    """
+
+    def __init__(self, app, controller: AdmissionController, enabled: bool = True, retry_after: int = 1):
+        self.app = app
+        self.controller = controller
+        self.enabled = enabled
+        self.retry_after = retry_after
+
+    async def __call__(self, scope, receive, send):
+        name = classify(scope.get("method", ""), scope.get("path", "")) if scope["type"] == "http" else None
+        if not self.enabled or name is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.controller.acquire(name)
+        except Overloaded as e:
+            body = dumps({"detail": "Server is busy, please retry", "reason": e.reason})
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(self.retry_after).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(name)
+
+
+admission_controller = admission_controller_from_env()
+
+
+def admission_settings_from_env() -> dict:
+    """
+    環境変数から AdmissionMiddleware の設定を作る。
+    """
+    return {
+        "controller": admission_controller,
+        "enabled": os.getenv("ADMISSION_CONTROL", "true").lower() in ("1", "true", "yes", "on"),
+        "retry_after": int(os.getenv("ADMISSION_RETRY_AFTER", "1")),
+    }
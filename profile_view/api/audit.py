@@ -0,0 +1,214 @@
+import asyncio
+import logging
+import os
+import time
+from contextvars import ContextVar
+from typing import Awaitable, Callable
+
+from api.models import utcnow
+
+logger = logging.getLogger(__name__)
+
+# 操作ログ（operation_logs）の非同期・一括書き込み
+# CRUD の書き込みリスナーとしてイベントを受け取り、プロセス内のキューに積む。
+# ワーカーが件数（AUDIT_BATCH_SIZE）または時間（AUDIT_FLUSH_SECONDS）で区切って、
+# 複数行の INSERT 1回でまとめて書き込む。ユーザーの書き込みリクエストはキューに積むだけで返る。
+#   AUDIT_QUEUE_SIZE        キューの上限（既定: 10000）
+#   AUDIT_BATCH_SIZE        1回の INSERT の最大行数（既定: 200）
+#   AUDIT_FLUSH_SECONDS     最初のイベントから書き込むまでの最大待ち時間・秒（既定: 1）
+#   AUDIT_PUT_TIMEOUT       キューが満杯のとき、空きを待つ最大時間・秒（既定: 0.5）
+
+# 操作したユーザー（リクエストの X-Operation-User ヘッダーからミドルウェアで設定する）
+current_operation_user: ContextVar[str | None] = ContextVar("current_operation_user", default=None)
+
+# 監査の対象外にするテーブル（操作ログ自身）
+AUDIT_EXCLUDED_TABLES = {"operation_logs"}
+
+# SQL Server の1文あたりのパラメータ上限（2100）に収まるよう、1回の INSERT の行数を抑える
+_MAX_PARAMETERS = 2000
+_EVENT_COLUMNS = 6
+
+# 停止時にキューへ積む目印（これより前のイベントを書き込んだらワーカーを終える）
+_STOP = object()
+
+
+class AuditLogWriter:
+    """
+    操作ログのイベントを溜めて、まとめて書き込むライター。
+    書き込み処理そのもの（複数行 INSERT + コミット）は write_batch に委譲する。
+
+    - record(): イベントをキューに積む（満杯なら put_timeout まで待ち、それでも空かなければ破棄）
+    - start() / stop(): ワーカーの起動・停止（停止時は残りを書き込んでから止める）
+    - metrics(): 滞留数・書き込み件数・破棄件数などの統計
+    """
+
+    def __init__(
+        self,
+        write_batch: Callable[[list[dict]], Awaitable[None]],
+        batch_size: int = 200,
+        flush_seconds: float = 1.0,
+        queue_size: int = 10000,
+        put_timeout: float = 0.5,
+    ):
+        self.write_batch = write_batch
+        self.batch_size = max(1, min(batch_size, _MAX_PARAMETERS // _EVENT_COLUMNS))
+        self.flush_seconds = flush_seconds
+        self.queue_size = queue_size
+        self.put_timeout = put_timeout
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+
+        self.written = 0
+        self.failed = 0
+        self.dropped = 0
+        self.batches = 0
+        self.waited = 0
+        self.last_flush_ms = 0.0
+
+    def _ensure_queue(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+        return self._queue
+
+    async def record(self, event: dict) -> bool:
+        """
+        イベントをキューに積む。キューが満杯の場合は put_timeout 秒まで空きを待ち（バックプレッシャー）、
+        それでも空かなければ破棄して False を返す（操作ログのためにユーザーの書き込みは失敗させない）。
+        """
+        queue = self._ensure_queue()
+        try:
+            queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            self.waited += 1
+        try:
+            await asyncio.wait_for(queue.put(event), timeout=self.put_timeout)
+            return True
+        except asyncio.TimeoutError:
+            self.dropped += 1
+            logger.warning("操作ログのキューが満杯のため破棄しました: %s", event)
+            return False
+
+    async def _next_batch(self, queue: asyncio.Queue) -> tuple[list[dict], bool]:
+        """
+        最初のイベントを待ち、そこから batch_size 件たまるか flush_seconds 秒たつまで集める。
+        停止の目印を受け取った場合は、待たずにそこまでの分を返す。
+        (イベントのリスト, 停止するか) を返す。
+        """
+        first = await queue.get()
+        if first is _STOP:
+            return [], True
+        batch = [first]
+        deadline = time.monotonic() + self.flush_seconds
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=timeout)
+            except asyncio.TimeoutError:
+                break
+            if event is _STOP:
+                return batch, True
+            batch.append(event)
+        return batch, False
+
+    async def flush(self, batch: list[dict]):
+        started = time.perf_counter()
+        try:
+            await self.write_batch(batch)
+            self.written += len(batch)
+            self.batches += 1
+        except Exception as e:
+            self.failed += len(batch)
+            logger.error("操作ログの書き込みに失敗しました (%d 件): %s", len(batch), e)
+        finally:
+            self.last_flush_ms = (time.perf_counter() - started) * 1000
+
+    async def _run(self):
+        queue = self._ensure_queue()
+        stopping = False
+        while not stopping:
+            batch, stopping = await self._next_batch(queue)
+            try:
+                if batch:
+                    await self.flush(batch)
+            finally:
+                for _ in range(len(batch) + stopping):
+                    queue.task_done()
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self, drain: bool = True):
+        """
+        ワーカーを停止する。drain=True の場合は、キューに残ったイベントを書き込んでから止める。
+        """
+        if self._task is None:
+            return
+        if drain:
+            await self._ensure_queue().put(_STOP)
+        else:
+            self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    def metrics(self) -> dict:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "batch_size": self.batch_size,
+            "flush_seconds": self.flush_seconds,
+            "written": self.written,
+            "batches": self.batches,
+            "failed": self.failed,
+            "waited": self.waited,
+            "dropped": self.dropped,
+            "last_flush_ms": round(self.last_flush_ms, 3),
+        }
+
+
+def operation_event(table: str, operation: str, row) -> dict:
+    """
+    書き込みリスナーの引数から、operation_logs の1行分の値を作る。
+    """
+    return {
+        "employee_id": row.employee_id,
+        "target_table": table,
+        "target_id": row.id,
+        "operation_type": operation,
+        "operation_user": current_operation_user.get(),
+        # 変更フィード（updated_at / deleted_at）と突き合わせられるよう UTC で記録する
+        "operation_datetime": utcnow(),
+    }
+
+
+async def write_operation_logs(rows: list[dict]):
+    """
+    既定の書き込み処理。operation_logs に複数行 INSERT 1回で書き込み、一覧のキャッシュを無効化する。
+    """
+    from api.database import AsyncSessionLocal
+    from api.crud.operation_logs import bulk_create_operation_logs
+    from api.response_cache import response_cache
+
+    async with AsyncSessionLocal() as db:
+        await bulk_create_operation_logs(db, rows)
+    await response_cache.invalidate("operation_logs")
+
+
+audit_log_writer = AuditLogWriter(
+    write_operation_logs,
+    batch_size=int(os.getenv("AUDIT_BATCH_SIZE", "200")),
+    flush_seconds=float(os.getenv("AUDIT_FLUSH_SECONDS", "1")),
+    queue_size=int(os.getenv("AUDIT_QUEUE_SIZE", "10000")),
+    put_timeout=float(os.getenv("AUDIT_PUT_TIMEOUT", "0.5")),
+)
+
+
+async def record_write(table: str, operation: str, row):
+    """
+    CRUD の書き込みリスナー。操作ログ以外のテーブルへの書き込みを操作ログのキューに積む。
+    """
+    if table in AUDIT_EXCLUDED_TABLES or getattr(row, "employee_id", None) is None:
+        return
+    await audit_log_writer.record(operation_event(table, operation, row))
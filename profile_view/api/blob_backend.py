@@ -0,0 +1,210 @@
+import asyncio
+import json
+import os
+from pathlib import Path
+
+# Blob ストレージへの読み書きをまとめたバックエンド
+# 環境変数 BLOB_BACKEND で切り替える。
+#   azure（既定）   AZURE_STORAGE_CONNECTION_STRING のストレージ（Azurite などのエミュレータも可）
+#   filesystem     BLOB_FILESYSTEM_ROOT 以下のローカルディレクトリ（ローカル開発・テスト用）
+# ブロック単位のアップロード（api.uploads）のため、ブロックの一覧の取得と確定（Put Block List）も扱う。
+# ブロック ID は SDK と同じく base64 にする前の文字列で扱う。
+
+
+class AzureBlobBackend:
+    """
+    Azure Blob Storage のコンテナを読み書きするバックエンド。
+    SDK は同期 API のため、呼び出しはスレッドで実行してイベントループを塞がない。
+    """
+
+    def __init__(self, connection_string: str, container_name: str):
+        from azure.storage.blob import BlobServiceClient
+
+        self.container = BlobServiceClient.from_connection_string(connection_string).get_container_client(
+            container_name
+        )
+
+    async def download(self, name: str) -> bytes:
+        return await asyncio.to_thread(lambda: self.container.download_blob(name).readall())
+
+    async def upload(self, name: str, data: bytes, content_type: str | None = None):
+        from azure.storage.blob import ContentSettings
+
+        await asyncio.to_thread(
+            self.container.upload_blob,
+            name,
+            data,
+            overwrite=True,
+            content_settings=ContentSettings(content_type=content_type) if content_type else None,
+        )
+
+    async def exists(self, name: str) -> bool:
+        return await asyncio.to_thread(self.container.get_blob_client(name).exists)
+
+    async def list_names(self, prefix: str = "") -> list[str]:
+        return await asyncio.to_thread(
+            lambda: [blob.name for blob in self.container.list_blobs(name_starts_with=prefix)]
+        )
+
+    async def stage_block(self, name: str, block_id: str, data: bytes):
+        await asyncio.to_thread(self.container.get_blob_client(name).stage_block, block_id, data)
+
+    async def block_list(self, name: str) -> tuple[dict[str, int], dict[str, int]]:
+        """
+        Blob の (確定済みのブロック, 未確定のブロック) を {ブロック ID: バイト数} で返す。ブロックが無ければ空。
+        """
+        from azure.core.exceptions import ResourceNotFoundError
+
+        def read():
+            try:
+                committed, uncommitted = self.container.get_blob_client(name).get_block_list("all")
+            except ResourceNotFoundError:
+                return {}, {}
+            return (
+                {block.id: block.size for block in committed},
+                {block.id: block.size for block in uncommitted},
+            )
+
+        return await asyncio.to_thread(read)
+
+    async def commit_blocks(self, name: str, block_ids: list[str], content_type: str | None = None):
+        """
+        ブロックを block_ids の順につなげて Blob を確定する（同じ ID は未確定のブロックを優先する）。
+        """
+        from azure.storage.blob import BlobBlock, ContentSettings
+
+        await asyncio.to_thread(
+            self.container.get_blob_client(name).commit_block_list,
+            [BlobBlock(block_id=block_id) for block_id in block_ids],
+            content_settings=ContentSettings(content_type=content_type) if content_type else None,
+        )
+
+
+class FileSystemBlobBackend:
+    """
+    ローカルディレクトリを Blob コンテナに見立てるバックエンド（開発・テスト用）。
+    未確定のブロックと確定済みのブロックの一覧は、BLOCKS_DIR 以下に Blob ごとに保存する。
+    """
+
+    BLOCKS_DIR = ".blocks"
+
+    def __init__(self, root: str):
+        self.root = Path(root).resolve()
+
+    def path(self, name: str) -> Path:
+        path = (self.root / name).resolve()
+        if self.root not in path.parents:
+            raise ValueError(f"Invalid blob name: {name}")
+        return path
+
+    async def download(self, name: str) -> bytes:
+        return await asyncio.to_thread(self.path(name).read_bytes)
+
+    async def upload(self, name: str, data: bytes, content_type: str | None = None):
+        path = self.path(name)
+
+        def write():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+
+        await asyncio.to_thread(write)
+
+    async def exists(self, name: str) -> bool:
+        return self.path(name).is_file()
+
+    async def list_names(self, prefix: str = "") -> list[str]:
+        def scan():
+            if not self.root.exists():
+                return []
+            names = (path.relative_to(self.root).as_posix() for path in self.root.rglob("*") if path.is_file())
+            return sorted(
+                name for name in names if name.startswith(prefix) and not name.startswith(self.BLOCKS_DIR + "/")
+            )
+
+        return await asyncio.to_thread(scan)
+
+    def _blocks_path(self, name: str) -> Path:
+        self.path(name)
+        return self.path(f"{self.BLOCKS_DIR}/{name}")
+
+    async def stage_block(self, name: str, block_id: str, data: bytes):
+        path = self._blocks_path(name) / "uncommitted" / block_id.encode("utf-8").hex()
+
+        def write():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+
+        await asyncio.to_thread(write)
+
+    async def block_list(self, name: str) -> tuple[dict[str, int], dict[str, int]]:
+        blocks = self._blocks_path(name)
+
+        def read():
+            committed_path = blocks / "committed.json"
+            committed = dict(json.loads(committed_path.read_text())) if committed_path.is_file() else {}
+            staging = blocks / "uncommitted"
+            uncommitted = {
+                bytes.fromhex(path.name).decode("utf-8"): path.stat().st_size
+                for path in (staging.iterdir() if staging.is_dir() else ())
+            }
+            return committed, uncommitted
+
+        return await asyncio.to_thread(read)
+
+    async def commit_blocks(self, name: str, block_ids: list[str], content_type: str | None = None):
+        path = self.path(name)
+        blocks = self._blocks_path(name)
+
+        def commit():
+            # 確定済みのブロックは、現在のファイルの中の位置から読む
+            committed_path = blocks / "committed.json"
+            committed, offset = {}, 0
+            for block_id, size in json.loads(committed_path.read_text()) if committed_path.is_file() else ():
+                committed[block_id] = (offset, size)
+                offset += size
+            current = path.read_bytes() if committed else b""
+            staging = blocks / "uncommitted"
+            parts = []
+            for block_id in block_ids:
+                staged = staging / block_id.encode("utf-8").hex()
+                if staged.is_file():
+                    parts.append(staged.read_bytes())
+                elif block_id in committed:
+                    start, size = committed[block_id]
+                    parts.append(current[start:start + size])
+                else:
+                    raise ValueError(f"Unknown block: {block_id}")
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(b"".join(parts))
+            committed_path.parent.mkdir(parents=True, exist_ok=True)
+            committed_path.write_text(json.dumps([[block_id, len(part)] for block_id, part in zip(block_ids, parts)]))
+            # Blob サービスと同じく、確定しなかった未確定のブロックは破棄する
+            for staged in staging.iterdir() if staging.is_dir() else ():
+                staged.unlink()
+
+        await asyncio.to_thread(commit)
+
+
+def create_blob_backend_from_env():
+    """
+    環境変数の設定から Blob バックエンドを作成する。
+    """
+    if os.getenv("BLOB_BACKEND", "azure").lower() == "filesystem":
+        return FileSystemBlobBackend(os.getenv("BLOB_FILESYSTEM_ROOT", "./blob-data"))
+
+    from api.config import settings
+
+    return AzureBlobBackend(settings.AZURE_STORAGE_CONNECTION_STRING, settings.AZURE_STORAGE_CONTAINER_NAME)
+
+
+_blob_backend = None
+
+
+def get_blob_backend():
+    """
+    Blob バックエンドを初回利用時に作成して返す。
+    """
+    global _blob_backend
+    if _blob_backend is None:
+        _blob_backend = create_blob_backend_from_env()
+    return _blob_backend
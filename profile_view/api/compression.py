@@ -0,0 +1,264 @@
+import gzip
+import os
+import threading
+import zlib
+from collections import OrderedDict
+
+from api.offload import run_blocking
+
+# レスポンス本文の圧縮（Accept-Encoding に応じて br / gzip）
+# 一覧の JSON は同じ文字列の繰り返しが多く、数分の1になる。
+#   RESPONSE_COMPRESSION              使う方式を優先順にカンマ区切りで（既定: br,gzip。none で無効）
+#                                     br は brotli パッケージがある場合のみ使う
+#   RESPONSE_COMPRESSION_MIN_BYTES    これより小さい本文は圧縮しない（既定: 1024）
+#   RESPONSE_COMPRESSION_GZIP_LEVEL   gzip の圧縮レベル（既定: 5）
+#   RESPONSE_COMPRESSION_BR_QUALITY   brotli の品質（既定: 4）
+#   RESPONSE_COMPRESSION_CACHE_BYTES  ETag 付きの本文の圧縮結果をプロセス内に保持する上限バイト数（既定: 32MB）
+#   RESPONSE_COMPRESSION_OFFLOAD_BYTES  これより大きい本文はスレッドプールで圧縮する（既定: 262144）
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli が無い環境では gzip だけを使う
+    brotli = None
+
+# 圧縮しても小さくならない形式（画像・動画・圧縮済みのファイル）
+INCOMPRESSIBLE_TYPES = ("image/", "video/", "audio/", "application/zip", "application/gzip", "application/octet-stream")
+
+
+def parse_accept_encoding(header: str) -> dict[str, float]:
+    """
+    Accept-Encoding を {方式: q 値} にする。
+    """
+    accepted = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[name] = q
+    return accepted
+
+
+def choose_encoding(header: str | None, available) -> str | None:
+    """
+    Accept-Encoding と使える方式（優先順）から、使う方式を選ぶ。どれも受け付けられなければ None。
+    """
+    if not header:
+        return None
+    accepted = parse_accept_encoding(header)
+    candidates = [
+        (accepted.get(name, accepted.get("*", 0.0)), -index, name)
+        for index, name in enumerate(available)
+    ]
+    candidates = [candidate for candidate in candidates if candidate[0] > 0]
+    return max(candidates)[2] if candidates else None
+
+
+class Compressor:
+    """
+    本文を圧縮する。ストリーミングの場合は chunk ごとに flush して、受け取った分をすぐ送れるようにする。
+    """
+
+    def __init__(self, encoding: str, gzip_level: int = 5, br_quality: int = 4):
+        self.encoding = encoding
+        self.gzip_level = gzip_level
+        self.br_quality = br_quality
+
+    def compress(self, body: bytes) -> bytes:
+        if self.encoding == "br":
+            return brotli.compress(body, quality=self.br_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    def stream(self):
+        if self.encoding == "br":
+            compressor = brotli.Compressor(quality=self.br_quality)
+            return lambda chunk: compressor.process(chunk) + compressor.flush(), compressor.finish
+        compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        return lambda chunk: compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+
+
+class CompressedBodyCache:
+    """
+    ETag ごとの圧縮結果の LRU（合計バイト数で上限を決める）。
+    キャッシュから返す同じ本文を、リクエストのたびに圧縮し直さないために使う。
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._data: OrderedDict[tuple[str, str], bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, etag: str, encoding: str) -> bytes | None:
+        with self._lock:
+            body = self._data.get((etag, encoding))
+            if body is not None:
+                self._data.move_to_end((etag, encoding))
+            return body
+
+    def set(self, etag: str, encoding: str, body: bytes):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._data.pop((etag, encoding), None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._data[(etag, encoding)] = body
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self.size -= len(evicted)
+
+
+class CompressionMiddleware:
+    """
+    Accept-Encoding に応じてレスポンス本文を圧縮する ASGI ミドルウェア。
+    - 1回で送られる本文は、min_bytes 以上なら全体を圧縮する（大きい本文はスレッドプールで）。
+      ETag があれば圧縮結果を保持し、同じ本文は圧縮し直さない
+    - ストリーミングの本文は、chunk ごとに圧縮して flush しながら送る
+    圧縮した場合は ETag を弱い ETag（W/）にする（If-None-Match の判定は弱い ETag も一致とみなす）。
+    """
+
+    def __init__(
+        self,
+        app,
+        encodings=("br", "gzip"),
+        min_bytes: int = 1024,
+        gzip_level: int = 5,
+        br_quality: int = 4,
+        cache_bytes: int = 32 * 1024 * 1024,
+        offload_bytes: int = 256 * 1024,
+    ):
+        self.app = app
+        self.encodings = [name for name in encodings if name == "gzip" or (name == "br" and brotli is not None)]
+        self.min_bytes = min_bytes
+        self.gzip_level = gzip_level
+        self.br_quality = br_quality
+        self.offload_bytes = offload_bytes
+        self.cache = CompressedBodyCache(cache_bytes)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.encodings:
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = None
+        for key, value in scope.get("headers", []):
+            if key == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+        encoding = choose_encoding(accept_encoding, self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        compressor = Compressor(encoding, self.gzip_level, self.br_quality)
+        start = None
+        stream = None
+
+        async def send_wrapper(message):
+            nonlocal start, stream
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                headers = start.get("headers", [])
+                start_message, start = start, None
+                if not self._should_compress(start_message, headers, body, more_body):
+                    await send(start_message)
+                    await send(message)
+                    return
+                if not more_body:
+                    compressed = await self._compress_body(compressor, headers, body)
+                    await send(self._compressed_start(start_message, encoding, len(compressed)))
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+                stream = compressor.stream()
+                await send(self._compressed_start(start_message, encoding, None))
+            if stream is None:
+                await send(message)
+                return
+            compress_chunk, finish = stream
+            chunk = compress_chunk(body) if body else b""
+            if not more_body:
+                chunk += finish()
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _should_compress(self, start_message, headers, body: bytes, more_body: bool) -> bool:
+        if start_message["status"] < 200 or start_message["status"] in (204, 304):
+            return False
+        content_type = b""
+        for key, value in headers:
+            if key == b"content-encoding":
+                return False
+            if key == b"content-type":
+                content_type = value
+        if content_type.decode("latin-1").startswith(INCOMPRESSIBLE_TYPES):
+            return False
+        return more_body or len(body) >= self.min_bytes
+
+    async def _compress_body(self, compressor: Compressor, headers, body: bytes) -> bytes:
+        etag = next((value.decode("latin-1") for key, value in headers if key == b"etag"), None)
+        if etag is not None:
+            cached = self.cache.get(etag, compressor.encoding)
+            if cached is not None:
+                return cached
+        if len(body) >= self.offload_bytes:
+            compressed = await run_blocking(compressor.compress, body)
+        else:
+            compressed = compressor.compress(body)
+        if etag is not None:
+            self.cache.set(etag, compressor.encoding, compressed)
+        return compressed
+
+    @staticmethod
+    def _compressed_start(start_message, encoding: str, length: int | None):
+        headers = []
+        vary = None
+        for key, value in start_message.get("headers", []):
+            if key == b"content-length":
+                continue
+            if key == b"etag" and not value.startswith(b"W/"):
+                value = b"W/" + value
+            if key == b"vary":
+                vary = value
+                continue
+            headers.append((key, value))
+        headers.append((b"content-encoding", encoding.encode()))
+        headers.append((b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"))
+        if length is not None:
+            headers.append((b"content-length", str(length).encode()))
+        return {**start_message, "headers": headers}
+
+
+def compression_settings_from_env() -> dict:
+    """
+    環境変数から CompressionMiddleware の設定を作る。
+    """
+    encodings = [
+        name.strip().lower()
+        for name in os.getenv("RESPONSE_COMPRESSION", "br,gzip").split(",")
+        if name.strip() and name.strip().lower() != "none"
+    ]
+    return {
+        "encodings": encodings,
+        "min_bytes": int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024")),
+        "gzip_level": int(os.getenv("RESPONSE_COMPRESSION_GZIP_LEVEL", "5")),
+        "br_quality": int(os.getenv("RESPONSE_COMPRESSION_BR_QUALITY", "4")),
+        "cache_bytes": int(os.getenv("RESPONSE_COMPRESSION_CACHE_BYTES", str(32 * 1024 * 1024))),
+        "offload_bytes": int(os.getenv("RESPONSE_COMPRESSION_OFFLOAD_BYTES", str(256 * 1024))),
+    }
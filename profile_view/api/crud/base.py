@@ -1,6 +1,42 @@
+import inspect
+import logging
+from types import SimpleNamespace
+
+from sqlalchemy import update as sql_update, delete as sql_delete
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
+from api.crud.changes import record_deletions
+
+logger = logging.getLogger(__name__)
+
+# 書き込みのコミット後に呼ばれるリスナー（検索インデックスの差分更新、操作ログなど）
+# listener(テーブル名, 操作, 行) の形で呼ぶ（async 関数も可）。操作は "create" / "update" / "delete"。
+# delete の行は id と employee_id だけを持つ。
+write_listeners = []
+
+
+def add_write_listener(listener):
+    """
+    書き込みリスナーを登録する。
+    """
+    if listener not in write_listeners:
+        write_listeners.append(listener)
+
+
+async def notify_write(table: str, operation: str, row):
+    """
+    登録済みのリスナーに書き込みを通知する。
+    リスナーの失敗で書き込み自体を失敗させないよう、例外はログに残して握りつぶす。
+    """
+    for listener in write_listeners:
+        try:
+            result = listener(table, operation, row)
+            if inspect.isawaitable(result):
+                await result
+        except Exception:
+            logger.exception("書き込みリスナーの呼び出しに失敗しました (%s %s)", operation, table)
+
 
 class CRUDBase:
     """
@@ -21,13 +57,73 @@ class CRUDBase:
         )
         return result.scalars().first()
 
-    async def get_all(self, db: AsyncSession):
+    def columns(self, fields=None):
         """
-        全件のデータを取得。
+        fields で指定された列名を、モデルの Column のリストに変換する。
+        キーセットページングに必要な id（と employee_id）は常に含める。
+        存在しない列名が指定された場合は ValueError を送出する。
         """
-        result = await db.execute(select(self.model))
+        if not fields:
+            return []
+        table_columns = self.model.__table__.columns
+        unknown = [name for name in fields if name not in table_columns]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        names = ["id"]
+        if "employee_id" in table_columns:
+            names.append("employee_id")
+        names += [name for name in fields if name not in names]
+        return [getattr(self.model, name) for name in names]
+
+    def build_list_query(self, after_id=None, limit=None, fields=None, filters=None):
+        """
+        get_all 用の SELECT 文を組み立てる。
+        - after_id / limit: id 昇順のキーセットページング
+        - fields: SELECT する列（SQL 側で絞り込む）
+        - filters: {列名: 値} の等価条件。文字列が '*' で終わる場合は前方一致
+        """
+        columns = self.columns(fields)
+        query = select(*columns) if columns else select(self.model)
+
+        for key, value in (filters or {}).items():
+            column = getattr(self.model, key)
+            if isinstance(value, str) and value.endswith("*"):
+                query = query.where(column.startswith(value[:-1], autoescape=True))
+            else:
+                query = query.where(column == value)
+
+        if after_id is not None:
+            query = query.where(self.model.id > after_id)
+        query = query.order_by(self.model.id)
+        if limit is not None:
+            query = query.limit(limit)
+        return query
+
+    async def get_all(self, db: AsyncSession, after_id=None, limit=None, fields=None, filters=None):
+        """
+        全件のデータを取得（条件指定なしの場合）。
+        fields を指定した場合は指定列のみを SELECT し、属性アクセスできる軽量オブジェクトで返す。
+        """
+        query = self.build_list_query(after_id, limit, fields, filters)
+        result = await db.execute(query)
+        if fields:
+            return [SimpleNamespace(**row) for row in result.mappings().all()]
         return result.scalars().all()
 
+    async def stream_all(
+        self, db: AsyncSession, after_id=None, limit=None, fields=None, filters=None, chunk_size: int = 500
+    ):
+        """
+        get_all と同じ条件で、結果をサーバーサイドカーソルから chunk_size 件ずつ
+        リストで順に返す非同期ジェネレータ。全件をメモリに載せずに処理できる。
+        fields を指定しない場合も列を SELECT し、セッションに属さない軽量オブジェクトで返す
+        （SAS署名などで属性を書き換えても ORM の変更として追跡されず、読み終えた行はすぐ解放される）。
+        """
+        query = self.build_list_query(after_id, limit, fields or self.model.__table__.columns.keys(), filters)
+        result = await db.stream(query.execution_options(yield_per=chunk_size))
+        async for partition in result.mappings().partitions(chunk_size):
+            yield [SimpleNamespace(**row) for row in partition]
+
     async def create(self, db: AsyncSession, obj_in: dict):
         """
         新しいデータを作成してDBに登録。
@@ -37,39 +133,48 @@ class CRUDBase:
         db.add(db_obj)
         await db.commit()
         await db.refresh(db_obj)
+        await notify_write(self.model.__tablename__, "create", db_obj)
         return db_obj
 
     async def update(self, db: AsyncSession, key_field: str, value, obj_in: dict):
         """
-        指定フィールドと値で該当する1件を探し、obj_in の内容で更新。
+        指定フィールドと値で該当する1件を、obj_in の内容で更新。
+        UPDATE ... OUTPUT INSERTED.*（RETURNING）で更新後の行を受け取るため、1往復で済む。
         該当なしの場合は None を返す。
         """
+        if not obj_in:
+            return await self.get(db, key_field, value)
+
         result = await db.execute(
-            select(self.model).where(getattr(self.model, key_field) == value)
+            sql_update(self.model)
+            .where(getattr(self.model, key_field) == value)
+            .values(**obj_in)
+            .returning(self.model)
+            .execution_options(synchronize_session=False)
         )
         db_obj = result.scalars().first()
-        if not db_obj:
-            return None
-
-        for key, val in obj_in.items():
-            setattr(db_obj, key, val)
-
         await db.commit()
-        await db.refresh(db_obj)
+        if db_obj is not None:
+            await notify_write(self.model.__tablename__, "update", db_obj)
         return db_obj
 
     async def delete(self, db: AsyncSession, key_field: str, value):
         """
         指定フィールドと値で該当する1件を削除。
+        DELETE ... OUTPUT DELETED.id（RETURNING）で削除の有無を判定するため、1往復で済む。
+        変更フィードの対象テーブルなら、削除の記録も同じトランザクションで残す。
         成功時は True、見つからなければ False を返す。
         """
         result = await db.execute(
-            select(self.model).where(getattr(self.model, key_field) == value)
+            sql_delete(self.model)
+            .where(getattr(self.model, key_field) == value)
+            .returning(*self.columns(["id"]))
+            .execution_options(synchronize_session=False)
         )
-        db_obj = result.scalars().first()
-        if not db_obj:
-            return False
-
-        await db.delete(db_obj)
+        deleted = result.first()
+        if deleted is not None:
+            record_deletions(db, self.model.__tablename__, [deleted])
         await db.commit()
-        return True
+        if deleted is not None:
+            await notify_write(self.model.__tablename__, "delete", deleted)
+        return deleted is not None
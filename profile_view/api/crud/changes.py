@@ -0,0 +1,193 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, or_, delete as sql_delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from api.models import (
+    db_utcnow,
+    DeletedRow,
+    Employee,
+    EmploymentHistory,
+    ProjectInfo,
+    InsightInfo,
+    SkillInfo,
+    PrivateInfo,
+    RelatedInfo,
+    SeminarVideo,
+    EmployeeSkill,
+    EmployeeProject,
+)
+
+logger = logging.getLogger(__name__)
+
+# 変更フィード（GET /changes）
+# 各テーブルの updated_at と、削除の記録（deleted_rows）を時刻順に1本の列として返す。
+# 時刻はどちらも DB の時計（SYSUTCDATETIME()）で、INSERT / UPDATE / 削除の記録の文を実行した時点の値になる。
+#   CHANGES_SAFETY_SECONDS          DB の現在時刻からこの秒数以内の変更はまだ返さない（既定: 30）。
+#                                   時刻は文の実行時に決まり、コミットはその後のため、処理中のトランザクションの
+#                                   変更を読み飛ばさないよう、書き込みのトランザクションが始まってからコミットするまでの
+#                                   最長時間（一括取り込みの1チャンクなど）より長くすること
+#   CHANGES_RETENTION_DAYS          削除の記録を残す日数（既定: 30）。これより古いトークンは全件の再同期が必要
+#   CHANGES_PRUNE_INTERVAL_SECONDS  保持期間を過ぎた削除の記録を消す間隔・秒（既定: 3600）
+
+CHANGES_SAFETY_SECONDS = float(os.getenv("CHANGES_SAFETY_SECONDS", "30"))
+CHANGES_RETENTION_DAYS = float(os.getenv("CHANGES_RETENTION_DAYS", "30"))
+CHANGES_PRUNE_INTERVAL_SECONDS = float(os.getenv("CHANGES_PRUNE_INTERVAL_SECONDS", "3600"))
+
+# 変更フィードの対象テーブル（この順序は同時刻の変更の並び順として、トークンにも使う）
+CHANGE_MODELS = {
+    model.__tablename__: model
+    for model in (
+        Employee,
+        EmploymentHistory,
+        ProjectInfo,
+        InsightInfo,
+        SkillInfo,
+        PrivateInfo,
+        RelatedInfo,
+        SeminarVideo,
+        EmployeeSkill,
+        EmployeeProject,
+    )
+}
+SOURCES = [*CHANGE_MODELS, DeletedRow.__tablename__]
+# 変更がなかった場合のトークンの id（INT の最大値）。(until, 最後のソース, この id) は until までのすべての変更より後になる
+WATERMARK_ID = 2**31 - 1
+
+
+def record_deletions(db: AsyncSession, table: str, rows):
+    """
+    削除した行（id と employee_id を持つ）を deleted_rows に追加する。削除と同じトランザクションでコミットする。
+    deleted_at は DB で決まる。
+    """
+    if table not in CHANGE_MODELS:
+        return
+    db.add_all(
+        DeletedRow(table_name=table, row_id=row.id, employee_id=getattr(row, "employee_id", None))
+        for row in rows
+    )
+
+
+def source_columns(source: str):
+    """
+    ソース（テーブル名または deleted_rows）の (時刻の列, id の列) を返す。
+    """
+    if source == DeletedRow.__tablename__:
+        return DeletedRow.deleted_at, DeletedRow.id
+    model = CHANGE_MODELS[source]
+    return model.updated_at, model.id
+
+
+def after_token(source: str, since):
+    """
+    トークン (時刻, ソース, id) より後の行を表す条件。時刻 → ソースの順序 → id の順に並べたときの続き。
+    """
+    if since is None:
+        return None
+    since_at, since_source, since_id = since
+    at, id = source_columns(source)
+    order, since_order = SOURCES.index(source), SOURCES.index(since_source)
+    if order > since_order:
+        return at >= since_at
+    if order == since_order:
+        return or_(at > since_at, and_(at == since_at, id > since_id))
+    return at > since_at
+
+
+async def db_now(db: AsyncSession) -> datetime:
+    """
+    DB の現在時刻（UTC）。変更フィードの時刻はすべて DB の時計で比べる。
+    """
+    return (await db.execute(select(db_utcnow()))).scalar_one()
+
+
+async def get_changes(db: AsyncSession, since=None, limit: int = 500, tables=None, until: datetime | None = None):
+    """
+    since（前回のトークン）より後、until までの変更を時刻順に最大 limit 件返す。
+    until の既定は DB の現在時刻の CHANGES_SAFETY_SECONDS 秒前。
+    戻り値は (変更のリスト, 次のトークン, 続きがあるか)。変更は (時刻, ソース, id, 行) のタプル。
+    変更がなければ、次のトークンは until まで読み終えたことを表す位置にする
+    （変更のないフィードでも、トークンの時刻が進んで保持期間切れにならないように）。
+    """
+    if until is None:
+        until = await db_now(db) - timedelta(seconds=CHANGES_SAFETY_SECONDS)
+    tables = [table for table in (tables or CHANGE_MODELS) if table in CHANGE_MODELS]
+
+    changes = []
+    for source in [*tables, DeletedRow.__tablename__]:
+        at, id = source_columns(source)
+        model = CHANGE_MODELS.get(source, DeletedRow)
+        query = select(model).where(at <= until)
+        condition = after_token(source, since)
+        if condition is not None:
+            query = query.where(condition)
+        if model is DeletedRow:
+            query = query.where(DeletedRow.table_name.in_(tables))
+        # 各ソースから limit + 1 件ずつ読めば、全体の先頭 limit 件と続きの有無が決まる
+        result = await db.execute(query.order_by(at, id).limit(limit + 1))
+        order = SOURCES.index(source)
+        for row in result.scalars().all():
+            changes.append((getattr(row, at.key), order, row.id, source, row))
+
+    changes.sort(key=lambda change: change[:3])
+    has_more = len(changes) > limit
+    changes = [(changed_at, source, id, row) for changed_at, _, id, source, row in changes[:limit]]
+    if changes:
+        next_token = changes[-1][:3]
+    elif since is None or since[0] < until:
+        next_token = (until, SOURCES[-1], WATERMARK_ID)
+    else:
+        next_token = since
+    return changes, next_token, has_more
+
+
+async def prune_deleted_rows(db: AsyncSession) -> int:
+    """
+    保持期間を過ぎた削除の記録を消す。消した件数を返す。
+    """
+    result = await db.execute(
+        sql_delete(DeletedRow).where(
+            DeletedRow.deleted_at < await db_now(db) - timedelta(days=CHANGES_RETENTION_DAYS)
+        )
+    )
+    await db.commit()
+    return result.rowcount or 0
+
+
+class DeletedRowsPruner:
+    """
+    保持期間を過ぎた削除の記録を、interval 秒ごとにバックグラウンドで消す。
+    """
+
+    def __init__(self, interval: float = 3600):
+        self.interval = interval
+        self.pruned = 0
+        self._task: asyncio.Task | None = None
+
+    async def _run(self):
+        from api.database import AsyncSessionLocal
+
+        while True:
+            try:
+                async with AsyncSessionLocal() as db:
+                    self.pruned += await prune_deleted_rows(db)
+            except Exception:
+                logger.exception("削除の記録の整理に失敗しました")
+            await asyncio.sleep(self.interval)
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+deleted_rows_pruner = DeletedRowsPruner(CHANGES_PRUNE_INTERVAL_SECONDS)
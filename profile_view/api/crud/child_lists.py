@@ -0,0 +1,253 @@
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from types import SimpleNamespace
+
+from sqlalchemy import insert, update as sql_update, delete as sql_delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from api.crud.base import CRUDBase, add_write_listener, notify_write
+from api.crud.changes import record_deletions
+from api.legacy_lists import LegacyListFormat, diff_items
+from api.models import SeminarVideo, EmployeeSkill, EmployeeProject, RelatedInfo, SkillInfo, ProjectInfo
+from api.response_cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+# 1人の社員に複数行ある一覧（セミナー動画・スキル・案件）を、position で順序付けた子テーブルで扱う。
+# 以前はカンマ区切りの文字列として related_info / skill_info / project_info の1行に詰めていた。
+# 移行期間中は旧列（カンマ区切り）も書き込みのたびに同期し、旧列だけを読むクライアントもそのまま動くようにする。
+# 逆に旧テーブルが（旧来の API で）更新された場合は、書き込みリスナーで子テーブルを合わせる。
+
+# 子テーブル側の書き込みで旧テーブルを更新している間は、旧テーブル → 子テーブルの同期を行わない
+_legacy_sync_suppressed: ContextVar[bool] = ContextVar("legacy_sync_suppressed", default=False)
+
+
+@contextmanager
+def legacy_sync_suppressed():
+    token = _legacy_sync_suppressed.set(True)
+    try:
+        yield
+    finally:
+        _legacy_sync_suppressed.reset(token)
+
+
+class OrderedChildCRUD(CRUDBase):
+    """
+    employee_id + position で順序を持つ子テーブルの CRUD。
+    - 読み取りは社員単位、または複数社員分を1回の SELECT（employee_id IN (...)）でまとめて取得する
+    - 書き込みは既存行との差分だけを一括 UPDATE / INSERT / DELETE する
+    legacy を指定すると、書き込みのたびに旧テーブルのカンマ区切り列も更新する。
+    """
+
+    def __init__(self, model, value_fields, legacy: LegacyListFormat | None = None):
+        super().__init__(model)
+        self.value_fields = list(value_fields)
+        self.legacy = legacy
+
+    async def load(self, db: AsyncSession, employee_id: int):
+        """
+        社員1人分の行を position 順に取得する。
+        一括 UPDATE はセッション内のオブジェクトに反映されないため、読み直すたびに値を上書きする。
+        """
+        result = await db.execute(
+            select(self.model)
+            .where(self.model.employee_id == employee_id)
+            .order_by(self.model.position)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalars().all()
+
+    async def load_many(self, db: AsyncSession, employee_ids) -> dict:
+        """
+        複数社員分の行を1回の SELECT で取得し、{employee_id: position 順の行のリスト} で返す。
+        """
+        employee_ids = list(set(employee_ids))
+        grouped = {employee_id: [] for employee_id in employee_ids}
+        if not employee_ids:
+            return grouped
+        result = await db.execute(
+            select(self.model)
+            .where(self.model.employee_id.in_(employee_ids))
+            .order_by(self.model.employee_id, self.model.position)
+        )
+        for row in result.scalars().all():
+            grouped[row.employee_id].append(row)
+        return grouped
+
+    async def _apply(self, db: AsyncSession, employee_id: int, existing, items: list[dict], sync_legacy: bool):
+        """
+        existing を items に合わせる差分を書き込んでコミットし、(変更の有無, 更新した旧テーブルの行) を返す。
+        """
+        updates, inserts, keep = diff_items(existing, items, self.value_fields)
+        removed = existing[keep:]
+        changed = bool(updates or inserts or removed)
+        legacy_row = None
+        if updates:
+            # 主キーを含む dict のリストを渡すと、ORM の一括 UPDATE（executemany）になる
+            await db.execute(sql_update(self.model), updates)
+        if inserts:
+            result = await db.execute(
+                insert(self.model).returning(self.model.id, self.model.position),
+                [{"employee_id": employee_id, **row} for row in inserts],
+            )
+            ids = {position: id for id, position in result.all()}
+            inserts = [{"id": ids.get(row["position"]), **row} for row in inserts]
+        if removed:
+            await db.execute(
+                sql_delete(self.model)
+                .where(self.model.employee_id == employee_id, self.model.position >= keep)
+                .execution_options(synchronize_session=False)
+            )
+            record_deletions(db, self.model.__tablename__, removed)
+        if changed and sync_legacy and self.legacy is not None and not self.legacy.round_trips(items):
+            # 旧列に書くと要素の区切りがずれ、旧テーブル → 子テーブルの同期でずれた一覧が書き戻されるため、旧列は更新しない
+            logger.error(
+                "区切り文字を含む値があるため、%s の旧列を同期しませんでした (employee_id=%s)",
+                self.legacy.model.__tablename__, employee_id,
+            )
+            sync_legacy = False
+        if changed and sync_legacy and self.legacy is not None:
+            result = await db.execute(
+                sql_update(self.legacy.model)
+                .where(self.legacy.model.employee_id == employee_id)
+                .values(**self.legacy.join(items))
+                .returning(self.legacy.model)
+                .execution_options(synchronize_session=False)
+            )
+            legacy_row = result.scalars().first()
+        try:
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+
+        table = self.model.__tablename__
+        for row in updates:
+            await notify_write(table, "update", SimpleNamespace(employee_id=employee_id, **row))
+        for row in inserts:
+            await notify_write(table, "create", SimpleNamespace(employee_id=employee_id, **row))
+        for row in removed:
+            await notify_write(table, "delete", SimpleNamespace(id=row.id, employee_id=employee_id))
+        if legacy_row is not None:
+            with legacy_sync_suppressed():
+                await notify_write(self.legacy.model.__tablename__, "update", legacy_row)
+        return changed, legacy_row
+
+    async def replace(self, db: AsyncSession, employee_id: int, items: list[dict]):
+        """
+        社員1人分の一覧を items（position 順）に置き換える。
+        (置き換え後の行, 同期した旧テーブルの行または None) を返す。
+        """
+        existing = await self.load(db, employee_id)
+        changed, legacy_row = await self._apply(db, employee_id, existing, items, sync_legacy=True)
+        return (await self.load(db, employee_id) if changed else existing), legacy_row
+
+    async def set_item(self, db: AsyncSession, employee_id: int, position: int, values: dict):
+        """
+        position の1件だけを values で部分更新する。戻り値は replace と同じで、該当がなければ None を返す。
+        """
+        existing = await self.load(db, employee_id)
+        if not 0 <= position < len(existing):
+            return None
+        items = [{name: getattr(row, name) for name in self.value_fields} for row in existing]
+        items[position].update({name: value for name, value in values.items() if name in self.value_fields})
+        changed, legacy_row = await self._apply(db, employee_id, existing, items, sync_legacy=True)
+        return (await self.load(db, employee_id) if changed else existing), legacy_row
+
+    async def delete_item(self, db: AsyncSession, employee_id: int, position: int):
+        """
+        position の1件を削除して後ろを詰める。戻り値は replace と同じで、該当がなければ None を返す。
+        （position の一意制約に触れないよう、後ろの行の値を1つずつ前に移してから末尾を削除する）
+        """
+        existing = await self.load(db, employee_id)
+        if not 0 <= position < len(existing):
+            return None
+        items = [{name: getattr(row, name) for name in self.value_fields} for row in existing]
+        del items[position]
+        _, legacy_row = await self._apply(db, employee_id, existing, items, sync_legacy=True)
+        return await self.load(db, employee_id), legacy_row
+
+    def oversized_fields(self, items) -> list[str]:
+        """
+        子テーブルの列の長さを超える値がある列名を返す。
+        """
+        columns = self.model.__table__.columns
+        return [
+            name for name in self.value_fields
+            if columns[name].type.length
+            and any(len(item.get(name) or "") > columns[name].type.length for item in items)
+        ]
+
+    async def sync_from_legacy(self, db: AsyncSession, legacy_row) -> bool:
+        """
+        旧テーブルの行が直接更新された場合に、子テーブルをその内容に合わせる。変更があれば True を返す。
+        旧列の要素が子テーブルの列に収まらない場合は書き込まず、エラーとしてログに残す（旧テーブルの書き込みは成功済み）。
+        """
+        if self.legacy is None or legacy_row is None:
+            return False
+        items = self.legacy.split(legacy_row)
+        oversized = self.oversized_fields(items)
+        if oversized:
+            logger.error(
+                "旧テーブルの値が列の長さを超えるため、%s を同期できませんでした (employee_id=%s, 列: %s)",
+                self.model.__tablename__, legacy_row.employee_id, ", ".join(oversized),
+            )
+            return False
+        existing = await self.load(db, legacy_row.employee_id)
+        changed, _ = await self._apply(db, legacy_row.employee_id, existing, items, sync_legacy=False)
+        return changed
+
+
+SEMINAR_VIDEOS_FORMAT = LegacyListFormat(
+    model=RelatedInfo,
+    columns={"video_url": "seminar_videos", "thumbnail_url": "seminar_thumbnail_url"},
+    key="video_url",
+)
+EMPLOYEE_SKILLS_FORMAT = LegacyListFormat(model=SkillInfo, columns={"skill": "skill"}, key="skill")
+EMPLOYEE_PROJECTS_FORMAT = LegacyListFormat(
+    model=ProjectInfo,
+    columns={
+        "project": "project",
+        "skill": "skill",
+        "comment": "comment",
+        "start_date": "start_date",
+        "end_date": "end_date",
+    },
+    key="project",
+    nested={"skill": "\\"},
+)
+
+seminar_videos_crud = OrderedChildCRUD(SeminarVideo, ["video_url", "thumbnail_url"], SEMINAR_VIDEOS_FORMAT)
+employee_skills_crud = OrderedChildCRUD(EmployeeSkill, ["skill"], EMPLOYEE_SKILLS_FORMAT)
+employee_projects_crud = OrderedChildCRUD(
+    EmployeeProject, ["project", "skill", "comment", "start_date", "end_date"], EMPLOYEE_PROJECTS_FORMAT
+)
+
+# プロフィールに含める一覧（キーはテーブル名）
+CHILD_LIST_CRUDS = {
+    "seminar_videos": seminar_videos_crud,
+    "employee_skills": employee_skills_crud,
+    "employee_projects": employee_projects_crud,
+}
+
+
+async def sync_child_lists(table: str, operation: str, row):
+    """
+    書き込みリスナー。旧テーブル（related_info / skill_info / project_info）の作成・更新を子テーブルに反映する。
+    """
+    if operation == "delete" or _legacy_sync_suppressed.get():
+        return
+    from api.database import AsyncSessionLocal
+
+    for crud in CHILD_LIST_CRUDS.values():
+        if crud.legacy.model.__tablename__ != table:
+            continue
+        async with AsyncSessionLocal() as db:
+            if await crud.sync_from_legacy(db, row):
+                await response_cache.invalidate(crud.model.__tablename__)
+                await response_cache.invalidate("profiles")
+
+
+add_write_listener(sync_child_lists)
@@ -1,4 +1,66 @@
+from types import SimpleNamespace
+
+from sqlalchemy import and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
 from api.crud.base import CRUDBase
 from api.models import Employee
 
-employee_crud = CRUDBase(Employee)
\ No newline at end of file
+employee_crud = CRUDBase(Employee)
+
+# 社員一覧（GET /directory）で返す列。並び順ごとのカバリングインデックスに含まれる列だけにする
+DIRECTORY_COLUMNS = ("id", "employee_id", "name", "kana", "photo_url")
+DIRECTORY_SORTS = ("employee_id", "name", "kana")
+
+
+def build_directory_query(sort: str = "employee_id", descending: bool = False, after=None, limit=None):
+    """
+    社員一覧の SELECT 文を組み立てる。(sort 列, id) の順に並べ、after（直前の行の (sort 列の値, id)）より後を返す。
+    NULL は昇順では先頭、降順では末尾に並ぶ（SQL Server・SQLite 共通）ため、NULL の行もページをまたいで欠けない。
+    """
+    column = getattr(Employee, sort)
+    query = select(*(getattr(Employee, name) for name in DIRECTORY_COLUMNS))
+
+    if after is not None:
+        value, after_id = after
+        if not descending:
+            if value is None:
+                query = query.where(or_(and_(column.is_(None), Employee.id > after_id), column.is_not(None)))
+            else:
+                query = query.where(or_(column > value, and_(column == value, Employee.id > after_id)))
+        else:
+            if value is None:
+                query = query.where(column.is_(None), Employee.id < after_id)
+            else:
+                query = query.where(
+                    or_(column < value, and_(column == value, Employee.id < after_id), column.is_(None))
+                )
+
+    if descending:
+        query = query.order_by(column.desc(), Employee.id.desc())
+    else:
+        query = query.order_by(column, Employee.id)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+async def get_directory(db: AsyncSession, sort: str = "employee_id", descending: bool = False, after=None, limit=None):
+    """
+    社員一覧の1ページ分を、属性アクセスできる軽量オブジェクトのリストで返す。
+    """
+    result = await db.execute(build_directory_query(sort, descending, after, limit))
+    return [SimpleNamespace(**row) for row in result.mappings().all()]
+
+
+async def stream_directory(
+    db: AsyncSession, sort: str = "employee_id", descending: bool = False, after=None, chunk_size: int = 500
+):
+    """
+    社員一覧の全件を、サーバーサイドカーソルから chunk_size 件ずつリストで順に返す非同期ジェネレータ。
+    """
+    query = build_directory_query(sort, descending, after)
+    result = await db.stream(query.execution_options(yield_per=chunk_size))
+    async for partition in result.mappings().partitions(chunk_size):
+        yield [SimpleNamespace(**row) for row in partition]
@@ -1,4 +1,17 @@
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
 from api.crud.base import CRUDBase
 from api.models import OperationLogs
 
-operation_logs_crud = CRUDBase(OperationLogs)
\ No newline at end of file
+operation_logs_crud = CRUDBase(OperationLogs)
+
+
+async def bulk_create_operation_logs(db: AsyncSession, rows: list[dict]):
+    """
+    操作ログを複数行の INSERT 1回（INSERT ... VALUES (...), (...), ...）で登録してコミットする。
+    """
+    if not rows:
+        return
+    await db.execute(insert(OperationLogs).values(rows))
+    await db.commit()
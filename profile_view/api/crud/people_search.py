@@ -0,0 +1,81 @@
+import asyncio
+import os
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.crud.base import add_write_listener
+from api.crud.employees import employee_crud
+from api.crud.employment_history import employment_history_crud
+from api.crud.insight_info import insight_info_crud
+from api.crud.private_info import private_info_crud
+from api.crud.project_info import project_info_crud
+from api.crud.skill_info import skill_info_crud
+from api.search.people_index import FACET_FIELDS, SEARCH_FIELDS, people_index
+
+# 人物検索インデックスの全件再構築の間隔（秒）
+# このプロセスでの書き込みは CRUD の書き込みリスナーで即時に反映する。
+# 全件再構築は、他のレプリカや DB を直接更新した分を取り込むためのもの。
+PEOPLE_INDEX_REBUILD_SECONDS = float(os.getenv("PEOPLE_INDEX_REBUILD_SECONDS", "600"))
+
+SEARCH_CRUDS = {
+    "employees": employee_crud,
+    "skill_info": skill_info_crud,
+    "project_info": project_info_crud,
+    "insight_info": insight_info_crud,
+    "employment_history": employment_history_crud,
+    "private_info": private_info_crud,
+}
+
+_people_index_lock = asyncio.Lock()
+
+add_write_listener(people_index.apply_write)
+
+
+def search_columns(table: str) -> list[str]:
+    """
+    インデックスに必要な列（検索対象 + ファセット）の列名を返す。
+    """
+    columns = list(SEARCH_FIELDS[table])
+    columns += [column for facet_table, column in FACET_FIELDS.values() if facet_table == table]
+    return columns
+
+
+async def load_people_rows(db: AsyncSession):
+    """
+    検索インデックス用に、対象テーブルの必要な列だけを全件取得して (テーブル名, 行) のリストで返す。
+    """
+    rows = []
+    for table, crud in SEARCH_CRUDS.items():
+        for row in await crud.get_all(db, fields=search_columns(table)):
+            rows.append((table, row))
+    return rows
+
+
+async def refresh_people_index(db: AsyncSession, force: bool = False):
+    """
+    人物検索インデックスが未構築、または前回の再構築から一定時間たっていれば全件再構築する。
+    """
+    def elapsed(since):
+        return float("inf") if since is None else time.monotonic() - since
+
+    if not force and elapsed(people_index.rebuilt_at) < PEOPLE_INDEX_REBUILD_SECONDS:
+        return
+
+    async with _people_index_lock:
+        if force or elapsed(people_index.rebuilt_at) >= PEOPLE_INDEX_REBUILD_SECONDS:
+            people_index.rebuild(await load_people_rows(db))
+
+
+async def search_people(
+    db: AsyncSession,
+    query: str = "",
+    filters: dict | None = None,
+    limit: int = 20,
+    offset: int = 0,
+):
+    """
+    プロフィール全体を全文検索し、(該当件数, ページ分の結果, ファセットの集計) を返す。
+    """
+    await refresh_people_index(db)
+    return people_index.search(query, filters=filters, limit=limit, offset=offset)
@@ -0,0 +1,196 @@
+import os
+from types import SimpleNamespace
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from api.crud.base import notify_write
+from api.crud.child_lists import CHILD_LIST_CRUDS, legacy_sync_suppressed
+from api.crud.profiles import PROFILE_MODELS, profile_values
+from api.models import Employee
+
+# プロフィールの一括取り込み・書き出し
+#   PROFILE_IMPORT_CHUNK_SIZE   取り込みで1トランザクションに書き込む人数（既定: 100）
+#   PROFILE_IMPORT_MAX_ERRORS   レスポンスに含める行ごとのエラーの上限（既定: 1000。件数は上限を超えても数える）
+#   PROFILE_EXPORT_CHUNK_SIZE   書き出しでサーバーサイドカーソルから一度に読む人数（既定: 500）
+
+PROFILE_IMPORT_CHUNK_SIZE = int(os.getenv("PROFILE_IMPORT_CHUNK_SIZE", "100"))
+PROFILE_IMPORT_MAX_ERRORS = int(os.getenv("PROFILE_IMPORT_MAX_ERRORS", "1000"))
+PROFILE_EXPORT_CHUNK_SIZE = int(os.getenv("PROFILE_EXPORT_CHUNK_SIZE", "500"))
+
+
+async def insert_rows(db: AsyncSession, model, rows: list[dict]) -> list[SimpleNamespace]:
+    """
+    複数行を1回の INSERT（executemany / 複数行の VALUES）で追加し、採番された id 付きの行を返す。
+    行ごとに指定された列が違っても1つの文にできるよう、指定のない列は None にそろえる。
+    """
+    if not rows:
+        return []
+    columns = list(dict.fromkeys(name for row in rows for name in row))
+    rows = [{name: row.get(name) for name in columns} for row in rows]
+    result = await db.execute(
+        insert(model).returning(model.id, sort_by_parameter_order=True), rows
+    )
+    return [SimpleNamespace(id=id, **row) for id, row in zip(result.scalars().all(), rows)]
+
+
+async def write_profiles(db: AsyncSession, profiles: list[dict]) -> dict:
+    """
+    複数人分のプロフィール（ProfileCreate.dict() の形式）を、テーブルごとにまとめて INSERT し、1回でコミットする。
+    書き込んだ行を {テーブル名: 行のリスト} で返す。失敗した場合はすべてロールバックして例外を送出する。
+    """
+    employees, tables = [], {key: [] for key in PROFILE_MODELS}
+    lists = {key: [] for key in CHILD_LIST_CRUDS}
+    for obj_in in profiles:
+        employee_id = obj_in["employee"]["employee_id"]
+        employees.append(obj_in["employee"])
+        legacy_values, child_items = profile_values(obj_in)
+        for key in PROFILE_MODELS:
+            tables[key].append({"employee_id": employee_id, **legacy_values[key]})
+        for key in CHILD_LIST_CRUDS:
+            lists[key] += [{"employee_id": employee_id, **item} for item in child_items[key]]
+
+    written = {}
+    try:
+        written[Employee.__tablename__] = await insert_rows(db, Employee, employees)
+        for key, model in PROFILE_MODELS.items():
+            written[model.__tablename__] = await insert_rows(db, model, tables[key])
+        for key, crud in CHILD_LIST_CRUDS.items():
+            written[crud.model.__tablename__] = await insert_rows(db, crud.model, lists[key])
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+
+    # 一覧と旧テーブルの列は登録時点で一致しているため、旧テーブルからの同期は不要
+    with legacy_sync_suppressed():
+        for table, rows in written.items():
+            for row in rows:
+                await notify_write(table, "create", row)
+    return written
+
+
+class ProfileImport:
+    """
+    一括取り込みの進行状況と結果。行ごとのエラーは PROFILE_IMPORT_MAX_ERRORS 件まで保持する。
+    """
+
+    def __init__(self, dry_run: bool = False):
+        self.dry_run = dry_run
+        self.imported = 0
+        self.failed = 0
+        self.errors: list[dict] = []
+        self.seen: set[int] = set()
+        self.pending: list[tuple[int, dict]] = []
+
+    def fail(self, line: int, errors: list[dict], employee_id=None):
+        self.failed += 1
+        if len(self.errors) < PROFILE_IMPORT_MAX_ERRORS:
+            self.errors.append({"line": line, "employee_id": employee_id, "errors": errors})
+
+    def result(self) -> dict:
+        return {
+            "imported": self.imported,
+            "failed": self.failed,
+            "dry_run": self.dry_run,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+async def flush_import(db: AsyncSession, state: ProfileImport):
+    """
+    溜まった行を書き込む。登録済みの社員番号の行はエラーにする。
+    まとめての書き込みが一意制約・列の長さなどで DB に拒否された場合は、1人ずつ書き込み直して失敗した行を特定する。
+    """
+    pending, state.pending = state.pending, []
+    if not pending:
+        return
+    result = await db.execute(
+        select(Employee.employee_id).where(
+            Employee.employee_id.in_([obj_in["employee"]["employee_id"] for _, obj_in in pending])
+        )
+    )
+    existing = set(result.scalars().all())
+    rows = []
+    for line, obj_in in pending:
+        employee_id = obj_in["employee"]["employee_id"]
+        if employee_id in existing:
+            state.fail(line, [{"loc": "employee.employee_id", "message": "Profile already exists"}], employee_id)
+        else:
+            rows.append((line, obj_in))
+    if not rows or state.dry_run:
+        state.imported += len(rows)
+        return
+
+    try:
+        await write_profiles(db, [obj_in for _, obj_in in rows])
+        state.imported += len(rows)
+        return
+    except DBAPIError as e:
+        if len(rows) > 1:
+            failed = []
+            for line, obj_in in rows:
+                try:
+                    await write_profiles(db, [obj_in])
+                    state.imported += 1
+                except DBAPIError as row_error:
+                    failed.append((line, obj_in, row_error))
+        else:
+            failed = [(line, obj_in, e) for line, obj_in in rows]
+    for line, obj_in, error in failed:
+        message = "Constraint violation" if isinstance(error, IntegrityError) else "Rejected by the database"
+        state.fail(line, [{"loc": "", "message": message}], obj_in["employee"]["employee_id"])
+
+
+async def import_profiles(db: AsyncSession, records, dry_run: bool = False) -> dict:
+    """
+    (行番号, ProfileCreate またはエラーのリスト) の非同期イテレータを順に検証し、
+    PROFILE_IMPORT_CHUNK_SIZE 人ずつ1トランザクションで書き込む（先に書き込んだ分は後の失敗で戻らない）。
+    dry_run の場合は検証と登録済みの確認だけを行い、書き込まない。
+    """
+    state = ProfileImport(dry_run=dry_run)
+    async for line, record in records:
+        if isinstance(record, list):
+            state.fail(line, record)
+            continue
+        obj_in = record.dict()
+        employee_id = obj_in["employee"]["employee_id"]
+        if employee_id in state.seen:
+            state.fail(line, [{"loc": "employee.employee_id", "message": "Duplicate employee_id in upload"}], employee_id)
+            continue
+        state.seen.add(employee_id)
+        state.pending.append((line, obj_in))
+        if len(state.pending) >= PROFILE_IMPORT_CHUNK_SIZE:
+            await flush_import(db, state)
+    await flush_import(db, state)
+    return state.result()
+
+
+async def stream_profiles(db: AsyncSession, chunk_size: int = PROFILE_EXPORT_CHUNK_SIZE):
+    """
+    全社員のプロフィールを employees.id 順に、chunk_size 人ずつのリストで順に返す非同期ジェネレータ。
+    7テーブルは JOIN した1本のサーバーサイドカーソルから読み、一覧は chunk ごとに1回ずつ別のセッションで読む
+    （カーソルを開いている接続では他のクエリを実行できないため）。
+    """
+    from api.database import AsyncSessionLocal
+
+    query = select(Employee, *PROFILE_MODELS.values())
+    for model in PROFILE_MODELS.values():
+        query = query.outerjoin(model, model.employee_id == Employee.employee_id)
+    query = query.order_by(Employee.id).execution_options(yield_per=chunk_size)
+
+    result = await db.stream(query)
+    async with AsyncSessionLocal() as list_db:
+        async for partition in result.partitions(chunk_size):
+            profiles = []
+            for employee, *children in partition:
+                profiles.append({"employee": employee, **dict(zip(PROFILE_MODELS.keys(), children))})
+            employee_ids = [profile["employee"].employee_id for profile in profiles]
+            for key, crud in CHILD_LIST_CRUDS.items():
+                grouped = await crud.load_many(list_db, employee_ids)
+                for profile in profiles:
+                    profile[key] = grouped[profile["employee"].employee_id]
+            yield profiles
@@ -0,0 +1,144 @@
+from types import SimpleNamespace
+
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from api.crud.base import notify_write
+from api.crud.changes import record_deletions
+from api.crud.child_lists import CHILD_LIST_CRUDS, legacy_sync_suppressed
+from api.models import (
+    Employee,
+    EmploymentHistory,
+    ProjectInfo,
+    InsightInfo,
+    SkillInfo,
+    PrivateInfo,
+    RelatedInfo,
+)
+
+# プロフィールを構成する employees 以外のテーブル（employee_id で 1:1 に紐づく）
+PROFILE_MODELS = {
+    "employment_history": EmploymentHistory,
+    "project_info": ProjectInfo,
+    "insight_info": InsightInfo,
+    "skill_info": SkillInfo,
+    "private_info": PrivateInfo,
+    "related_info": RelatedInfo,
+}
+
+
+async def get_profile(db: AsyncSession, id: int):
+    """
+    employees.id を指定して、プロフィールを構成する7テーブルを1回のクエリで取得する。
+    各テーブルは employee_id で LEFT OUTER JOIN するため、1往復・1実行計画で済む。
+    一覧（セミナー動画・スキル・案件）は position 順のリストで返す。
+    該当する社員がいなければ None を返す。
+    """
+    query = select(Employee, *PROFILE_MODELS.values())
+    for model in PROFILE_MODELS.values():
+        query = query.outerjoin(model, model.employee_id == Employee.employee_id)
+    query = query.where(Employee.id == id)
+
+    result = await db.execute(query)
+    row = result.first()
+    if row is None:
+        return None
+
+    employee, *children = row
+    profile = {"employee": employee, **dict(zip(PROFILE_MODELS.keys(), children))}
+    # 一覧（子テーブル）は行数が社員ごとに違うため JOIN せず、一覧ごとに1回ずつ取得する
+    for key, crud in CHILD_LIST_CRUDS.items():
+        profile[key] = await crud.load(db, employee.employee_id)
+    return profile
+
+
+def profile_values(obj_in: dict):
+    """
+    ProfileCreate.dict() の形式から、各テーブルに書き込む値を作る。
+    戻り値は ({テーブルのキー: 列の値}, {一覧のキー: position を含む行の値のリスト})。
+    一覧は指定されたものを正とし、旧テーブルのカンマ区切り列もそれに合わせる。
+    指定がなければ旧テーブルの列から一覧を作る（どちらで登録しても両者は一致する）。
+    """
+    legacy_values = {key: dict(obj_in.get(key) or {}) for key in PROFILE_MODELS}
+    child_items = {}
+    for key, crud in CHILD_LIST_CRUDS.items():
+        legacy_key = crud.legacy.model.__tablename__
+        if obj_in.get(key) is not None:
+            items = obj_in[key]
+            legacy_values[legacy_key].update(crud.legacy.join(items))
+        else:
+            items = crud.legacy.split(SimpleNamespace(**legacy_values[legacy_key]))
+        child_items[key] = [
+            {"position": position, **{name: item.get(name) for name in crud.value_fields}}
+            for position, item in enumerate(items)
+        ]
+    return legacy_values, child_items
+
+
+async def create_profile(db: AsyncSession, obj_in: dict):
+    """
+    社員1人分のプロフィールを、関連する全テーブルに1トランザクション・1コミットで登録する。
+    obj_in は ProfileCreate.dict() の形式。途中で失敗した場合はすべてロールバックする。
+    操作ログは書き込みリスナー経由で非同期に記録される。
+    """
+    employee = Employee(**obj_in["employee"])
+    profile = {"employee": employee}
+    db.add(employee)
+
+    legacy_values, child_items = profile_values(obj_in)
+    for key, model in PROFILE_MODELS.items():
+        child = model(employee_id=employee.employee_id, **legacy_values[key])
+        profile[key] = child
+        db.add(child)
+    for key, crud in CHILD_LIST_CRUDS.items():
+        profile[key] = [
+            crud.model(employee_id=employee.employee_id, **item) for item in child_items[key]
+        ]
+        db.add_all(profile[key])
+
+    try:
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    # 一覧と旧テーブルの列は登録時点で一致しているため、旧テーブルからの同期は不要
+    with legacy_sync_suppressed():
+        for key, value in profile.items():
+            for row in value if isinstance(value, list) else [value]:
+                await notify_write(row.__tablename__, "create", row)
+    return profile
+
+
+async def delete_profile(db: AsyncSession, id: int):
+    """
+    employees.id を指定して、プロフィールを構成する全テーブルの行を
+    1トランザクション・1コミットで削除する（操作ログは履歴として残す）。
+    成功時は {テーブル名: 削除した id のリスト}、社員が見つからなければ None を返す。
+    """
+    result = await db.execute(
+        select(Employee.employee_id).where(Employee.id == id)
+    )
+    employee_id = result.scalar()
+    if employee_id is None:
+        return None
+
+    deleted = {}
+    try:
+        for model in (*PROFILE_MODELS.values(), *(crud.model for crud in CHILD_LIST_CRUDS.values())):
+            result = await db.execute(
+                delete(model).where(model.employee_id == employee_id).returning(model.id)
+            )
+            deleted[model.__tablename__] = result.scalars().all()
+        await db.execute(delete(Employee).where(Employee.id == id))
+        deleted[Employee.__tablename__] = [id]
+        for table, ids in deleted.items():
+            record_deletions(db, table, [SimpleNamespace(id=row_id, employee_id=employee_id) for row_id in ids])
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    for table, ids in deleted.items():
+        for deleted_id in ids:
+            await notify_write(table, "delete", SimpleNamespace(id=deleted_id, employee_id=employee_id))
+    return deleted
@@ -1,8 +1,27 @@
+import asyncio
+import os
+import time
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import text
-from typing import List, Dict
-from ..models_project import Project
+from sqlalchemy import func, text
+from typing import List, Dict, Optional
+from ..models import Employee
+from ..models_project import Project, TeamMember
+from ..database_project import AsyncProjectSessionLocal, get_project_engine
+from ..offload import run_blocking
+from ..search.member_index import member_index
+
+# メンバー検索インデックスの更新間隔（秒）
+# 差分更新: 前回以降に追加されたメンバー（id が大きいもの）だけを読み込む
+# 全件再構築: 名前の変更・削除と、社員テーブルの読みがなを反映する（それまでは変更前の名前で検索される）
+MEMBER_INDEX_REFRESH_SECONDS = float(os.getenv("MEMBER_INDEX_REFRESH_SECONDS", "30"))
+MEMBER_INDEX_REBUILD_SECONDS = float(os.getenv("MEMBER_INDEX_REBUILD_SECONDS", "600"))
+
+# 社員ごとのプロジェクト一覧（GET /project-management/employees/{employee_id}/projects）のキャッシュ期間（秒）
+# プロジェクトDBへの書き込みはこのアプリを通らず無効化できないため、短めにする
+EMPLOYEE_PROJECTS_CACHE_SECONDS = float(os.getenv("EMPLOYEE_PROJECTS_CACHE_SECONDS", "30"))
+
+_member_index_lock = asyncio.Lock()
 
 
 async def get_team_members_by_name(
@@ -44,4 +63,204 @@ async def get_projects_by_ids(
 
     query = select(Project).where(Project.id.in_(project_ids))
     result = await db.execute(query)
-    return result.scalars().all()
\ No newline at end of file
+    return result.scalars().all()
+
+
+def compact_name(name: Optional[str]) -> str:
+    """
+    名前から半角・全角の空白を除く（社員テーブルとチームメンバーで空白の入れ方が違っても一致させる）
+    """
+    return (name or "").replace(" ", "").replace("　", "")
+
+
+def compact_name_column(column):
+    """
+    compact_name と同じ変換を SQL 側で行う式
+    """
+    return func.replace(func.replace(column, " ", ""), "　", "")
+
+
+def member_project_ids(name: str):
+    """
+    指定した名前（空白除去済み）のメンバーが参加しているプロジェクトIDのサブクエリ
+    """
+    return select(TeamMember.project_id).where(compact_name_column(TeamMember.member_name) == name)
+
+
+async def load_member_projects(name: str) -> List[Project]:
+    """
+    メンバーが参加しているプロジェクトを取得（専用のセッションを使うため、他のクエリと並行して実行できる）
+    """
+    get_project_engine()
+    async with AsyncProjectSessionLocal() as db:
+        result = await db.execute(
+            select(Project).where(Project.id.in_(member_project_ids(name))).order_by(Project.id)
+        )
+        return result.scalars().all()
+
+
+async def load_project_teammates(name: str) -> List[Dict]:
+    """
+    メンバーが参加しているプロジェクトの全メンバー（本人を含む）を取得
+    """
+    get_project_engine()
+    async with AsyncProjectSessionLocal() as db:
+        result = await db.execute(
+            select(
+                TeamMember.id,
+                TeamMember.project_id,
+                TeamMember.member_name,
+                TeamMember.role_title,
+            )
+            .where(TeamMember.project_id.in_(member_project_ids(name)))
+            .order_by(TeamMember.project_id, TeamMember.sort_order, TeamMember.id)
+        )
+        return [dict(row) for row in result.mappings().all()]
+
+
+async def load_employee_ids_by_name(profile_db: AsyncSession, names) -> Dict[str, int]:
+    """
+    プロフィールDBの社員テーブルから、名前（空白除去）→ 社員番号 の対応を取得
+    """
+    names = list({compact_name(name) for name in names if name})
+    if not names:
+        return {}
+    result = await profile_db.execute(
+        select(Employee.name, Employee.employee_id).where(compact_name_column(Employee.name).in_(names))
+    )
+    return {compact_name(name): employee_id for name, employee_id in result.all()}
+
+
+def group_employee_projects(name: str, projects, members, employee_ids: Dict[str, int]) -> List[Dict]:
+    """
+    プロジェクトとメンバーの行を、プロジェクトごとのメンバー一覧を持つ形にまとめる。
+    name（空白除去済み）は本人の名前で、本人の役割をプロジェクトの role_title に入れる。
+    メンバーがプロフィールDBの社員と一致すれば employee_id を付ける（一致しなければ None）。
+    """
+    by_project = {project.id: [] for project in projects}
+    roles = {}
+    for member in members:
+        if member["project_id"] not in by_project:
+            continue
+        if compact_name(member["member_name"]) == name:
+            roles.setdefault(member["project_id"], member["role_title"])
+        by_project[member["project_id"]].append(
+            {**member, "employee_id": employee_ids.get(compact_name(member["member_name"]))}
+        )
+    return [
+        {
+            "id": project.id,
+            "code": project.code,
+            "name": project.name,
+            "start_date": project.start_date,
+            "end_date": project.end_date,
+            "client_name": project.client_name,
+            "industry_categories": project.industry_categories,
+            "type_categories": project.type_categories,
+            "role_title": roles.get(project.id),
+            "members": by_project[project.id],
+        }
+        for project in projects
+    ]
+
+
+async def get_employee_projects(profile_db: AsyncSession, employee_id: int) -> Optional[Dict]:
+    """
+    社員番号から社員を引き、参加しているプロジェクトとそのメンバーを返す。社員がいなければ None を返す。
+    プロジェクトの取得と、メンバーの取得 → プロフィールDBでの社員番号の照合は並行して実行する
+    （プロジェクトDB側は2つのクエリを別々のセッションで、プロフィールDB側はメンバーが揃い次第すぐに）。
+    """
+    result = await profile_db.execute(
+        select(Employee.name).where(Employee.employee_id == employee_id)
+    )
+    employee_name = result.scalar_one_or_none()
+    if employee_name is None:
+        return None
+    name = compact_name(employee_name)
+
+    async def members_with_employee_ids():
+        members = await load_project_teammates(name)
+        return members, await load_employee_ids_by_name(profile_db, (m["member_name"] for m in members))
+
+    projects, (members, employee_ids) = await asyncio.gather(
+        load_member_projects(name), members_with_employee_ids()
+    )
+    # 同姓同名の社員がいても、本人の行には本人の社員番号を付ける
+    employee_ids[name] = employee_id
+    return {
+        "employee_id": employee_id,
+        "name": employee_name,
+        "projects": group_employee_projects(name, projects, members, employee_ids),
+    }
+
+
+async def load_team_members(db: AsyncSession, after_id: int = 0) -> List[Dict]:
+    """
+    検索インデックス用に、id が after_id より大きいチームメンバーを取得
+    """
+    query = (
+        select(
+            TeamMember.id,
+            TeamMember.project_id,
+            TeamMember.member_name,
+            TeamMember.role_title,
+        )
+        .where(TeamMember.id > after_id)
+        .order_by(TeamMember.id)
+    )
+    result = await db.execute(query)
+    return [dict(row) for row in result.mappings().all()]
+
+
+async def load_name_readings(db: AsyncSession) -> Dict[str, str]:
+    """
+    プロフィールDBの社員テーブルから、名前（空白除去）→ 読みがな の対応を取得
+    """
+    result = await db.execute(
+        select(Employee.name, Employee.kana).where(Employee.kana.isnot(None))
+    )
+    return {
+        name.replace(" ", "").replace("　", ""): kana
+        for name, kana in result.all()
+        if name
+    }
+
+
+async def refresh_member_index(
+    db: AsyncSession,
+    profile_db: Optional[AsyncSession] = None,
+    force: bool = False
+):
+    """
+    メンバー検索インデックスを必要に応じて差分更新・全件再構築する
+    """
+    def elapsed(since):
+        return float("inf") if since is None else time.monotonic() - since
+
+    if not force and elapsed(member_index.refreshed_at) < MEMBER_INDEX_REFRESH_SECONDS:
+        return
+
+    async with _member_index_lock:
+        if force or elapsed(member_index.rebuilt_at) >= MEMBER_INDEX_REBUILD_SECONDS:
+            if profile_db is not None:
+                member_index.set_readings(await load_name_readings(profile_db))
+            # 索引の構築はスレッドプールで行い、できあがったものに一度に差し替える
+            members = await load_team_members(db)
+            member_index.replace_with(await run_blocking(member_index.build, members))
+        elif elapsed(member_index.refreshed_at) >= MEMBER_INDEX_REFRESH_SECONDS:
+            member_index.add(await load_team_members(db, member_index.max_id))
+
+
+async def search_team_members(
+    db: AsyncSession,
+    profile_db: Optional[AsyncSession],
+    query: str,
+    limit: int = 20,
+    offset: int = 0
+):
+    """
+    メンバー名（漢字・かな・ローマ字）でチームメンバーを検索し、
+    (該当件数, スコア順のページ分の結果) を返す
+    """
+    await refresh_member_index(db, profile_db)
+    return member_index.search(query, limit=limit, offset=offset)
@@ -1,8 +1,9 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
 import os
 import urllib.parse
 from dotenv import load_dotenv
+from api.database_engine import create_engine_from_env
 load_dotenv()
 
 # docker-composeで db というサービス名を使っている場合
@@ -15,28 +16,46 @@ DB_USER = os.getenv("DB_USER")
 DB_PASSWORD = urllib.parse.quote_plus(os.getenv("DB_PASSWORD", ""))
 DB_NAME = os.getenv("DB_NAME")
 
-# SQL Server 用の接続URLを構築
-DATABASE_URL = (
+# SQL Server 用の接続URLを構築（DATABASE_URL を指定した場合はそちらを使う。ベンチマークの SQLite など）
+DATABASE_URL = os.getenv("DATABASE_URL") or (
     f"mssql+aioodbc://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
     "?driver=ODBC+Driver+18+for+SQL+Server&encrypt=yes&trust_server_certificate=yes"
 )
 
-# 非同期エンジンの作成
-engine = create_async_engine(DATABASE_URL, echo=True)
-
-# 非同期セッションのファクトリ
+# 非同期セッションのファクトリ（エンジンは get_engine() の初回呼び出しで作成して結び付ける）
 AsyncSessionLocal = sessionmaker(
-    bind=engine,
     class_=AsyncSession,
     expire_on_commit=False,
     autocommit=False,
     autoflush=False,
 )
 
+_engine = None
+
+
+def get_engine():
+    """
+    非同期エンジンを初回呼び出し時に作成して返す（プール設定は DB_POOL_SIZE などの環境変数で調整）。
+    import 時に DB ドライバーの読み込みやエンジンの作成をしないよう、起動処理（lifespan）から呼ぶ。
+    """
+    global _engine
+    if _engine is None:
+        _engine = create_engine_from_env(DATABASE_URL, prefix="DB_")
+        AsyncSessionLocal.configure(bind=_engine)
+    return _engine
+
+
+def __getattr__(name):
+    # 互換のため、from api.database import engine でも（その時点で作成して）取得できるようにする
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 # モデル用の Base クラス（継承元）
 Base = declarative_base()
 
 # FastAPI の依存関係でセッションを提供する関数
 async def get_db():
+    get_engine()
     async with AsyncSessionLocal() as session:
         yield session
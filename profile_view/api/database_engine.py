@@ -0,0 +1,200 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy import event, exc, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from api.metrics import record_sql
+
+logger = logging.getLogger(__name__)
+
+# メインDB・プロジェクトDB 共通のエンジン生成処理
+# 設定は環境変数から読み込む（prefix が "DB_" なら DB_POOL_SIZE など）
+#   {prefix}POOL_SIZE            常時保持する接続数（既定: 5）
+#   {prefix}MAX_OVERFLOW         pool_size を超えて一時的に張れる接続数（既定: 10）
+#   {prefix}POOL_TIMEOUT         接続取得の待ち時間上限・秒（既定: 30）
+#   {prefix}POOL_RECYCLE         接続を張り直す間隔・秒（既定: 1800。Azure SQL のアイドル切断対策）
+#   {prefix}POOL_PRE_PING        取得時に接続の生存確認をするか（既定: true）
+#   {prefix}STATEMENT_TIMEOUT    1クエリのタイムアウト・秒（既定: 0 = 無制限）
+#   {prefix}FAST_EXECUTEMANY     pyodbc の fast_executemany を使うか（既定: true）
+#   {prefix}ECHO                 SQL をログ出力するか（既定: false）
+#   {prefix}POOL_PREWARM         起動時にあらかじめ張っておく接続数（既定: 2。0 で無効）
+#   {prefix}PREWARM_TIMEOUT      起動時の接続の待ち時間上限・秒（既定: 30。Azure SQL の自動再開を待てる程度）
+
+
+def _env(prefix: str, name: str, default: str) -> str:
+    return os.getenv(f"{prefix}{name}", default)
+
+
+def _env_bool(prefix: str, name: str, default: bool) -> bool:
+    return _env(prefix, name, str(default)).lower() in ("1", "true", "yes", "on")
+
+
+def engine_settings(prefix: str) -> dict:
+    """
+    環境変数からエンジン・プール設定を読み込む。
+    """
+    return {
+        "pool_size": int(_env(prefix, "POOL_SIZE", "5")),
+        "max_overflow": int(_env(prefix, "MAX_OVERFLOW", "10")),
+        "pool_timeout": float(_env(prefix, "POOL_TIMEOUT", "30")),
+        "pool_recycle": int(_env(prefix, "POOL_RECYCLE", "1800")),
+        "pool_pre_ping": _env_bool(prefix, "POOL_PRE_PING", True),
+        "statement_timeout": int(_env(prefix, "STATEMENT_TIMEOUT", "0")),
+        "fast_executemany": _env_bool(prefix, "FAST_EXECUTEMANY", True),
+        "echo": _env_bool(prefix, "ECHO", False),
+        "pool_prewarm": int(_env(prefix, "POOL_PREWARM", "2")),
+        "prewarm_timeout": float(_env(prefix, "PREWARM_TIMEOUT", "30")),
+    }
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    接続取得（checkout）の待ち時間とタイムアウト回数を記録するコネクションプール。
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.wait_count = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.timeouts = 0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self._stats_lock:
+                self.wait_count += 1
+                self.wait_seconds_total += waited
+                self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+def instrument_engine(engine: AsyncEngine):
+    """
+    SQL の実行回数・実行時間・行数を、実行中のリクエストの計測（api.metrics）に加えるイベントフックを登録する。
+    """
+    # 開始時刻は文ごとの実行コンテキストに持たせる（接続ごとのスタックだと、失敗した文の分が残り続ける）
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._query_started = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._query_started
+        # SELECT の rowcount は -1 になるため、非同期アダプタが先読みした行数を使う
+        rows = cursor.rowcount
+        if rows is None or rows < 0:
+            rows = len(getattr(cursor, "_rows", None) or ())
+        record_sql(elapsed, rows)
+
+
+def create_engine_from_env(url: str, prefix: str) -> AsyncEngine:
+    """
+    接続URLと環境変数の設定から非同期エンジンを作成する。
+    """
+    settings = engine_settings(prefix)
+    kwargs = {
+        "echo": settings["echo"],
+        "pool_pre_ping": settings["pool_pre_ping"],
+        "pool_recycle": settings["pool_recycle"],
+    }
+    if not url.startswith("sqlite"):
+        kwargs.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings["pool_size"],
+            max_overflow=settings["max_overflow"],
+            pool_timeout=settings["pool_timeout"],
+        )
+    if url.startswith("mssql"):
+        # executemany（複数行INSERT）をまとめて送る
+        kwargs["fast_executemany"] = settings["fast_executemany"]
+    if url.startswith("sqlite"):
+        # SQLite にはスキーマがないため、モデルの dbo スキーマを外して扱う（ベンチマーク・テスト用）
+        kwargs["execution_options"] = {"schema_translate_map": {"dbo": None}}
+
+    engine = create_async_engine(url, **kwargs)
+    instrument_engine(engine)
+
+    statement_timeout = settings["statement_timeout"]
+    if statement_timeout > 0:
+        @event.listens_for(engine.sync_engine, "connect")
+        def set_statement_timeout(dbapi_connection, connection_record):
+            # aioodbc の接続の内側にある pyodbc 接続にクエリタイムアウトを設定
+            driver_connection = getattr(dbapi_connection, "driver_connection", dbapi_connection)
+            raw_connection = getattr(driver_connection, "_conn", driver_connection)
+            if hasattr(raw_connection, "timeout"):
+                raw_connection.timeout = statement_timeout
+
+    return engine
+
+
+def pool_stats(engine: AsyncEngine) -> dict:
+    """
+    コネクションプールの状態（使用中・オーバーフロー・待ち時間など）を返す。
+    """
+    pool = engine.pool
+    stats = {"pool_class": type(pool).__name__, "status": pool.status()}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+            max_overflow=pool._max_overflow,
+            timeout=pool.timeout(),
+        )
+    if isinstance(pool, InstrumentedQueuePool):
+        with pool._stats_lock:
+            stats.update(
+                wait_count=pool.wait_count,
+                wait_seconds_total=pool.wait_seconds_total,
+                wait_seconds_avg=pool.wait_seconds_total / pool.wait_count if pool.wait_count else 0.0,
+                wait_seconds_max=pool.wait_seconds_max,
+                timeouts=pool.timeouts,
+            )
+    return stats
+
+
+async def prewarm_pool(engine: AsyncEngine, prefix: str) -> int:
+    """
+    {prefix}POOL_PREWARM 本の接続を同時に張って SELECT 1 を実行し、プールに戻しておく。
+    最初のリクエストが接続の確立（TLS・認証・DB の再開待ち）を待たずに済むようにするため、起動時に呼ぶ。
+    失敗しても起動は止めず、張れた接続の数を返す。
+    """
+    settings = engine_settings(prefix)
+    count = settings["pool_prewarm"]
+    if count <= 0:
+        return 0
+
+    async def open_connection():
+        connection = await engine.connect()
+        try:
+            await connection.execute(text("SELECT 1"))
+        except BaseException:
+            await connection.close()
+            raise
+        return connection
+
+    results = await asyncio.gather(
+        *(asyncio.wait_for(open_connection(), settings["prewarm_timeout"]) for _ in range(count)),
+        return_exceptions=True,
+    )
+    connections = [result for result in results if not isinstance(result, BaseException)]
+    for connection in connections:
+        await connection.close()
+    failures = [result for result in results if isinstance(result, BaseException)]
+    if failures:
+        logger.warning("接続の事前確立に失敗しました (%s%d/%d): %r", prefix, len(failures), count, failures[0])
+    return len(connections)
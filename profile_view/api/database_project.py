@@ -1,8 +1,9 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
 import os
 import urllib.parse
 from dotenv import load_dotenv
+from api.database_engine import create_engine_from_env
 
 load_dotenv()
 
@@ -15,31 +16,49 @@ PROJECT_DB_PASSWORD = urllib.parse.quote_plus(
 PROJECT_DB_NAME = os.getenv(
     "PROJECT_DB_NAME", "db-project-management-dev-01")
 
-# プロジェクトデータベース用の接続URLを構築
-PROJECT_DATABASE_URL = (
+# プロジェクトデータベース用の接続URLを構築（PROJECT_DATABASE_URL を指定した場合はそちらを使う）
+PROJECT_DATABASE_URL = os.getenv("PROJECT_DATABASE_URL") or (
     f"mssql+aioodbc://{PROJECT_DB_USER}:{PROJECT_DB_PASSWORD}@"
     f"{PROJECT_DB_HOST}:{PROJECT_DB_PORT}/{PROJECT_DB_NAME}"
     "?driver=ODBC+Driver+18+for+SQL+Server&encrypt=yes&"
     "trust_server_certificate=yes"
 )
 
-# プロジェクトデータベース用非同期エンジンの作成
-project_engine = create_async_engine(PROJECT_DATABASE_URL, echo=True)
-
-# プロジェクトデータベース用非同期セッションのファクトリ
+# プロジェクトデータベース用非同期セッションのファクトリ（エンジンは get_project_engine() で結び付ける）
 AsyncProjectSessionLocal = sessionmaker(
-    bind=project_engine,
     class_=AsyncSession,
     expire_on_commit=False,
     autocommit=False,
     autoflush=False,
 )
 
+_project_engine = None
+
+
+def get_project_engine():
+    """
+    プロジェクトデータベース用の非同期エンジンを初回呼び出し時に作成して返す
+    （PROJECT_DB_POOL_SIZE などの環境変数で調整）。
+    """
+    global _project_engine
+    if _project_engine is None:
+        _project_engine = create_engine_from_env(PROJECT_DATABASE_URL, prefix="PROJECT_DB_")
+        AsyncProjectSessionLocal.configure(bind=_project_engine)
+    return _project_engine
+
+
+def __getattr__(name):
+    # 互換のため、from api.database_project import project_engine でも取得できるようにする
+    if name == "project_engine":
+        return get_project_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 # プロジェクトデータベース用の Base クラス
 ProjectBase = declarative_base()
 
 
 # FastAPI の依存関係でプロジェクトデータベースセッションを提供する関数
 async def get_project_db():
+    get_project_engine()
     async with AsyncProjectSessionLocal() as session:
         yield session
\ No newline at end of file
@@ -0,0 +1,89 @@
+from dataclasses import dataclass, field
+
+# 旧テーブルのカンマ区切り列と、社員ごとの一覧（子テーブル）の相互変換、および一覧の差分計算。
+# DB に依存しない処理だけをまとめている（書き込みは api.crud.child_lists）。
+
+
+@dataclass(frozen=True)
+class LegacyListFormat:
+    """
+    旧テーブルのカンマ区切り列と、子テーブルの行の対応。
+    - columns: {子テーブルの列名: 旧テーブルの列名}。各列の i 番目が i 件目の値
+    - key: 空なら要素ごと無視する列（フロントエンドと同じ扱い）
+    - nested: 値の中のカンマを別の文字で保存している列（案件の獲得スキルは '\\' 区切り）
+    """
+    model: type
+    columns: dict
+    key: str
+    nested: dict = field(default_factory=dict)
+
+    def split(self, row) -> list[dict]:
+        """
+        旧テーブルの1行を、子テーブルの行（position 順の dict のリスト）に分解する。
+        """
+        if row is None:
+            return []
+        values = {
+            name: (getattr(row, column, None) or "").split(",")
+            for name, column in self.columns.items()
+        }
+        items = []
+        for index in range(len(values[self.key])):
+            item = {}
+            for name, parts in values.items():
+                value = parts[index].strip() if index < len(parts) else ""
+                if name in self.nested:
+                    value = value.replace(self.nested[name], ",")
+                item[name] = value or None
+            if item[self.key]:
+                items.append(item)
+        return items
+
+    def _value(self, item, name):
+        return item.get(name) if isinstance(item, dict) else getattr(item, name, None)
+
+    def round_trips(self, items) -> bool:
+        """
+        join した値を split で元の行に戻せるか（区切りのカンマ・'\\' を値に含まないか）を返す。
+        """
+        for item in items:
+            for name in self.columns:
+                separator = self.nested.get(name, ",")
+                if separator in (self._value(item, name) or ""):
+                    return False
+        return True
+
+    def join(self, items) -> dict:
+        """
+        子テーブルの行を、旧テーブルのカンマ区切り列の値にまとめる（split の逆）。
+        """
+        def text(item, name):
+            value = self._value(item, name) or ""
+            if name in self.nested:
+                value = value.replace(",", self.nested[name])
+            return value
+
+        joined = {}
+        for name, column in self.columns.items():
+            values = [text(item, name) for item in items]
+            joined[column] = ",".join(values) if any(values) else None
+        return joined
+
+
+def diff_items(existing, items: list[dict], value_fields) -> tuple[list[dict], list[dict], int]:
+    """
+    既存の行（position 順）と新しい値のリストを position ごとに比べ、
+    (UPDATE する行, INSERT する行, 残す件数) を返す。残す件数以降の既存行は DELETE する。
+    値が変わっていない position には何もしないため、1件だけの変更は1行の UPDATE で済む。
+    """
+    updates = []
+    for row, values in zip(existing, items):
+        changed = {name: values.get(name) for name in value_fields if getattr(row, name) != values.get(name)}
+        if changed:
+            updates.append({"id": row.id, **changed})
+    inserts = [
+        {"position": position, **{name: values.get(name) for name in value_fields}}
+        for position, values in enumerate(items)
+        if position >= len(existing)
+    ]
+    return updates, inserts, len(items)
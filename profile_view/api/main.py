@@ -1,19 +1,172 @@
-from fastapi import FastAPI
-from api.routers import employee
-from api.routers import employment_history
-from api.routers import project_info
-from api.routers import insight_info
-from api.routers import skill_info
-from api.routers import private_info
-from api.routers import related_info
-from api.routers import operation_logs
-from api.routers import storage
-from api.routers import reset_image
-from api.routers import project_management
-
-from fastapi.middleware.cors import CORSMiddleware
-
-app = FastAPI()
+import asyncio
+import importlib
+import logging
+import os
+from contextlib import asynccontextmanager
+
+from api.startup import startup_profile
+
+with startup_profile.phase("import", "fastapi"):
+    from fastapi import FastAPI, Request
+    from fastapi.middleware.cors import CORSMiddleware
+
+with startup_profile.phase("import", "api (core)"):
+    from api.renditions import rendition_worker
+    from api.audit import audit_log_writer, current_operation_user, record_write
+    from api.crud.base import add_write_listener
+    from api.crud.changes import deleted_rows_pruner
+    from api.offload import LoopLagMiddleware, loop_lag_monitor, run_blocking, shutdown_executor
+    from api.metrics import MetricsMiddleware
+    from api.compression import CompressionMiddleware, compression_settings_from_env
+    from api.admission import AdmissionMiddleware, admission_settings_from_env
+    from api.database import get_engine
+    from api.database_project import get_project_engine
+    from api.database_engine import prewarm_pool
+
+logger = logging.getLogger(__name__)
+
+# 登録するルーター（この順に include する）
+ROUTER_MODULES = [
+    "employee",
+    "directory",
+    "employment_history",
+    "project_info",
+    "insight_info",
+    "skill_info",
+    "private_info",
+    "related_info",
+    "seminar_videos",
+    "employee_skills",
+    "employee_projects",
+    "operation_logs",
+    "storage",
+    "uploads",
+    "reset_image",
+    "project_management",
+    "profiles",
+    "search",
+    "changes",
+    "system",
+    "metrics",
+]
+# DISABLED_ROUTERS（カンマ区切り）で読み込みを省略できる、画面の表示に必須でないルーター
+OPTIONAL_ROUTERS = {"operation_logs", "project_management", "search", "changes", "system", "metrics"}
+
+
+def enabled_router_modules() -> list[str]:
+    disabled = {name.strip() for name in os.getenv("DISABLED_ROUTERS", "").split(",") if name.strip()}
+    required = disabled - OPTIONAL_ROUTERS
+    if required:
+        logger.warning("必須のルーターは無効にできません: %s", ", ".join(sorted(required)))
+    return [name for name in ROUTER_MODULES if name not in disabled or name not in OPTIONAL_ROUTERS]
+
+
+def load_routers(names) -> dict:
+    """
+    ルーターのモジュールを順に import し、{名前: APIRouter} を返す。モジュールごとの import 時間を記録する。
+    """
+    routers = {}
+    for name in names:
+        with startup_profile.phase("import", f"api.routers.{name}"):
+            routers[name] = importlib.import_module(f"api.routers.{name}").router
+    return routers
+
+
+routers = load_routers(enabled_router_modules())
+
+# 操作ログ: CRUD の書き込みをキューに積み、バックグラウンドでまとめて書き込む
+add_write_listener(record_write)
+
+
+def warm_storage_signer():
+    """
+    Azure SDK の import と接続文字列の解析を済ませておく（設定の誤りもここで起動時に検出する）。
+    """
+    from api.routers.storage import storage_account
+    import azure.storage.blob  # noqa: F401
+
+    storage_account()
+
+
+async def warm_people_index():
+    """
+    人物検索インデックスを起動直後にバックグラウンドで構築し、最初の検索で構築を待たないようにする。
+    """
+    from api.crud.people_search import refresh_people_index
+    from api.database import AsyncSessionLocal
+
+    try:
+        async with AsyncSessionLocal() as db:
+            await refresh_people_index(db)
+    except Exception:
+        logger.exception("人物検索インデックスの事前構築に失敗しました")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    起動・停止の処理。
+    起動時は DB エンジンを作成し、接続の事前確立（両 DB）と SAS 署名器の準備を並行して行ってから
+    バックグラウンドの仕組みを起動する。各段階の所要時間は startup_profile に記録する。
+    停止時は、処理待ちの縮小版生成と操作ログを片付けてから、オフロード用スレッドプールを閉じる。
+    """
+    with startup_profile.phase("init", "database engines"):
+        engine, project_engine = get_engine(), get_project_engine()
+
+    async def timed(name, awaitable):
+        async with startup_profile.async_phase("init", name):
+            return await awaitable
+
+    await asyncio.gather(
+        timed("prewarm main db", prewarm_pool(engine, "DB_")),
+        timed("prewarm project db", prewarm_pool(project_engine, "PROJECT_DB_")),
+        timed("storage signer", run_blocking(warm_storage_signer)),
+    )
+    with startup_profile.phase("init", "background workers"):
+        await loop_lag_monitor.start()
+        await rendition_worker.start()
+        await audit_log_writer.start()
+        if "changes" in routers:
+            await deleted_rows_pruner.start()
+
+    warm_up = asyncio.create_task(warm_people_index()) if "search" in routers else None
+    startup_profile.ready()
+    try:
+        yield
+    finally:
+        if warm_up is not None:
+            warm_up.cancel()
+            await asyncio.gather(warm_up, return_exceptions=True)
+        await deleted_rows_pruner.stop()
+        await audit_log_writer.stop()
+        await rendition_worker.stop()
+        await loop_lag_monitor.stop()
+        shutdown_executor()
+
+
+app = FastAPI(lifespan=lifespan)
+# イベントループの停止の検出（ルートの処理と同じタスクで動くよう、最も内側のミドルウェアにする）
+app.add_middleware(LoopLagMiddleware, monitor=loop_lag_monitor)
+# レスポンス本文の圧縮（計測の内側に置き、/metrics の転送量は圧縮後の値にする）
+app.add_middleware(CompressionMiddleware, **compression_settings_from_env())
+# 同時実行数の制限（DB のプール容量を超える分は順番待ちさせ、待ちきれない分は 503 で早く返す）
+# 計測の内側に置き、拒否したリクエストも /metrics に数える
+app.add_middleware(AdmissionMiddleware, **admission_settings_from_env())
+# ルートごとの応答時間・SQL 回数などの計測（Server-Timing ヘッダと GET /metrics）
+app.add_middleware(MetricsMiddleware)
+
+
+@app.middleware("http")
+async def set_operation_user(request: Request, call_next):
+    """
+    X-Operation-User ヘッダーの値を、操作ログに記録する操作ユーザーとして設定する。
+    """
+    token = current_operation_user.set(request.headers.get("X-Operation-User"))
+    try:
+        return await call_next(request)
+    finally:
+        current_operation_user.reset(token)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -23,16 +176,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-After-Id", "X-Next-Cursor"],
 )
 
-app.include_router(employee.router)
-app.include_router(employment_history.router)
-app.include_router(project_info.router)
-app.include_router(insight_info.router)
-app.include_router(skill_info.router)
-app.include_router(private_info.router)
-app.include_router(related_info.router)
-app.include_router(operation_logs.router)
-app.include_router(storage.router)
-app.include_router(reset_image.router)
-app.include_router(project_management.router)
+for router in routers.values():
+    app.include_router(router)
@@ -0,0 +1,205 @@
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+# リクエスト単位の性能計測
+# ルート（パスのテンプレート）ごとに、応答時間・SQL の実行回数・DB 時間・取得行数・レスポンスサイズを集計し、
+# Prometheus のテキスト形式（GET /metrics）で公開する。各レスポンスには Server-Timing ヘッダを付ける。
+# SQL の計測は database_engine.create_engine_from_env で各エンジンに登録するイベントフックから record_sql() を呼ぶ。
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+@dataclass
+class RequestStats:
+    """
+    1リクエストの間に実行した SQL の集計。
+    """
+    statements: int = 0
+    db_seconds: float = 0.0
+    rows: int = 0
+
+
+current_request_stats: ContextVar[RequestStats | None] = ContextVar("current_request_stats", default=None)
+
+
+def record_sql(elapsed: float, rows: int):
+    """
+    SQL 1文の実行を、実行中のリクエストの集計に加える（リクエスト外の実行は無視する）。
+    """
+    stats = current_request_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += elapsed
+        stats.rows += max(rows, 0)
+
+
+class Histogram:
+    """
+    ラベルの組ごとの累積ヒストグラム（Prometheus の histogram 型）。
+    """
+
+    def __init__(self, name: str, help: str, buckets):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        # ラベル → (バケットごとの件数, 合計, 件数)
+        self.values: dict[tuple, list] = {}
+
+    def observe(self, labels: tuple, value: float):
+        entry = self.values.get(labels)
+        if entry is None:
+            entry = self.values[labels] = [[0] * len(self.buckets), 0.0, 0]
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            entry[0][index] += 1
+        entry[1] += value
+        entry[2] += 1
+
+    def render(self, label_names) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in sorted(self.values.items()):
+            base = _labels(label_names, labels)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{{{base},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{base},le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{{{base}}} {total}")
+            lines.append(f"{self.name}_count{{{base}}} {count}")
+        return lines
+
+
+class CounterMetric:
+    """
+    ラベルの組ごとのカウンタ（Prometheus の counter 型）。
+    """
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.values: dict[tuple, float] = {}
+
+    def inc(self, labels: tuple, value: float = 1):
+        self.values[labels] = self.values.get(labels, 0) + value
+
+    def render(self, label_names) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{{{_labels(label_names, labels)}}} {value}")
+        return lines
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+class RequestMetrics:
+    """
+    ルートごとの集計をまとめて保持し、Prometheus のテキスト形式に変換する。
+    """
+
+    route_labels = ("method", "route")
+    status_labels = ("method", "route", "status")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = CounterMetric("http_requests_total", "Total HTTP requests.")
+        self.latency = Histogram(
+            "http_request_duration_seconds", "Request latency until the response body is sent.", LATENCY_BUCKETS
+        )
+        self.statements = Histogram(
+            "http_request_db_statements", "SQL statements executed per request.", STATEMENT_BUCKETS
+        )
+        self.db_time = Histogram(
+            "http_request_db_duration_seconds", "Time spent executing SQL per request.", LATENCY_BUCKETS
+        )
+        self.rows = CounterMetric("http_request_db_rows_total", "Rows returned or affected by SQL.")
+        self.size = Histogram("http_response_size_bytes", "Response body size.", SIZE_BUCKETS)
+
+    def observe(self, method: str, route: str, status: int, elapsed: float, stats: RequestStats, size: int):
+        labels = (method, route)
+        with self._lock:
+            self.requests.inc((method, route, str(status)))
+            self.latency.observe(labels, elapsed)
+            self.statements.observe(labels, stats.statements)
+            self.db_time.observe(labels, stats.db_seconds)
+            self.rows.inc(labels, stats.rows)
+            self.size.observe(labels, size)
+
+    def render(self) -> str:
+        with self._lock:
+            lines = self.requests.render(self.status_labels)
+            for metric in (self.latency, self.statements, self.db_time, self.rows, self.size):
+                lines += metric.render(self.route_labels)
+        return "\n".join(lines) + "\n"
+
+
+request_metrics = RequestMetrics()
+
+
+def route_template(scope) -> str:
+    """
+    ルーティング後の scope からパスのテンプレート（/employees/{id} など）を返す。
+    ラベルの種類が増えすぎないよう、どのルートにも一致しなかったものは "unmatched" にまとめる。
+    """
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def server_timing(elapsed: float, stats: RequestStats) -> str:
+    return (
+        f"app;dur={elapsed * 1000:.1f}, "
+        f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.statements} queries, {stats.rows} rows"'
+    )
+
+
+class MetricsMiddleware:
+    """
+    リクエストごとに計測を行う ASGI ミドルウェア。
+    Server-Timing ヘッダはレスポンスヘッダの送信時点までの値、
+    /metrics の集計は本文の送信完了までの値（ストリーミングの DB 時間も含む）で記録する。
+    """
+
+    def __init__(self, app, metrics: RequestMetrics = request_metrics, exclude_paths=("/metrics",)):
+        self.app = app
+        self.metrics = metrics
+        self.exclude_paths = set(exclude_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("path") in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        started = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(time.perf_counter() - started, stats).encode()))
+                message = {**message, "headers": headers}
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_request_stats.reset(token)
+            self.metrics.observe(
+                scope.get("method", ""), route_template(scope), status, time.perf_counter() - started, stats, size
+            )
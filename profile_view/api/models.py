@@ -1,9 +1,53 @@
-from sqlalchemy import Column, Integer, Unicode, Date
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, Integer, Unicode, Date, DateTime, Index, UniqueConstraint
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
 from api.database import Base
 
-class Employee(Base):
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class db_utcnow(FunctionElement):
+    """
+    DB サーバーの現在時刻（UTC）。SQL Server では SYSUTCDATETIME()。
+    """
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(db_utcnow, "mssql")
+def _compile_db_utcnow_mssql(element, compiler, **kw):
+    return "SYSUTCDATETIME()"
+
+
+@compiles(db_utcnow)
+def _compile_db_utcnow(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"
+
+
+class Versioned:
+    """
+    変更フィード（GET /changes）の対象テーブル。
+    行の作成・更新のたびに updated_at（UTC）を更新する。INSERT / UPDATE 文に列の指定がなければ自動で入る。
+    時刻は API サーバーごとの時計ではなく、文の実行時に DB で決める（SYSUTCDATETIME()）。
+    削除は deleted_rows に記録する（sql/004_change_feed.sql）。
+    """
+    updated_at = Column(DateTime, nullable=False, default=db_utcnow(), onupdate=db_utcnow(), index=True)
+    # DB で決まった updated_at を INSERT / UPDATE の RETURNING で受け取る（後から読むと非同期では遅延ロードになるため）
+    __mapper_args__ = {"eager_defaults": True}
+
+class Employee(Versioned, Base):
     __tablename__ = "employees"
-    __table_args__ = {"schema": "dbo"}
+    __table_args__ = (
+        # 社員一覧（GET /directory）の並び順ごとのカバリングインデックス（sql/003_employees_directory_indexes.sql）
+        Index("ix_employees_directory_employee_id", "employee_id", "id", mssql_include=["name", "kana", "photo_url"]),
+        Index("ix_employees_directory_name", "name", "id", mssql_include=["employee_id", "kana", "photo_url"]),
+        Index("ix_employees_directory_kana", "kana", "id", mssql_include=["employee_id", "name", "photo_url"]),
+        {"schema": "dbo"},
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     employee_id = Column(Integer, unique=True, nullable=False)
@@ -22,7 +66,7 @@ class Employee(Base):
 
 
 
-class EmploymentHistory(Base):
+class EmploymentHistory(Versioned, Base):
     __tablename__ = "employment_history"
     __table_args__ = {"schema": "dbo"}
 
@@ -37,21 +81,22 @@ class EmploymentHistory(Base):
 
 
 
-class ProjectInfo(Base):
+class ProjectInfo(Versioned, Base):
     __tablename__ = "project_info"
     __table_args__ = {"schema": "dbo"}
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     employee_id = Column(Integer, unique=True, nullable=False)
-    project = Column(Unicode(50))
-    skill = Column(Unicode(500))
-    comment = Column(Unicode(500))
-    start_date = Column(Unicode(100))
-    end_date = Column(Unicode(100))
+    # 一覧をカンマ区切りで詰めた旧列は、件数によって長さが決まらないため NVARCHAR(MAX)（sql/005_widen_legacy_list_columns.sql）
+    project = Column(Unicode)
+    skill = Column(Unicode)
+    comment = Column(Unicode)
+    start_date = Column(Unicode)
+    end_date = Column(Unicode)
 
 
 
-class InsightInfo(Base):
+class InsightInfo(Versioned, Base):
     __tablename__ = "insight_info"
     __table_args__ = {"schema": "dbo"}
 
@@ -63,17 +108,18 @@ class InsightInfo(Base):
 
 
 
-class SkillInfo(Base):
+class SkillInfo(Versioned, Base):
     __tablename__ = "skill_info"
     __table_args__ = {"schema": "dbo"}
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     employee_id = Column(Integer, unique=True, nullable=False)
-    skill = Column(Unicode(500))
+    # 一覧をカンマ区切りで詰めた旧列は、件数によって長さが決まらないため NVARCHAR(MAX)（sql/005_widen_legacy_list_columns.sql）
+    skill = Column(Unicode)
 
 
 
-class PrivateInfo(Base):
+class PrivateInfo(Versioned, Base):
     __tablename__ = "private_info"
     __table_args__ = {"schema": "dbo"}
 
@@ -102,7 +148,7 @@ class PrivateInfo(Base):
 
 
 
-class RelatedInfo(Base):
+class RelatedInfo(Versioned, Base):
     __tablename__ = "related_info"
     __table_args__ = {"schema": "dbo"}
 
@@ -110,19 +156,92 @@ class RelatedInfo(Base):
     employee_id = Column(Integer, unique=True, nullable=False)
     profile_video = Column(Unicode(500))
     profile_thumbnail_url = Column(Unicode(500))
-    seminar_videos = Column(Unicode(500))
-    seminar_thumbnail_url = Column(Unicode(500))
+    # 一覧をカンマ区切りで詰めた旧列は、件数によって長さが決まらないため NVARCHAR(MAX)（sql/005_widen_legacy_list_columns.sql）
+    seminar_videos = Column(Unicode)
+    seminar_thumbnail_url = Column(Unicode)
 
 
 
 class OperationLogs(Base):
     __tablename__ = "operation_logs"
-    __table_args__ = {"schema": "dbo"}
+    # 社員ごとに複数の操作を記録するため employee_id は一意にしない（sql/001_operation_logs_audit.sql）
+    __table_args__ = (
+        Index("ix_operation_logs_employee_id_datetime", "employee_id", "operation_datetime"),
+        Index("ix_operation_logs_target", "target_table", "target_id"),
+        {"schema": "dbo"},
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    employee_id = Column(Integer, unique=True, nullable=False)
+    employee_id = Column(Integer, nullable=False)
     target_table = Column(Unicode(20))
     target_id = Column(Integer)
     operation_type = Column(Unicode(20))
     operation_user = Column(Unicode(100))
-    operation_datetime = Column(Date)
+    operation_datetime = Column(DateTime)
+
+
+
+# 1人の社員に複数行ある一覧（position で順序を持つ。sql/002_child_list_tables.sql）
+
+class SeminarVideo(Versioned, Base):
+    __tablename__ = "seminar_videos"
+    __table_args__ = (
+        UniqueConstraint("employee_id", "position", name="uq_seminar_videos_employee_position"),
+        {"schema": "dbo"},
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    employee_id = Column(Integer, nullable=False)
+    position = Column(Integer, nullable=False)
+    video_url = Column(Unicode(500))
+    thumbnail_url = Column(Unicode(500))
+
+
+
+class EmployeeSkill(Versioned, Base):
+    __tablename__ = "employee_skills"
+    __table_args__ = (
+        UniqueConstraint("employee_id", "position", name="uq_employee_skills_employee_position"),
+        {"schema": "dbo"},
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    employee_id = Column(Integer, nullable=False)
+    position = Column(Integer, nullable=False)
+    skill = Column(Unicode(100), nullable=False)
+
+
+
+class EmployeeProject(Versioned, Base):
+    __tablename__ = "employee_projects"
+    __table_args__ = (
+        UniqueConstraint("employee_id", "position", name="uq_employee_projects_employee_position"),
+        {"schema": "dbo"},
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    employee_id = Column(Integer, nullable=False)
+    position = Column(Integer, nullable=False)
+    project = Column(Unicode(50))
+    skill = Column(Unicode(500))
+    comment = Column(Unicode(500))
+    start_date = Column(Unicode(100))
+    end_date = Column(Unicode(100))
+
+
+
+class DeletedRow(Base):
+    """
+    変更フィード用の削除の記録（トゥームストーン）。削除と同じトランザクションで書き込む。
+    """
+    __tablename__ = "deleted_rows"
+    __table_args__ = (
+        Index("ix_deleted_rows_deleted_at", "deleted_at", "id"),
+        {"schema": "dbo"},
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    table_name = Column(Unicode(50), nullable=False)
+    row_id = Column(Integer, nullable=False)
+    employee_id = Column(Integer)
+    deleted_at = Column(DateTime, nullable=False, default=db_utcnow())
@@ -0,0 +1,207 @@
+import asyncio
+import contextvars
+import functools
+import logging
+import os
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# イベントループを塞ぐ同期処理（署名・大きな一覧のシリアライズ・画像処理など）をスレッドプールに逃がす仕組みと、
+# イベントループの停止（ラグ）を検出して原因のルートを記録するモニター。
+#   OFFLOAD_MAX_WORKERS        スレッドプールのスレッド数（既定: min(8, CPU数 + 4)）
+#   OFFLOAD_MIN_ITEMS          run_blocking_for でスレッドに逃がす最小件数（既定: 200）
+#   LOOP_LAG_INTERVAL_MS       ループの遅延を測る間隔・ミリ秒（既定: 50）
+#   LOOP_LAG_THRESHOLD_MS      停止として記録する遅延・ミリ秒（既定: 100）
+
+OFFLOAD_MIN_ITEMS = int(os.getenv("OFFLOAD_MIN_ITEMS", "200"))
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    オフロード用のスレッドプールを初回利用時に作成して返す。
+    asyncio の既定のプール（DB ドライバーや Blob SDK の I/O が使う）とは分けておく。
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                max_workers = int(os.getenv("OFFLOAD_MAX_WORKERS", str(min(8, (os.cpu_count() or 1) + 4))))
+                _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="offload")
+    return _executor
+
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+
+
+async def run_blocking(func, *args, **kwargs):
+    """
+    同期関数をオフロード用のスレッドプールで実行し、結果を待つ。
+    contextvars（操作ユーザーなど）は呼び出し元のものを引き継ぐ。
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(get_executor(), functools.partial(context.run, func, *args, **kwargs))
+
+
+async def run_blocking_for(count: int, func, *args, **kwargs):
+    """
+    処理する件数が OFFLOAD_MIN_ITEMS 以上ならスレッドプールで、少なければその場で実行する。
+    （少量ならスレッド切り替えのほうが高くつくため）
+    """
+    if count >= OFFLOAD_MIN_ITEMS:
+        return await run_blocking(func, *args, **kwargs)
+    return func(*args, **kwargs)
+
+
+def offload(func):
+    """
+    同期関数を、スレッドプールで実行する async 関数に変えるデコレータ。
+
+        @offload
+        def render(data): ...
+
+        image = await render(data)
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run_blocking(func, *args, **kwargs)
+
+    return wrapper
+
+
+def describe_scope(scope) -> str:
+    """
+    ASGI の scope から「メソッド ルート」の形の文字列を作る（ルーティング後ならパスのテンプレートを使う）。
+    """
+    route = scope.get("route")
+    path = getattr(route, "path", None) or scope.get("path", "")
+    return f"{scope.get('method', '')} {path}".strip()
+
+
+class LoopLagMonitor:
+    """
+    イベントループの停止を検出するモニター。
+
+    - ループ上のハートビートが interval ごとに起き、予定より threshold 以上遅れたら停止として記録する
+    - 監視スレッドがハートビートの途絶えを検知し、その時点でループが実行中のタスクから原因のルートを特定する
+      （タスクとリクエストの対応は LoopLagMiddleware が登録する）
+    """
+
+    def __init__(self, interval: float = 0.05, threshold: float = 0.1, history: int = 50):
+        self.interval = interval
+        self.threshold = threshold
+        self.active: dict[asyncio.Task, dict] = {}
+        self.stalls = 0
+        self.max_lag_ms = 0.0
+        self.recent = deque(maxlen=history)
+        self.by_route: Counter = Counter()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task | None = None
+        self._thread: threading.Thread | None = None
+        self._stopped = threading.Event()
+        self._beat = time.monotonic()
+        self._suspect: str | None = None
+
+    def _route_of(self, task) -> str | None:
+        scope = self.active.get(task)
+        return describe_scope(scope) if scope is not None else None
+
+    async def _heartbeat(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            self._beat = expected
+            await asyncio.sleep(self.interval)
+            lag = time.monotonic() - expected
+            if lag >= self.threshold:
+                self._record(lag)
+
+    def _record(self, lag: float):
+        route = self._suspect
+        self._suspect = None
+        if route is None:
+            # 監視スレッドが特定できなかった場合は、実行中だったリクエストを候補として残す
+            routes = sorted({describe_scope(scope) for scope in list(self.active.values())})
+            route = " | ".join(routes) if routes else None
+        lag_ms = lag * 1000
+        self.stalls += 1
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+        self.by_route[route or "(unknown)"] += 1
+        self.recent.append({"lag_ms": round(lag_ms, 1), "route": route, "at": time.time()})
+        logger.warning("イベントループが %.0f ms 停止しました (route: %s)", lag_ms, route or "不明")
+
+    def _watch(self):
+        # ハートビートが threshold 以上途絶えたら、ループで実行中のタスクを調べる
+        while not self._stopped.wait(self.interval):
+            if self._suspect is None and time.monotonic() - self._beat >= self.threshold:
+                task = asyncio.current_task(self._loop) if self._loop is not None else None
+                if task is not None:
+                    self._suspect = self._route_of(task)
+
+    async def start(self):
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-lag-monitor", daemon=True)
+        self._thread.start()
+
+    async def stop(self):
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def metrics(self) -> dict:
+        return {
+            "interval_ms": self.interval * 1000,
+            "threshold_ms": self.threshold * 1000,
+            "stalls": self.stalls,
+            "max_lag_ms": round(self.max_lag_ms, 1),
+            "by_route": dict(self.by_route.most_common(20)),
+            "recent": list(self.recent),
+            "in_flight": len(self.active),
+        }
+
+
+class LoopLagMiddleware:
+    """
+    リクエストを処理しているタスクを LoopLagMonitor に登録する ASGI ミドルウェア。
+    ルートの処理と同じタスクで動くよう、他のミドルウェアより内側（先に add_middleware）に置く。
+    """
+
+    def __init__(self, app, monitor: "LoopLagMonitor"):
+        self.app = app
+        self.monitor = monitor
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        task = asyncio.current_task()
+        self.monitor.active[task] = scope
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.monitor.active.pop(task, None)
+
+
+loop_lag_monitor = LoopLagMonitor(
+    interval=float(os.getenv("LOOP_LAG_INTERVAL_MS", "50")) / 1000,
+    threshold=float(os.getenv("LOOP_LAG_THRESHOLD_MS", "100")) / 1000,
+)
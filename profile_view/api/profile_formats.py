@@ -0,0 +1,173 @@
+import codecs
+import csv
+import io
+import json
+import re
+
+from pydantic import ValidationError
+
+from api.schemas import (
+    ProfileCreate,
+    EmployeeCreate,
+    EmploymentHistoryUpdate,
+    ProjectInfoUpdate,
+    InsightInfoUpdate,
+    SkillInfoUpdate,
+    PrivateInfoUpdate,
+    RelatedInfoUpdate,
+)
+
+# プロフィールの一括取り込み・書き出し（/profiles/import, /profiles/export）のファイル形式
+# - NDJSON: 1行に1人分の ProfileCreate（POST /profiles と同じ形）。一覧（セミナー動画など）も含められる
+# - CSV:    1行に1人分。列名は「セクション.列名」（例: employee.name, private_info.hobbies）
+#           一覧は旧テーブルのカンマ区切り列（related_info.seminar_videos など）から作る
+# アップロードは届いた分から1行ずつ取り出すため、ファイル全体をメモリに載せない。
+
+# CSV のセクションと、列の定義に使うスキーマ（POST /profiles で受け付ける列と同じ）
+CSV_SECTIONS = {
+    "employee": EmployeeCreate,
+    "employment_history": EmploymentHistoryUpdate,
+    "project_info": ProjectInfoUpdate,
+    "insight_info": InsightInfoUpdate,
+    "skill_info": SkillInfoUpdate,
+    "private_info": PrivateInfoUpdate,
+    "related_info": RelatedInfoUpdate,
+}
+CSV_COLUMNS = [f"{section}.{name}" for section, schema in CSV_SECTIONS.items() for name in schema.model_fields]
+
+_QUOTE_OR_NEWLINE = re.compile(r'["\n]')
+
+
+class CsvRecordSplitter:
+    """
+    CSV のテキストを届いた分ずつ受け取り、完結したレコード（引用符内の改行を含んでもよい）を返す。
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.in_quotes = False
+        self.scanned = 0
+
+    def feed(self, text: str) -> list[str]:
+        self.buffer += text
+        records = []
+        start = 0
+        for match in _QUOTE_OR_NEWLINE.finditer(self.buffer, self.scanned):
+            if match.group() == '"':
+                # 引用符内の "" は開いて閉じるのと同じなので、反転だけで判定できる
+                self.in_quotes = not self.in_quotes
+            elif not self.in_quotes:
+                records.append(self.buffer[start:match.end()])
+                start = match.end()
+        self.buffer = self.buffer[start:]
+        self.scanned = len(self.buffer)
+        return records
+
+    def finish(self) -> list[str]:
+        rest, self.buffer, self.scanned = self.buffer, "", 0
+        return [rest] if rest.strip() else []
+
+
+class LineSplitter:
+    """
+    NDJSON のテキストを届いた分ずつ受け取り、完結した行を返す。
+    """
+
+    def __init__(self):
+        self.buffer = ""
+
+    def feed(self, text: str) -> list[str]:
+        self.buffer += text
+        *lines, self.buffer = self.buffer.split("\n")
+        return lines
+
+    def finish(self) -> list[str]:
+        rest, self.buffer = self.buffer, ""
+        return [rest]
+
+
+def csv_row_to_profile(header: list[str], values: list[str]) -> dict:
+    """
+    CSV の1行を ProfileCreate の形の dict にする。空欄は None とし、全列が空のセクションは省く。
+    """
+    profile = {}
+    for column, value in zip(header, values):
+        section, name = column.split(".", 1)
+        profile.setdefault(section, {})[name] = value if value != "" else None
+    return {
+        section: fields
+        for section, fields in profile.items()
+        if section == "employee" or any(value is not None for value in fields.values())
+    }
+
+
+def profile_to_csv_row(profile: dict) -> list:
+    """
+    プロフィール（セクション名 → 行のオブジェクトまたは None）を CSV_COLUMNS の順の値のリストにする。
+    """
+    values = []
+    for section, schema in CSV_SECTIONS.items():
+        row = profile.get(section)
+        for name in schema.model_fields:
+            value = getattr(row, name, None) if row is not None else None
+            values.append("" if value is None else value.isoformat() if hasattr(value, "isoformat") else value)
+    return values
+
+
+def validation_errors(error: ValidationError) -> list[dict]:
+    """
+    ValidationError を、行ごとのエラーとして返す形（列の位置とメッセージ）にする。
+    """
+    return [
+        {"loc": ".".join(str(part) for part in item["loc"]), "message": item["msg"]}
+        for item in error.errors()
+    ]
+
+
+async def iter_profile_records(chunks, format: str):
+    """
+    アップロードの本文（バイト列の非同期イテレータ）から、(行番号, ProfileCreate またはエラーのリスト) を順に返す。
+    行番号はファイル上の行（CSV はヘッダを1行目とする）。CSV のヘッダに不明な列があれば ValueError を送出する。
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    splitter = CsvRecordSplitter() if format == "csv" else LineSplitter()
+    header = None
+    line = 0
+
+    def parse(record: str):
+        nonlocal header, line
+        start = line + 1
+        line += max(1, record.count("\n"))
+        if format != "csv":
+            if not record.strip():
+                return None
+            try:
+                return start, ProfileCreate.model_validate(json.loads(record))
+            except json.JSONDecodeError as e:
+                return start, [{"loc": "", "message": f"Invalid JSON: {e.msg}"}]
+            except ValidationError as e:
+                return start, validation_errors(e)
+
+        values = next(csv.reader(io.StringIO(record)), None)
+        if not values:
+            return None
+        if header is None:
+            header = [column.strip() for column in values]
+            unknown = [column for column in header if column not in CSV_COLUMNS]
+            if unknown:
+                raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+            return None
+        try:
+            return start, ProfileCreate.model_validate(csv_row_to_profile(header, values))
+        except ValidationError as e:
+            return start, validation_errors(e)
+
+    async for chunk in chunks:
+        for record in splitter.feed(decoder.decode(chunk)):
+            parsed = parse(record)
+            if parsed is not None:
+                yield parsed
+    for record in splitter.feed(decoder.decode(b"", final=True)) + splitter.finish():
+        parsed = parse(record)
+        if parsed is not None:
+            yield parsed
@@ -0,0 +1,204 @@
+import asyncio
+import io
+import logging
+import os
+import time
+
+from api.blob_backend import get_blob_backend
+from api.offload import run_blocking
+
+logger = logging.getLogger(__name__)
+
+# プロフィール写真・動画サムネイルの縮小版（rendition）を生成するパイプライン
+# 元画像（コンテナ直下）から、幅ごとに再エンコードした画像を renditions/{サイズ}/{元の Blob 名}.{拡張子} に保存する。
+# 元の拡張子も名前に残す（photo.png と photo.jpg の縮小版が同じ名前にならないように）。
+#   RENDITION_FORMAT       webp（既定） / jpeg
+#   RENDITION_QUEUE_SIZE   生成待ちキューの上限（既定: 1000）
+#   RENDITION_WORKERS      同時に処理するワーカー数（既定: 2）
+
+# サイズ名 → 幅(px)
+RENDITION_SIZES = {
+    "thumb": 128,
+    "small": 320,
+    "medium": 800,
+}
+
+RENDITION_PREFIX = "renditions/"
+
+_CONTENT_TYPES = {"webp": "image/webp", "jpeg": "image/jpeg"}
+
+
+def rendition_name(blob_name: str, size: str, fmt: str | None = None) -> str:
+    """
+    元の Blob 名とサイズ名から、rendition の Blob 名を返す（例: photo.png → renditions/thumb/photo.png.webp）。
+    """
+    fmt = fmt or os.getenv("RENDITION_FORMAT", "webp").lower()
+    extension = "jpg" if fmt == "jpeg" else fmt
+    return f"{RENDITION_PREFIX}{size}/{blob_name}.{extension}"
+
+
+def render_rendition(data: bytes, width: int, fmt: str) -> bytes:
+    """
+    画像を幅 width 以下に縮小し、指定形式（webp / jpeg）で再エンコードする。
+    Pillow が必要。CPU を使うため、run_blocking でスレッドプールから呼ぶこと。
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.width > width:
+            image.thumbnail((width, image.height * width // image.width or 1), Image.LANCZOS)
+
+        output = io.BytesIO()
+        if fmt == "jpeg":
+            image.convert("RGB").save(output, "JPEG", quality=82, optimize=True, progressive=True)
+        else:
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA")
+            image.save(output, "WEBP", quality=80, method=4)
+        return output.getvalue()
+
+
+class RenditionRegistry:
+    """
+    生成済み rendition の Blob 名の集合。
+    他のレプリカで生成された分も反映するため、一定間隔で Blob の一覧を取り直す。
+    """
+
+    def __init__(self, backend_factory, refresh_seconds: float = 300):
+        self.backend_factory = backend_factory
+        self.refresh_seconds = refresh_seconds
+        self.names: set[str] = set()
+        self.loaded_at: float | None = None
+        self._lock = asyncio.Lock()
+
+    async def ensure_loaded(self):
+        if self.loaded_at is not None and time.monotonic() - self.loaded_at < self.refresh_seconds:
+            return
+        async with self._lock:
+            if self.loaded_at is not None and time.monotonic() - self.loaded_at < self.refresh_seconds:
+                return
+            try:
+                self.names = set(await self.backend_factory().list_names(RENDITION_PREFIX))
+            except Exception as e:
+                # 一覧が取れなくても元画像の URL で応答できるので、ここでは失敗させない
+                logger.warning("rendition の一覧取得に失敗しました: %s", e)
+            self.loaded_at = time.monotonic()
+
+    def add(self, name: str):
+        self.names.add(name)
+
+    def has(self, name: str) -> bool:
+        return name in self.names
+
+
+class RenditionWorker:
+    """
+    アップロード後の元画像から rendition を生成するバックグラウンドワーカー。
+    enqueue() で Blob 名を受け付け、キューから取り出して生成・アップロードする。
+    """
+
+    def __init__(self, backend_factory, registry: RenditionRegistry, sizes=None, fmt=None,
+                 queue_size: int = 1000, concurrency: int = 2):
+        self.backend_factory = backend_factory
+        self.registry = registry
+        self.sizes = sizes or RENDITION_SIZES
+        self.fmt = fmt or os.getenv("RENDITION_FORMAT", "webp").lower()
+        self.queue_size = queue_size
+        self.concurrency = concurrency
+        self._queue: asyncio.Queue | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._pending: set[str] = set()
+        self._backend = None
+        self.processed = 0
+        self.failed = 0
+        self.dropped = 0
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = self.backend_factory()
+        return self._backend
+
+    def _ensure_queue(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+        return self._queue
+
+    def enqueue(self, blob_name: str, on_complete=None) -> bool:
+        """
+        rendition の生成を予約する。同じ Blob が処理待ちなら何もしない。
+        キューが満杯の場合は False を返す（元画像はそのまま使えるため、リクエストは失敗させない）。
+        on_complete には生成完了後に呼ぶ非同期関数（キャッシュの無効化など）を指定できる。
+        """
+        if not blob_name or blob_name in self._pending:
+            return True
+        try:
+            self._ensure_queue().put_nowait((blob_name, on_complete))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        self._pending.add(blob_name)
+        return True
+
+    async def process(self, blob_name: str):
+        """
+        1つの元画像から全サイズの rendition を生成してアップロードする。
+        """
+        data = await self.backend.download(blob_name)
+        for size, width in self.sizes.items():
+            rendered = await run_blocking(render_rendition, data, width, self.fmt)
+            name = rendition_name(blob_name, size, self.fmt)
+            await self.backend.upload(name, rendered, _CONTENT_TYPES.get(self.fmt))
+            self.registry.add(name)
+
+    async def _run(self):
+        queue = self._ensure_queue()
+        while True:
+            blob_name, on_complete = await queue.get()
+            try:
+                await self.process(blob_name)
+                self.processed += 1
+                if on_complete is not None:
+                    await on_complete()
+            except Exception as e:
+                self.failed += 1
+                logger.warning("rendition の生成に失敗しました (%s): %s", blob_name, e)
+            finally:
+                self._pending.discard(blob_name)
+                queue.task_done()
+
+    async def start(self):
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+
+    async def stop(self, drain: bool = True):
+        """
+        ワーカーを停止する。drain=True の場合は処理待ちのものを片付けてから止める。
+        """
+        if drain and self._queue is not None and self._tasks:
+            await self._queue.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def metrics(self) -> dict:
+        return {
+            "format": self.fmt,
+            "sizes": self.sizes,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "processed": self.processed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "known_renditions": len(self.registry.names),
+        }
+
+
+rendition_registry = RenditionRegistry(get_blob_backend)
+rendition_worker = RenditionWorker(
+    get_blob_backend,
+    rendition_registry,
+    queue_size=int(os.getenv("RENDITION_QUEUE_SIZE", "1000")),
+    concurrency=int(os.getenv("RENDITION_WORKERS", "2")),
+)
@@ -0,0 +1,200 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# GET レスポンスの読み取りキャッシュ
+# キーは「テーブル名 + id」（単一取得）または「テーブル名 + 世代 + クエリ」（一覧など）。
+# 書き込み時は invalidate() で該当 id のキーを削除し、テーブルの世代を進めて一覧系をまとめて無効化する。
+# バックエンドは環境変数で切り替える。
+#   RESPONSE_CACHE_BACKEND       memory（既定） / redis / none
+#   RESPONSE_CACHE_TTL_SECONDS   キャッシュの有効期間・秒（既定: 60）
+#   RESPONSE_CACHE_MAXSIZE       memory の最大件数（既定: 10000）
+#   REDIS_URL                    redis の接続先（例: redis://localhost:6379/0）
+
+
+class MemoryCacheBackend:
+    """
+    プロセス内の LRU + TTL キャッシュ。
+    """
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, tuple[object, float]] = OrderedDict()
+        # 世代カウンタは期限切れ・LRU の対象外にするため、値とは別に持つ
+        # （追い出されて 0 に戻ると、古い世代のキャッシュが再び当たってしまう）
+        self._counters: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    async def get(self, key: str):
+        with self._lock:
+            if key in self._counters:
+                return self._counters[key]
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    async def set(self, key: str, value, ttl: float):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    async def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    async def incr(self, key: str) -> int:
+        with self._lock:
+            value = self._counters.get(key, 0) + 1
+            self._counters[key] = value
+            return value
+
+
+class RedisCacheBackend:
+    """
+    Redis 互換クライアント（redis.asyncio.Redis など）を使うキャッシュ。
+    get / set(ex=) / delete / incr を持つオブジェクトであれば、ローカル用のフェイクにも差し替えられる。
+    """
+
+    def __init__(self, client, prefix: str = "profile-api:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key: str):
+        raw = await self.client.get(self.prefix + key)
+        return None if raw is None else json.loads(raw)
+
+    async def set(self, key: str, value, ttl: float):
+        await self.client.set(self.prefix + key, json.dumps(value, ensure_ascii=False), ex=max(1, int(ttl)))
+
+    async def delete(self, *keys: str):
+        if keys:
+            await self.client.delete(*(self.prefix + key for key in keys))
+
+    async def incr(self, key: str) -> int:
+        return int(await self.client.incr(self.prefix + key))
+
+
+class NullCacheBackend:
+    """
+    キャッシュを無効にするためのバックエンド（常にミス）。
+    """
+
+    async def get(self, key: str):
+        return None
+
+    async def set(self, key: str, value, ttl: float):
+        pass
+
+    async def delete(self, *keys: str):
+        pass
+
+    async def incr(self, key: str) -> int:
+        return 0
+
+
+class ResponseCache:
+    """
+    テーブル単位で無効化できる読み取りキャッシュ。
+    値は JSON 化できる形（スキーマで model_dump したもの）で保存する。
+    """
+
+    def __init__(self, backend, ttl_seconds: float = 60):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+    async def generation(self, table: str) -> int:
+        """
+        テーブルの現在の世代。DB から読む前に取得し、set_query / set_item に渡す。
+        """
+        return int(await self.backend.get(f"{table}:gen") or 0)
+
+    def _count(self, value):
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def get_item(self, table: str, id):
+        return self._count(await self.backend.get(f"{table}:item:{id}"))
+
+    async def set_item(self, table: str, id, value, generation: int):
+        """
+        generation（DB から読む前に取得した世代）から書き込みで世代が進んでいれば保存しない。
+        保存の直後にも世代を確かめ、保存と無効化が行き違った場合は削除する
+        （invalidate は世代を進めてから削除するため、どちらかで必ず古い値が消える）。
+        """
+        key = f"{table}:item:{id}"
+        if await self.generation(table) != generation:
+            return
+        await self.backend.set(key, value, self.ttl_seconds)
+        if await self.generation(table) != generation:
+            await self.backend.delete(key)
+
+    async def get_query(self, table: str, query: str, generation: int):
+        return self._count(await self.backend.get(f"{table}:query:{generation}:{query}"))
+
+    async def set_query(self, table: str, query: str, value, generation: int, ttl: float | None = None):
+        """
+        generation には DB から読む前に取得した世代を渡す。読んでいる間に書き込みがあっても、
+        古い結果は古い世代のキーに入るだけで、以後のリクエストには返らない。
+        ttl を指定すると、既定の有効期間の代わりに使う（書き込みで無効化できない外部データを含む場合など）。
+        """
+        await self.backend.set(
+            f"{table}:query:{generation}:{query}", value, self.ttl_seconds if ttl is None else ttl
+        )
+
+    async def invalidate(self, table: str, id=None):
+        """
+        テーブルへの書き込み後に呼ぶ。一覧系のキャッシュを無効化し、id の単一取得キャッシュを削除する。
+        """
+        await self.backend.incr(f"{table}:gen")
+        if id is not None:
+            await self.backend.delete(f"{table}:item:{id}")
+
+    def metrics(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+def create_response_cache_from_env() -> ResponseCache:
+    """
+    環境変数の設定からキャッシュを作成する。
+    """
+    backend_name = os.getenv("RESPONSE_CACHE_BACKEND", "memory").lower()
+    ttl_seconds = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "60"))
+
+    if backend_name == "redis":
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("RESPONSE_CACHE_BACKEND=redis には redis パッケージが必要です。")
+        backend = RedisCacheBackend(redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0")))
+    elif backend_name == "none":
+        backend = NullCacheBackend()
+    else:
+        backend = MemoryCacheBackend(maxsize=int(os.getenv("RESPONSE_CACHE_MAXSIZE", "10000")))
+
+    return ResponseCache(backend, ttl_seconds=ttl_seconds)
+
+
+response_cache = create_response_cache_from_env()
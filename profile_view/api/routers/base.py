@@ -1,8 +1,239 @@
-from fastapi import APIRouter, Depends, HTTPException
+import hashlib
+from types import SimpleNamespace
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Type
+from typing import Literal, Type
+from urllib.parse import urlencode
 from pydantic import BaseModel
-from api.database import get_db
+from api.database import get_db, AsyncSessionLocal
+from api.crud.profiles import PROFILE_MODELS
+from api.crud.child_lists import CHILD_LIST_CRUDS
+from api.response_cache import response_cache
+from api.offload import run_blocking_for
+from api.serialization import dumps, dump_rows, row_to_dict
+
+# /profiles の集約レスポンスに含まれるテーブル
+PROFILE_TABLES = {
+    "employees",
+    *(model.__tablename__ for model in PROFILE_MODELS.values()),
+    *(crud.model.__tablename__ for crud in CHILD_LIST_CRUDS.values()),
+}
+
+
+class ListParams:
+    """
+    一覧取得（GET /）で共通に使うクエリパラメータ。
+    - after_id / limit: キーセットページング（id 昇順で after_id より後を limit 件）
+    - fields: 取得する列（カンマ区切り）。SQL の SELECT 列として使う
+    - stream: ndjson / json を指定すると 1行ずつストリーミングで返す（全件エクスポート用）
+    - それ以外でモデルの列名と一致するパラメータ: 等価フィルタ（値が '*' で終わると前方一致）
+    """
+
+    reserved = {"after_id", "limit", "fields", "stream"}
+
+    def __init__(
+        self,
+        request: Request,
+        after_id: int | None = Query(None, description="この id より後のデータを取得"),
+        limit: int | None = Query(None, ge=1, le=1000, description="取得件数の上限"),
+        fields: str | None = Query(None, description="取得する列（カンマ区切り）"),
+        stream: Literal["ndjson", "json"] | None = Query(None, description="ストリーミング形式"),
+    ):
+        self.after_id = after_id
+        self.limit = limit
+        self.stream = stream
+        self.fields = [name.strip() for name in fields.split(",") if name.strip()] if fields else None
+        self.query_params = request.query_params
+
+    def filters_for(self, model) -> dict:
+        """
+        クエリパラメータのうち、モデルの列名と一致するものをフィルタ条件として返す。
+        """
+        columns = model.__table__.columns
+        return {
+            key: value
+            for key, value in self.query_params.items()
+            if key not in self.reserved and key in columns
+        }
+
+
+async def fetch_list(crud_instance, db: AsyncSession, params: ListParams):
+    """
+    ListParams に従って一覧を取得する。
+    """
+    try:
+        return await crud_instance.get_all(
+            db,
+            after_id=params.after_id,
+            limit=params.limit,
+            fields=params.fields,
+            filters=params.filters_for(crud_instance.model),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def dump(schema_out: Type[BaseModel], item) -> dict:
+    """
+    ORM オブジェクトなどをスキーマの列だけを持つ dict に変換する（serialization.row_to_dict）。
+    """
+    return row_to_dict(schema_out, item)
+
+
+def dump_entry(schema_out: Type[BaseModel], items, headers: dict | None = None) -> dict:
+    """
+    行のリストを JSON のバイト列にシリアライズし、cache_entry の形にまとめる。
+    件数が多いと重い（シリアライズ・ETag の計算）ため、run_blocking_for から呼ぶ。
+    """
+    return cache_entry(dump_rows(schema_out, items), headers)
+
+
+def make_etag(content: bytes) -> str:
+    """
+    シリアライズ済みのレスポンス本文から強い ETag を計算する。
+    """
+    return '"' + hashlib.sha256(content).hexdigest()[:32] + '"'
+
+
+def cache_entry(body, headers: dict | None = None) -> dict:
+    """
+    キャッシュに保存する形（シリアライズ済みの本文・ETag・追加ヘッダ）にまとめる。
+    body は JSON 互換の値か、シリアライズ済みのバイト列。シリアライズと ETag の計算は保存時に1回だけ行う。
+    本文は Redis にも JSON で保存できるよう文字列で持つ。
+    """
+    content = body if isinstance(body, bytes) else dumps(body)
+    return {"content": content.decode("utf-8"), "etag": make_etag(content), "headers": headers or {}}
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    If-None-Match ヘッダに etag（または *）が含まれているかを判定する。
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def conditional_response(request: Request, entry: dict) -> Response:
+    """
+    cache_entry の内容を返す。本文はシリアライズ済みのものをそのまま送る。
+    If-None-Match が ETag と一致すれば本文を送らず 304 を返す。
+    """
+    headers = {"ETag": entry["etag"], "Cache-Control": "private, no-cache", **entry["headers"]}
+    if etag_matches(request, entry["etag"]):
+        return Response(status_code=304, headers=headers)
+    return Response(entry["content"], media_type="application/json", headers=headers)
+
+
+async def invalidate_cache(table: str, id=None):
+    """
+    書き込み後に呼び、テーブルの読み取りキャッシュを無効化する。
+    プロフィールを構成するテーブルなら /profiles のキャッシュもあわせて無効化する。
+    """
+    await response_cache.invalidate(table, id)
+    if table in PROFILE_TABLES:
+        await response_cache.invalidate("profiles")
+
+
+async def cached_list(
+    crud_instance, schema_out: Type[BaseModel], db: AsyncSession, params: ListParams, transform=None
+) -> dict:
+    """
+    fetch_list の結果を、テーブル名 + クエリパラメータをキーにキャッシュし、cache_entry の形で返す。
+    limit 件ちょうど取得できた場合は、次ページ用の after_id を X-Next-After-Id ヘッダで返す。
+    transform には取得した行のリストを受け取る非同期関数（SAS署名など）を指定できる。
+    """
+    table = crud_instance.model.__tablename__
+    key = urlencode(sorted(params.query_params.multi_items()))
+    # 世代は DB から読む前に1回だけ取得する（読んでいる間の書き込みで古い結果が新しい世代に入らないように）
+    generation = await response_cache.generation(table)
+    entry = await response_cache.get_query(table, key, generation)
+    if entry is None:
+        items = await fetch_list(crud_instance, db, params)
+        headers = {}
+        if params.limit is not None and len(items) == params.limit:
+            headers["X-Next-After-Id"] = str(items[-1].id)
+        if transform is not None:
+            await transform(items)
+        entry = await run_blocking_for(len(items), dump_entry, schema_out, items, headers)
+        await response_cache.set_query(table, key, entry, generation)
+    return entry
+
+
+async def cached_item(
+    crud_instance, schema_out: Type[BaseModel], db: AsyncSession, id: int, transform=None, variant: str | None = None
+):
+    """
+    id による単一取得の結果をキャッシュし、cache_entry の形で返す。
+    該当なしの場合は None を返す（キャッシュしない）。
+    variant には、同じ id でも内容が変わるパラメータ（画像サイズなど）を指定する。
+    """
+    table = crud_instance.model.__tablename__
+    generation = await response_cache.generation(table)
+    if variant:
+        # 派生形は一覧と同じく世代で無効化する
+        key = f"id={id}&{variant}"
+        entry = await response_cache.get_query(table, key, generation)
+    else:
+        entry = await response_cache.get_item(table, id)
+    if entry is not None:
+        return entry
+    item = await crud_instance.get(db, "id", id)
+    if not item:
+        return None
+    if transform is not None:
+        await transform([item])
+    entry = cache_entry(dump(schema_out, item))
+    if variant:
+        await response_cache.set_query(table, key, entry, generation)
+    else:
+        await response_cache.set_item(table, id, entry, generation)
+    return entry
+
+
+def stream_list(crud_instance, schema_out: Type[BaseModel], params: ListParams, transform=None):
+    """
+    ListParams に従って一覧を NDJSON（1行1件）または JSON 配列としてストリーミングで返す。
+    サーバーサイドカーソルから一定件数ずつ読み出してはシリアライズして送るため、
+    テーブルの大きさに関係なくメモリ使用量は一定で、最初のバイトもすぐに返る。
+    transform には読み出した行のリストを受け取る非同期関数（SAS署名など）を指定できる。
+    """
+    try:
+        crud_instance.columns(params.fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    filters = params.filters_for(crud_instance.model)
+
+    def serialize(item) -> bytes:
+        return dumps(row_to_dict(schema_out, item))
+
+    def serialize_chunk(items, first: bool) -> bytes:
+        if params.stream == "json":
+            chunk = b",".join(serialize(item) for item in items)
+            return chunk if first else b"," + chunk
+        return b"".join(serialize(item) + b"\n" for item in items)
+
+    async def body():
+        # レスポンス送信中も使えるよう、セッションはジェネレータ内で開く
+        async with AsyncSessionLocal() as db:
+            first = True
+            if params.stream == "json":
+                yield b"["
+            async for items in crud_instance.stream_all(
+                db, after_id=params.after_id, limit=params.limit, fields=params.fields, filters=filters
+            ):
+                if transform is not None:
+                    await transform(items)
+                yield await run_blocking_for(len(items), serialize_chunk, items, first)
+                first = False
+            if params.stream == "json":
+                yield b"]"
+
+    media_type = "application/json" if params.stream == "json" else "application/x-ndjson"
+    return StreamingResponse(body(), media_type=media_type)
 
 
 def generate_crud_router(
@@ -15,25 +246,34 @@ def generate_crud_router(
     schema_create: Type[BaseModel] | None = None,
 ):
     router = APIRouter(prefix=prefix, tags=tags)
+    table = crud_instance.model.__tablename__
 
-    # GET / → 全件取得
-    @router.get("/", response_model=list[schema_out])
-    async def read_all(db: AsyncSession = Depends(get_db)):
-        return await crud_instance.get_all(db)
+    # GET / → 全件取得（ページング・列指定・フィルタ対応）
+    @router.get("/", response_model=list[schema_out], response_model_exclude_unset=True)
+    async def read_all(
+        request: Request,
+        params: ListParams = Depends(),
+        db: AsyncSession = Depends(get_db),
+    ):
+        if params.stream:
+            return stream_list(crud_instance, schema_out, params)
+        return conditional_response(request, await cached_list(crud_instance, schema_out, db, params))
 
     # GET /{id} → 単一取得
     @router.get("/{id}", response_model=schema_out)
-    async def read_one(id: int, db: AsyncSession = Depends(get_db)):
-        item = await crud_instance.get(db, "id", id)
-        if not item:
+    async def read_one(id: int, request: Request, db: AsyncSession = Depends(get_db)):
+        entry = await cached_item(crud_instance, schema_out, db, id)
+        if not entry:
             raise HTTPException(status_code=404, detail=f"{prefix.strip('/').capitalize()} not found")
-        return item
+        return conditional_response(request, entry)
 
     # POST / → 作成（schema_createが指定されている場合は必ず作成）
     if schema_create is not None:
         @router.post("/", response_model=schema_out)
         async def create(item: schema_create, db: AsyncSession = Depends(get_db)):
-            return await crud_instance.create(db, item.dict())
+            created = await crud_instance.create(db, item.dict())
+            await invalidate_cache(table, created.id)
+            return created
 
     # PUT /{id} → 更新
     @router.put("/{id}", response_model=schema_out)
@@ -41,6 +281,7 @@ def generate_crud_router(
         updated = await crud_instance.update(db, "id", id, update.dict(exclude_unset=True))
         if not updated:
             raise HTTPException(status_code=404, detail=f"{prefix.strip('/').capitalize()} not found")
+        await invalidate_cache(table, id)
         return updated
 
     # DELETE /{id} → 削除（常に有効）
@@ -49,6 +290,81 @@ def generate_crud_router(
         success = await crud_instance.delete(db, "id", id)
         if not success:
             raise HTTPException(status_code=404, detail=f"{prefix.strip('/').capitalize()} not found")
+        await invalidate_cache(table, id)
         return {"detail": f"{prefix.strip('/').capitalize()} deleted"}
 
-    return router
\ No newline at end of file
+    return router
+
+
+def generate_child_list_router(
+    *,
+    prefix: str,
+    tags: list[str],
+    schema_out: Type[BaseModel],
+    schema_update: Type[BaseModel],
+    crud_instance,
+    transform=None,
+):
+    """
+    社員ごとの一覧（OrderedChildCRUD）のルーターを生成する。パスの employee_id は社員番号。
+    - GET    /{employee_id}             一覧を position 順に取得
+    - PUT    /{employee_id}             一覧全体を置き換え（変わった position だけを書き込む）
+    - PUT    /{employee_id}/{position}  1件だけ部分更新
+    - DELETE /{employee_id}/{position}  1件だけ削除（後ろは詰める）
+    transform には行のリストを受け取る非同期関数（SAS署名など）を指定でき、GET と同じく書き込みの応答にも適用する。
+    """
+    router = APIRouter(prefix=prefix, tags=tags)
+    table = crud_instance.model.__tablename__
+    name = prefix.strip('/').capitalize()
+
+    async def transformed(rows):
+        # ORM の行を書き換えるとセッションの変更として追跡されるため、コピーに対して適用する
+        if transform is None:
+            return rows
+        rows = [SimpleNamespace(**row_to_dict(schema_out, row)) for row in rows]
+        await transform(rows)
+        return rows
+
+    async def invalidate(legacy_row):
+        await invalidate_cache(table)
+        if legacy_row is not None:
+            await invalidate_cache(legacy_row.__tablename__, legacy_row.id)
+
+    @router.get("/{employee_id}", response_model=list[schema_out])
+    async def read_list(employee_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+        key = f"employee_id={employee_id}"
+        generation = await response_cache.generation(table)
+        entry = await response_cache.get_query(table, key, generation)
+        if entry is None:
+            items = await transformed(await crud_instance.load(db, employee_id))
+            entry = dump_entry(schema_out, items)
+            await response_cache.set_query(table, key, entry, generation)
+        return conditional_response(request, entry)
+
+    @router.put("/{employee_id}", response_model=list[schema_out])
+    async def replace_list(employee_id: int, items: list[schema_update], db: AsyncSession = Depends(get_db)):
+        rows, legacy_row = await crud_instance.replace(db, employee_id, [item.dict() for item in items])
+        await invalidate(legacy_row)
+        return await transformed(rows)
+
+    @router.put("/{employee_id}/{position}", response_model=list[schema_out])
+    async def update_item(
+        employee_id: int, position: int, update: schema_update, db: AsyncSession = Depends(get_db)
+    ):
+        result = await crud_instance.set_item(db, employee_id, position, update.dict(exclude_unset=True))
+        if result is None:
+            raise HTTPException(status_code=404, detail=f"{name} not found")
+        rows, legacy_row = result
+        await invalidate(legacy_row)
+        return await transformed(rows)
+
+    @router.delete("/{employee_id}/{position}", response_model=list[schema_out])
+    async def delete_item(employee_id: int, position: int, db: AsyncSession = Depends(get_db)):
+        result = await crud_instance.delete_item(db, employee_id, position)
+        if result is None:
+            raise HTTPException(status_code=404, detail=f"{name} not found")
+        rows, legacy_row = result
+        await invalidate(legacy_row)
+        return await transformed(rows)
+
+    return router
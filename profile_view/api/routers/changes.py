@@ -0,0 +1,97 @@
+import base64
+import json
+from datetime import datetime, timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.database import get_db
+from api.schemas import ChangeEntry, ChangesResponse
+from api.crud.changes import (
+    CHANGE_MODELS,
+    CHANGES_RETENTION_DAYS,
+    CHANGES_SAFETY_SECONDS,
+    SOURCES,
+    db_now,
+    get_changes,
+)
+from api.models import DeletedRow
+
+router = APIRouter(prefix="/changes", tags=["changes"])
+
+
+def encode_token(token) -> str:
+    """
+    (時刻, ソース, id) を base64url の文字列にする。変更がまだない場合は空のトークン。
+    """
+    if token is None:
+        return ""
+    changed_at, source, id = token
+    raw = json.dumps([changed_at.isoformat(), source, id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_token(token: str | None):
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        changed_at, source, id = json.loads(raw)
+        changed_at = datetime.fromisoformat(changed_at)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid token")
+    if source not in SOURCES or not isinstance(id, int):
+        raise HTTPException(status_code=400, detail="Invalid token")
+    return changed_at, source, id
+
+
+def change_entry(changed_at, source, id, row) -> ChangeEntry:
+    if source == DeletedRow.__tablename__:
+        return ChangeEntry(
+            table=row.table_name, operation="delete", id=row.row_id, employee_id=row.employee_id, changed_at=changed_at
+        )
+    columns = CHANGE_MODELS[source].__table__.columns
+    return ChangeEntry(
+        table=source,
+        operation="upsert",
+        id=id,
+        employee_id=row.employee_id,
+        changed_at=changed_at,
+        row={column.name: getattr(row, column.name) for column in columns},
+    )
+
+
+# 変更フィード（GET /changes）
+@router.get("/", response_model=ChangesResponse)
+async def read_changes(
+    since: str | None = Query(None, description="前回のレスポンスの next（省略時は最初から）"),
+    tables: str | None = Query(None, description="対象テーブル（カンマ区切り。省略時はプロフィールの全テーブル）"),
+    limit: int = Query(500, ge=1, le=5000),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    since 以降に作成・更新・削除された行を、時刻順に返す。
+    作成・更新は operation=upsert と変更後の行、削除は operation=delete と id（トゥームストーン）で返す。
+    has_more が true の間は next を since に渡して続きを取得する。
+    削除の記録の保持期間（CHANGES_RETENTION_DAYS）より古い since は 410 を返すので、全件を取り直すこと。
+    """
+    token = decode_token(since)
+    now = await db_now(db)
+    if token is not None and (now - token[0]).total_seconds() > CHANGES_RETENTION_DAYS * 86400:
+        raise HTTPException(status_code=410, detail="Token expired; resync from the beginning")
+
+    table_names = None
+    if tables:
+        table_names = [name.strip() for name in tables.split(",") if name.strip()]
+        unknown = [name for name in table_names if name not in CHANGE_MODELS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown tables: {', '.join(unknown)}")
+
+    changes, next_token, has_more = await get_changes(
+        db, token, limit, table_names, until=now - timedelta(seconds=CHANGES_SAFETY_SECONDS)
+    )
+    return ChangesResponse(
+        changes=[change_entry(*change) for change in changes],
+        next=encode_token(next_token),
+        has_more=has_more,
+    )
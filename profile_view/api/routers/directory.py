@@ -0,0 +1,119 @@
+import base64
+import json
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.database import get_db, AsyncSessionLocal
+from api.schemas import DirectoryEntry
+from api.crud.employees import get_directory, stream_directory
+from api.response_cache import response_cache
+from api.routers.base import conditional_response, dump_entry
+from api.routers.employee import PhotoSize, sign_photo_urls
+from api.offload import run_blocking_for
+from api.serialization import dumps, row_to_dict
+
+router = APIRouter(prefix="/directory", tags=["directory"])
+
+DirectorySort = Literal["employee_id", "-employee_id", "name", "-name", "kana", "-kana"]
+
+
+def encode_cursor(item, sort: str) -> str:
+    """
+    ページの最後の行から、次ページ用のカーソル（(並び順の列の値, id) の JSON を base64url にしたもの）を作る。
+    """
+    raw = json.dumps([getattr(item, sort), item.id], ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str | None, sort: str):
+    """
+    encode_cursor で作ったカーソルを (値, id) に戻す。不正なカーソルは 400 にする。
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value, id = json.loads(raw)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    expected = int if sort == "employee_id" else str
+    if not isinstance(id, int) or not (value is None or isinstance(value, expected)):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return value, id
+
+
+async def sign_directory_photos(items, photo_size: str | None, photos: bool):
+    if photos:
+        await sign_photo_urls(items, size=photo_size)
+    else:
+        for item in items:
+            item.photo_url = None
+    return items
+
+
+# 社員一覧（GET /directory）
+@router.get("/", response_model=list[DirectoryEntry])
+async def read_directory(
+    request: Request,
+    sort: DirectorySort = Query("employee_id", description="並び順（先頭に - を付けると降順）"),
+    after: str | None = Query(None, description="前ページの X-Next-Cursor の値"),
+    limit: int | None = Query(None, ge=1, le=1000, description="取得件数の上限（省略時は全件をストリーミング）"),
+    photos: bool = Query(True, description="写真のURLを返すか"),
+    photo_size: PhotoSize | None = Query("thumb", description="写真の縮小版サイズ"),
+    stream: Literal["ndjson", "json"] = Query("json", description="全件取得時のストリーミング形式"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    一覧画面用に、社員の要約（id・社員番号・氏名・かな・写真）だけを返す。
+    - limit を指定すると1ページ分をキャッシュ・ETag 付きで返し、続きがあれば X-Next-Cursor ヘッダを返す
+    - limit を省略すると全件をサーバーサイドカーソルから順に読み、ストリーミングで返す
+    並び順ごとのカバリングインデックス（ix_employees_directory_*）だけで読めるよう、列は固定している。
+    """
+    descending = sort.startswith("-")
+    column = sort.lstrip("-")
+    cursor = decode_cursor(after, column)
+
+    if limit is None:
+        return stream_directory_response(column, descending, cursor, photo_size, photos, stream)
+
+    # 社員テーブルの書き込みで一緒に無効化されるよう、employees の世代でキャッシュする
+    key = f"directory:{request.url.query}"
+    generation = await response_cache.generation("employees")
+    entry = await response_cache.get_query("employees", key, generation)
+    if entry is None:
+        items = await get_directory(db, column, descending, cursor, limit)
+        headers = {}
+        if len(items) == limit:
+            headers["X-Next-Cursor"] = encode_cursor(items[-1], column)
+        await sign_directory_photos(items, photo_size, photos)
+        entry = await run_blocking_for(len(items), dump_entry, DirectoryEntry, items, headers)
+        await response_cache.set_query("employees", key, entry, generation)
+    return conditional_response(request, entry)
+
+
+def stream_directory_response(sort, descending, cursor, photo_size, photos, stream):
+    def serialize_chunk(items, first: bool) -> bytes:
+        rows = [dumps(row_to_dict(DirectoryEntry, item)) for item in items]
+        if stream == "json":
+            chunk = b",".join(rows)
+            return chunk if first else b"," + chunk
+        return b"".join(row + b"\n" for row in rows)
+
+    async def body():
+        # レスポンス送信中も使えるよう、セッションはジェネレータ内で開く
+        async with AsyncSessionLocal() as db:
+            first = True
+            if stream == "json":
+                yield b"["
+            async for items in stream_directory(db, sort, descending, cursor):
+                await sign_directory_photos(items, photo_size, photos)
+                yield await run_blocking_for(len(items), serialize_chunk, items, first)
+                first = False
+            if stream == "json":
+                yield b"]"
+
+    media_type = "application/json" if stream == "json" else "application/x-ndjson"
+    return StreamingResponse(body(), media_type=media_type)
@@ -1,63 +1,120 @@
-import os
-from fastapi import APIRouter, Depends, HTTPException
+from functools import partial
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.database import get_db
+from api.routers.base import (
+    ListParams,
+    stream_list,
+    cached_list,
+    cached_item,
+    conditional_response,
+    invalidate_cache,
+)
 from api.schemas import EmployeeCreate, EmployeeUpdate, EmployeeOut
 from api.crud.employees import employee_crud
-# ★ storage.pyからヘルパー関数をインポート
-from api.routers.storage import generate_read_sas_url
+# ★ storage.pyから署名器をインポート
+from api.routers.storage import read_url_signer, blob_name_from_url
+from api.renditions import rendition_name, rendition_registry, rendition_worker
 
 router = APIRouter(prefix="/employees", tags=["employees"])
 
 
-# 全件取得（GET /employees）
-@router.get("/", response_model=list[EmployeeOut])
-async def read_employees(db: AsyncSession = Depends(get_db)):
-    employees_from_db = await employee_crud.get_all(db)
+PhotoSize = Literal["thumb", "small", "medium"]
+
+
+def photo_blob_name(photo_url: str, size: str | None = None) -> str:
+    """
+    photo_url から署名する Blob 名を決める。
+    size が指定され、そのサイズの rendition が生成済みであれば rendition の Blob 名を返す。
+    """
+    blob_name = blob_name_from_url(photo_url)
+    if blob_name and size:
+        name = rendition_name(blob_name, size)
+        if rendition_registry.has(name):
+            return name
+    return blob_name
+
+
+async def sign_photo_urls(employees, size: str | None = None):
+    """
+    各従業員のphoto_urlを、読み取り用SAS付きURLにまとめて変換する。
+    size を指定すると、生成済みであればそのサイズの rendition の URL を返す。
+    """
+    if size:
+        await rendition_registry.ensure_loaded()
+    # DBに保存されたURLからファイル名のみを抽出し、一括で署名
+    # fields 指定で photo_url を取得していない場合は対象外
+    targets = [employee for employee in employees if getattr(employee, "photo_url", None)]
+    sas_urls = await read_url_signer.sign_many_async(
+        photo_blob_name(employee.photo_url, size) for employee in targets
+    )
+    for employee, sas_url in zip(targets, sas_urls):
+        employee.photo_url = sas_url
+    return employees
 
-    # ★★★★★ ここから修正 ★★★★★
-    # 各従業員のphoto_urlをSAS付きURLに変換
-    for employee in employees_from_db:
-        if employee.photo_url:
-            # DBに保存されたURLからファイル名のみを抽出
-            blob_name = os.path.basename(employee.photo_url)
-            # 読み取り用SAS付きURLを生成して上書き
-            employee.photo_url = generate_read_sas_url(blob_name)
-    # ★★★★★ ここまで修正 ★★★★★
 
-    return employees_from_db
+# 全件取得（GET /employees）
+@router.get("/", response_model=list[EmployeeOut], response_model_exclude_unset=True)
+async def read_employees(
+    request: Request,
+    params: ListParams = Depends(),
+    photo_size: PhotoSize | None = Query(None, description="写真の縮小版サイズ（一覧のアバター表示には thumb）"),
+    db: AsyncSession = Depends(get_db),
+):
+    transform = partial(sign_photo_urls, size=photo_size)
+    if params.stream:
+        return stream_list(employee_crud, EmployeeOut, params, transform=transform)
+    # 各従業員のphoto_urlをSAS付きURLに変換した結果をキャッシュ
+    entry = await cached_list(employee_crud, EmployeeOut, db, params, transform=transform)
+    return conditional_response(request, entry)
 
 
 # 特定の社員情報を取得（GET /employees/{id}）
 @router.get("/{id}", response_model=EmployeeOut)
-async def read_employee(id: int, db: AsyncSession = Depends(get_db)):
-    employee = await employee_crud.get(db, "id", id)
-    if not employee:
+async def read_employee(
+    id: int,
+    request: Request,
+    photo_size: PhotoSize | None = Query(None, description="写真の縮小版サイズ"),
+    db: AsyncSession = Depends(get_db),
+):
+    entry = await cached_item(
+        employee_crud,
+        EmployeeOut,
+        db,
+        id,
+        transform=partial(sign_photo_urls, size=photo_size),
+        variant=f"photo_size={photo_size}" if photo_size else None,
+    )
+    if not entry:
         raise HTTPException(status_code=404, detail="Employee not found")
-
-    # ★★★★★ ここから修正 ★★★★★
-    # photo_urlが存在すれば、SAS付きURLに変換
-    if employee.photo_url:
-        blob_name = os.path.basename(employee.photo_url)
-        employee.photo_url = generate_read_sas_url(blob_name)
-    # ★★★★★ ここまで修正 ★★★★★
-
-    return employee
+    return conditional_response(request, entry)
 
 
 # 新規作成（POST /employees）
 @router.post("/", response_model=EmployeeOut)
 async def create_employee(employee: EmployeeCreate, db: AsyncSession = Depends(get_db)):
-    return await employee_crud.create(db, employee.dict())
+    created = await employee_crud.create(db, employee.dict())
+    await invalidate_cache("employees", created.id)
+    return created
 
 
 # 更新（PUT /employees/{id}）
 @router.put("/{id}", response_model=EmployeeOut)
 async def update_employee(id: int, update: EmployeeUpdate, db: AsyncSession = Depends(get_db)):
-    updated = await employee_crud.update(db, "id", id, update.dict(exclude_unset=True))
+    obj_in = update.dict(exclude_unset=True)
+    updated = await employee_crud.update(db, "id", id, obj_in)
     if not updated:
         raise HTTPException(status_code=404, detail="Employee not found")
+    await invalidate_cache("employees", id)
+    # 写真が差し替えられた場合は縮小版を生成（完了後にキャッシュを無効化して縮小版の URL を返すようにする）
+    if obj_in.get("photo_url"):
+        rendition_worker.enqueue(
+            blob_name_from_url(updated.photo_url),
+            on_complete=partial(invalidate_cache, "employees", id),
+        )
     return updated
 
 
@@ -67,4 +124,5 @@ async def delete_employee(id: int, db: AsyncSession = Depends(get_db)):
     success = await employee_crud.delete(db, "id", id)
     if not success:
         raise HTTPException(status_code=404, detail="Employee not found")
+    await invalidate_cache("employees", id)
     return {"detail": "Employee deleted"}
\ No newline at end of file
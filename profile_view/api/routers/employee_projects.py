@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+from api.schemas import EmployeeProjectOut, EmployeeProjectUpdate
+from api.crud.child_lists import employee_projects_crud
+from api.routers.base import generate_child_list_router
+
+router: APIRouter = generate_child_list_router(
+    prefix="/employee_projects",
+    tags=["employee_projects"],
+    schema_out=EmployeeProjectOut,
+    schema_update=EmployeeProjectUpdate,
+    crud_instance=employee_projects_crud,
+)
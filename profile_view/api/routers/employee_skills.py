@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+from api.schemas import EmployeeSkillOut, EmployeeSkillUpdate
+from api.crud.child_lists import employee_skills_crud
+from api.routers.base import generate_child_list_router
+
+router: APIRouter = generate_child_list_router(
+    prefix="/employee_skills",
+    tags=["employee_skills"],
+    schema_out=EmployeeSkillOut,
+    schema_update=EmployeeSkillUpdate,
+    crud_instance=employee_skills_crud,
+)
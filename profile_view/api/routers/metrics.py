@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from api.metrics import request_metrics
+
+router = APIRouter(tags=["metrics"])
+
+
+# Prometheus 形式の性能メトリクス（GET /metrics）
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def read_metrics():
+    """
+    ルートごとの応答時間・SQL 実行回数・DB 時間・取得行数・レスポンスサイズを Prometheus のテキスト形式で返す。
+    """
+    return PlainTextResponse(request_metrics.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,200 @@
+import csv
+import io
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.database import get_db, AsyncSessionLocal
+from api.schemas import (
+    ProfileCreate,
+    ProfileOut,
+    ProfileImportResult,
+    EmployeeOut,
+    EmploymentHistoryOut,
+    ProjectInfoOut,
+    InsightInfoOut,
+    SkillInfoOut,
+    PrivateInfoOut,
+    RelatedInfoOut,
+    SeminarVideoOut,
+    EmployeeSkillOut,
+    EmployeeProjectOut,
+)
+from api.crud.profiles import get_profile, create_profile, delete_profile, PROFILE_MODELS
+from api.crud.child_lists import CHILD_LIST_CRUDS
+from api.crud.profile_bulk import import_profiles, stream_profiles
+from api.profile_formats import CSV_COLUMNS, iter_profile_records, profile_to_csv_row
+from api.response_cache import response_cache
+from api.routers.base import dump, cache_entry, conditional_response, invalidate_cache
+from api.routers.employee import sign_photo_urls
+from api.routers.related_info import sign_thumbnail_urls
+from api.offload import run_blocking_for
+from api.serialization import dumps, row_to_dict
+
+router = APIRouter(prefix="/profiles", tags=["profiles"])
+
+# 書き出し（NDJSON）の各セクションのスキーマ（GET /profiles/{id} と同じ形）
+EXPORT_SECTIONS = {
+    "employee": EmployeeOut,
+    "employment_history": EmploymentHistoryOut,
+    "project_info": ProjectInfoOut,
+    "insight_info": InsightInfoOut,
+    "skill_info": SkillInfoOut,
+    "private_info": PrivateInfoOut,
+    "related_info": RelatedInfoOut,
+}
+EXPORT_LISTS = {
+    "seminar_videos": SeminarVideoOut,
+    "employee_skills": EmployeeSkillOut,
+    "employee_projects": EmployeeProjectOut,
+}
+
+# 取り込みの Content-Type と形式の対応（format パラメータを省略した場合に使う）
+IMPORT_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/json-seq": "ndjson",
+}
+
+
+# 一括書き出し（GET /profiles/export）
+@router.get("/export")
+async def export_profiles(format: Literal["ndjson", "csv"] = Query("ndjson", description="書き出す形式")):
+    """
+    全社員のプロフィールを employees.id 順にストリーミングで書き出す。
+    - ndjson: 1行に1人分（GET /profiles/{id} と同じ形。一覧を含む）。そのまま /profiles/import に渡せる
+    - csv:    1行に1人分（列は「セクション.列名」。一覧は旧テーブルのカンマ区切り列）。Excel で開けるよう BOM 付き
+    サーバーサイドカーソルから一定人数ずつ読んでは送るため、全件をメモリに載せない。
+    写真・サムネイルの URL は SAS を付けず、保存されている値のまま書き出す。
+    """
+
+    def serialize_chunk(profiles) -> bytes:
+        if format == "csv":
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(profile_to_csv_row(profile) for profile in profiles)
+            return buffer.getvalue().encode("utf-8")
+        lines = []
+        for profile in profiles:
+            record = {
+                key: row_to_dict(schema, profile[key]) if profile[key] is not None else None
+                for key, schema in EXPORT_SECTIONS.items()
+            }
+            for key, schema in EXPORT_LISTS.items():
+                record[key] = [row_to_dict(schema, row) for row in profile[key]]
+            lines.append(dumps(record))
+        return b"".join(line + b"\n" for line in lines)
+
+    async def body():
+        # レスポンス送信中も使えるよう、セッションはジェネレータ内で開く
+        async with AsyncSessionLocal() as db:
+            if format == "csv":
+                buffer = io.StringIO()
+                csv.writer(buffer).writerow(CSV_COLUMNS)
+                yield ("\ufeff" + buffer.getvalue()).encode("utf-8")
+            async for profiles in stream_profiles(db):
+                yield await run_blocking_for(len(profiles), serialize_chunk, profiles)
+
+    media_type = "text/csv; charset=utf-8" if format == "csv" else "application/x-ndjson"
+    headers = {"Content-Disposition": f'attachment; filename="profiles.{format}"'}
+    return StreamingResponse(body(), media_type=media_type, headers=headers)
+
+
+# 一括取り込み（POST /profiles/import）
+@router.post("/import", response_model=ProfileImportResult)
+async def import_profiles_bulk(
+    request: Request,
+    format: Literal["ndjson", "csv"] | None = Query(None, description="形式（省略時は Content-Type から判定）"),
+    dry_run: bool = Query(False, description="検証だけを行い、書き込まない"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    CSV または NDJSON の本文（multipart ではなく、ファイルの中身をそのまま送る）から社員をまとめて登録する。
+    本文は届いた分から1行ずつ検証し、一定人数ずつテーブルごとの複数行 INSERT で書き込む。
+    不正な行・登録済みの社員番号の行は飛ばし、行番号付きのエラーとして返す（他の行は登録する）。
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+        format = IMPORT_CONTENT_TYPES.get(content_type)
+        if format is None:
+            raise HTTPException(status_code=415, detail="Use text/csv or application/x-ndjson, or pass format")
+    try:
+        result = await import_profiles(db, iter_profile_records(request.stream(), format), dry_run=dry_run)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    finally:
+        # 途中で失敗しても、それまでにコミットした分は登録済みのため、キャッシュは必ず無効化する
+        if not dry_run:
+            await invalidate_profile_cache()
+    return result
+
+
+# プロフィール一括取得（GET /profiles/{id}）
+@router.get("/{id}", response_model=ProfileOut)
+async def read_profile(id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    """
+    社員1人分のプロフィール（7テーブル）を1リクエスト・1クエリで取得する。
+    """
+    generation = await response_cache.generation("profiles")
+    entry = await response_cache.get_query("profiles", str(id), generation)
+    if entry is not None:
+        return conditional_response(request, entry)
+
+    profile = await get_profile(db, id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    # SAS付きURLへの変換はここで1回だけ行う
+    await sign_photo_urls([profile["employee"]])
+    if profile["related_info"]:
+        await sign_thumbnail_urls([profile["related_info"]])
+
+    entry = cache_entry(dump(ProfileOut, profile))
+    await response_cache.set_query("profiles", str(id), entry, generation)
+    return conditional_response(request, entry)
+
+
+async def invalidate_profile_cache(deleted: dict | None = None):
+    """
+    プロフィールを構成する全テーブルの読み取りキャッシュを無効化する。
+    deleted（{テーブル名: id のリスト}）を渡した場合は、その id の単一取得キャッシュも削除する。
+    """
+    tables = (
+        "employees",
+        *(model.__tablename__ for model in PROFILE_MODELS.values()),
+        *(crud.model.__tablename__ for crud in CHILD_LIST_CRUDS.values()),
+    )
+    for table in tables:
+        ids = (deleted or {}).get(table) or [None]
+        for id in ids:
+            await invalidate_cache(table, id)
+
+
+# プロフィール一括作成（POST /profiles）
+@router.post("/", response_model=ProfileOut)
+async def create_profile_all(profile: ProfileCreate, db: AsyncSession = Depends(get_db)):
+    """
+    社員と関連テーブルの行をまとめて作成する（1トランザクション）。
+    """
+    try:
+        created = await create_profile(db, profile.dict())
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail="Profile already exists")
+    await invalidate_profile_cache()
+    return created
+
+
+# プロフィール一括削除（DELETE /profiles/{id}）
+@router.delete("/{id}")
+async def delete_profile_all(id: int, db: AsyncSession = Depends(get_db)):
+    """
+    社員と関連テーブルの行をまとめて削除する（1トランザクション）。
+    """
+    deleted = await delete_profile(db, id)
+    if deleted is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    await invalidate_profile_cache(deleted)
+    return {"detail": "Profile deleted"}
@@ -1,14 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
+from ..database import get_db
 from ..database_project import get_project_db
+from ..response_cache import response_cache
+from .base import cache_entry, conditional_response
 from ..schemas_project import (
     ProjectMemberResponse,
-    ProjectOut
+    ProjectOut,
+    MemberSearchResponse,
+    EmployeeProjectsResponse
 )
 from ..crud.project_management import (
+    EMPLOYEE_PROJECTS_CACHE_SECONDS,
     get_team_members_by_name,
-    get_projects_by_ids
+    get_projects_by_ids,
+    get_employee_projects,
+    search_team_members
 )
 
 router = APIRouter(prefix="/project-management", tags=["project-management"])
@@ -50,4 +58,46 @@ async def get_projects_by_project_ids(
             detail="Invalid project_ids format. Use comma-separated integers."
         )
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/members/search", response_model=MemberSearchResponse)
+async def search_members(
+    q: str = Query(..., min_length=1, description="メンバー名（漢字・かな・ローマ字）"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_project_db),
+    profile_db: AsyncSession = Depends(get_db)
+):
+    """
+    メンバー名でプロジェクトメンバーを検索し、一致度の高い順に返す
+    新しく追加されたメンバーは MEMBER_INDEX_REFRESH_SECONDS（既定30秒）ごとに反映するが、
+    名前の変更・削除は全件再構築の MEMBER_INDEX_REBUILD_SECONDS（既定10分）ごとにしか反映されない
+    例: /members/search?q=yamada&limit=20
+    """
+    total, items = await search_team_members(db, profile_db, q, limit=limit, offset=offset)
+    return MemberSearchResponse(total=total, items=items)
+
+
+@router.get("/employees/{employee_id}/projects", response_model=EmployeeProjectsResponse)
+async def read_employee_projects(
+    employee_id: int,
+    request: Request,
+    profile_db: AsyncSession = Depends(get_db)
+):
+    """
+    社員番号の社員が参加しているプロジェクトと、各プロジェクトのメンバーを1回で返す
+    （/team-members と /projects を続けて呼ぶ代わり）。
+    社員名の変更で無効化されるよう employees の世代で、プロジェクトDBの変更は短い有効期間でキャッシュする。
+    例: /employees/100001/projects
+    """
+    key = f"employee-projects:{employee_id}"
+    generation = await response_cache.generation("employees")
+    entry = await response_cache.get_query("employees", key, generation)
+    if entry is None:
+        result = await get_employee_projects(profile_db, employee_id)
+        if result is None:
+            raise HTTPException(status_code=404, detail="Employee not found")
+        entry = cache_entry(EmployeeProjectsResponse(**result).model_dump(mode="json"))
+        await response_cache.set_query("employees", key, entry, generation, ttl=EMPLOYEE_PROJECTS_CACHE_SECONDS)
+    return conditional_response(request, entry)
@@ -1,84 +1,141 @@
-import os
-from fastapi import APIRouter, Depends, HTTPException
+from functools import partial
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.database import get_db
+from api.routers.base import (
+    ListParams,
+    stream_list,
+    cached_list,
+    cached_item,
+    conditional_response,
+    invalidate_cache,
+)
 from api.schemas import RelatedInfoCreate, RelatedInfoUpdate, RelatedInfoOut
 from api.crud.related_info import related_info_crud
-from api.routers.storage import generate_read_sas_url
+from api.routers.storage import read_url_signer, blob_name_from_url
+from api.routers.employee import PhotoSize, photo_blob_name
+from api.renditions import rendition_name, rendition_registry, rendition_worker
+from api.offload import run_blocking_for
 
 router = APIRouter(prefix="/related_info", tags=["related_info"])
 
 
-# 全件取得（GET /related_info）
-@router.get("/", response_model=list[RelatedInfoOut])
-async def read_all_related_info(db: AsyncSession = Depends(get_db)):
-    related_info_list = await related_info_crud.get_all(db)
-
+def thumbnail_blob_names(item) -> list[str]:
+    """
+    プロフィール動画・セミナー動画のサムネイルの元画像のBlob名を列挙する。
+    """
+    blob_names = []
+    if getattr(item, "profile_thumbnail_url", None):
+        blob_names.append(blob_name_from_url(item.profile_thumbnail_url))
+    if getattr(item, "seminar_thumbnail_url", None):
+        blob_names.extend(blob_name_from_url(url) for url in item.seminar_thumbnail_url.split(','))
+    return [blob_name for blob_name in blob_names if blob_name]
+
+
+def collect_thumbnail_blob_names(items, size: str | None = None) -> list[str]:
+    """
+    全件分のサムネイルURLから、署名するBlob名を順に集める（apply_thumbnail_urls と同じ順序）。
+    """
+    blob_names = []
+    for item in items:
+        # プロフィール動画サムネイル（fields 指定で取得していない場合は対象外）
+        if getattr(item, "profile_thumbnail_url", None):
+            blob_names.append(photo_blob_name(item.profile_thumbnail_url, size))
+        # セミナー動画サムネイル（カンマ区切り、空要素は空のまま）
+        if getattr(item, "seminar_thumbnail_url", None):
+            blob_names.extend(
+                photo_blob_name(url, size) for url in item.seminar_thumbnail_url.split(',')
+            )
+    return blob_names
+
+
+def apply_thumbnail_urls(items, sas_urls: list[str]):
+    """
+    collect_thumbnail_blob_names の順序で署名したURLを、各行のサムネイルURLに書き戻す。
+    """
+    sas_urls = iter(sas_urls)
+    for item in items:
+        if getattr(item, "profile_thumbnail_url", None):
+            item.profile_thumbnail_url = next(sas_urls)
+        if getattr(item, "seminar_thumbnail_url", None):
+            count = len(item.seminar_thumbnail_url.split(','))
+            item.seminar_thumbnail_url = ",".join(next(sas_urls) for _ in range(count))
+    return items
+
+
+async def sign_thumbnail_urls(items, size: str | None = None):
+    """
+    プロフィール動画・セミナー動画のサムネイルURLを、読み取り用SAS付きURLにまとめて変換する。
+    全件分のBlob名を集めてから一括で署名する。
+    size を指定すると、生成済みであればそのサイズの rendition の URL を返す。
+    件数が多い場合、カンマ区切りURLの分解・書き戻しはスレッドプールで行う。
+    """
+    if size:
+        await rendition_registry.ensure_loaded()
+    blob_names = await run_blocking_for(len(items), collect_thumbnail_blob_names, items, size)
+    sas_urls = await read_url_signer.sign_many_async(blob_names)
+    return await run_blocking_for(len(items), apply_thumbnail_urls, items, sas_urls)
 
-    for item in related_info_list:
-        # プロフィール動画サムネイル
-        if item.profile_thumbnail_url:
-            blob_name = os.path.basename(item.profile_thumbnail_url)
-            item.profile_thumbnail_url = generate_read_sas_url(blob_name)
-        # セミナー動画サムネイル
-        if item.seminar_thumbnail_url:
-            urls = item.seminar_thumbnail_url.split(',')
-            sas_urls = []
-            for url in urls:
-                if url:
-                    clean_url = url.split('?')[0]
-                    blob_name = os.path.basename(clean_url)
-                    sas_urls.append(generate_read_sas_url(blob_name))
-                else:
-                    sas_urls.append("")
 
-            item.seminar_thumbnail_url = ",".join(sas_urls)
-
-    return related_info_list
+# 全件取得（GET /related_info）
+@router.get("/", response_model=list[RelatedInfoOut], response_model_exclude_unset=True)
+async def read_all_related_info(
+    request: Request,
+    params: ListParams = Depends(),
+    thumbnail_size: PhotoSize | None = Query(None, description="サムネイルの縮小版サイズ"),
+    db: AsyncSession = Depends(get_db),
+):
+    transform = partial(sign_thumbnail_urls, size=thumbnail_size)
+    if params.stream:
+        return stream_list(related_info_crud, RelatedInfoOut, params, transform=transform)
+    entry = await cached_list(related_info_crud, RelatedInfoOut, db, params, transform=transform)
+    return conditional_response(request, entry)
 
 
 # 特定の関連情報を取得（GET /related_info/{id}）
 @router.get("/{id}", response_model=RelatedInfoOut)
-async def read_related_info(id: int, db: AsyncSession = Depends(get_db)):
-    item = await related_info_crud.get(db, "id", id)
-    if not item:
+async def read_related_info(
+    id: int,
+    request: Request,
+    thumbnail_size: PhotoSize | None = Query(None, description="サムネイルの縮小版サイズ"),
+    db: AsyncSession = Depends(get_db),
+):
+    entry = await cached_item(
+        related_info_crud,
+        RelatedInfoOut,
+        db,
+        id,
+        transform=partial(sign_thumbnail_urls, size=thumbnail_size),
+        variant=f"thumbnail_size={thumbnail_size}" if thumbnail_size else None,
+    )
+    if not entry:
         raise HTTPException(status_code=404, detail="Related info not found")
-
-
-    # プロフィール動画サムネイル
-    if item.profile_thumbnail_url:
-        blob_name = os.path.basename(item.profile_thumbnail_url)
-        item.profile_thumbnail_url = generate_read_sas_url(blob_name)
-    # セミナー動画サムネイル
-    if item.seminar_thumbnail_url:
-        urls = item.seminar_thumbnail_url.split(',')
-        sas_urls = []
-        for url in urls:
-            if url:
-                clean_url = url.split('?')[0]
-                blob_name = os.path.basename(clean_url)
-                sas_urls.append(generate_read_sas_url(blob_name))
-            else:
-                sas_urls.append("")
-
-        item.seminar_thumbnail_url = ",".join(sas_urls)
-
-    return item
+    return conditional_response(request, entry)
 
 
 # 新規作成（POST /related_info）
 @router.post("/", response_model=RelatedInfoOut)
 async def create_related_info(item: RelatedInfoCreate, db: AsyncSession = Depends(get_db)):
-    return await related_info_crud.create(db, item.dict())
+    created = await related_info_crud.create(db, item.dict())
+    await invalidate_cache("related_info", created.id)
+    return created
 
 
 # 更新（PUT /related_info/{id}）
 @router.put("/{id}", response_model=RelatedInfoOut)
 async def update_related_info(id: int, update: RelatedInfoUpdate, db: AsyncSession = Depends(get_db)):
-    updated = await related_info_crud.update(db, "id", id, update.dict(exclude_unset=True))
+    obj_in = update.dict(exclude_unset=True)
+    updated = await related_info_crud.update(db, "id", id, obj_in)
     if not updated:
         raise HTTPException(status_code=404, detail="Related info not found")
+    await invalidate_cache("related_info", id)
+    # サムネイルが差し替えられた場合は、まだ縮小版のないものだけ生成する
+    if "profile_thumbnail_url" in obj_in or "seminar_thumbnail_url" in obj_in:
+        for blob_name in thumbnail_blob_names(updated):
+            if not rendition_registry.has(rendition_name(blob_name, "thumb")):
+                rendition_worker.enqueue(blob_name, on_complete=partial(invalidate_cache, "related_info", id))
     return updated
 
 
@@ -88,4 +145,5 @@ async def delete_related_info(id: int, db: AsyncSession = Depends(get_db)):
     success = await related_info_crud.delete(db, "id", id)
     if not success:
         raise HTTPException(status_code=404, detail="Related info not found")
+    await invalidate_cache("related_info", id)
     return {"detail": "Related info deleted"}
\ No newline at end of file
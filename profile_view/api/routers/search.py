@@ -0,0 +1,39 @@
+import time
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.database import get_db
+from api.schemas import PeopleSearchResponse
+from api.crud.people_search import search_people
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+
+# 人物検索（GET /search）
+@router.get("/", response_model=PeopleSearchResponse)
+async def search(
+    q: str = Query("", description="検索語（空白区切りで AND 検索）。スキル・経歴・趣味・学歴などが対象"),
+    university: str | None = Query(None),
+    hometown: str | None = Query(None),
+    mbti: str | None = Query(None),
+    blood_type: str | None = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    プロフィール全体を全文検索し、一致度の高い順に返す。
+    university / hometown / mbti / blood_type で絞り込みができ、
+    絞り込み後の結果でのファセットごとの件数も返す。
+    例: /search?q=kubernetes  /search?q=テニス&hometown=大阪
+    """
+    started = time.perf_counter()
+    filters = {"university": university, "hometown": hometown, "mbti": mbti, "blood_type": blood_type}
+    total, items, facets = await search_people(db, q, filters=filters, limit=limit, offset=offset)
+    return PeopleSearchResponse(
+        total=total,
+        items=items,
+        facets=facets,
+        took_ms=round((time.perf_counter() - started) * 1000, 2),
+    )
@@ -0,0 +1,29 @@
+from fastapi import APIRouter
+from api.schemas import SeminarVideoOut, SeminarVideoUpdate
+from api.crud.child_lists import seminar_videos_crud
+from api.routers.base import generate_child_list_router
+from api.routers.employee import photo_blob_name
+from api.routers.storage import read_url_signer
+
+
+async def sign_seminar_thumbnails(videos, size: str | None = None):
+    """
+    セミナー動画のサムネイルURLを、読み取り用SAS付きURLにまとめて変換する。
+    """
+    targets = [video for video in videos if getattr(video, "thumbnail_url", None)]
+    sas_urls = await read_url_signer.sign_many_async(
+        photo_blob_name(video.thumbnail_url, size) for video in targets
+    )
+    for video, sas_url in zip(targets, sas_urls):
+        video.thumbnail_url = sas_url
+    return videos
+
+
+router: APIRouter = generate_child_list_router(
+    prefix="/seminar_videos",
+    tags=["seminar_videos"],
+    schema_out=SeminarVideoOut,
+    schema_update=SeminarVideoUpdate,
+    crud_instance=seminar_videos_crud,
+    transform=sign_seminar_thumbnails,
+)
@@ -1,37 +1,106 @@
 import os
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from fastapi import APIRouter, HTTPException
-from azure.storage.blob import generate_blob_sas, BlobSasPermissions
 
-from api.schemas import SasTokenRequest, SasTokenResponse
-from api.config import settings
+from api.schemas import SasTokenRequest, SasTokenResponse, RenditionRequest, RenditionResponse
+from api.sas_signer import SasUrlSigner
+from api.renditions import rendition_worker
 
 # プレフィックスとタグはご提示のコードに合わせます
 router = APIRouter(prefix="", tags=["storage"])
 
-# 接続文字列からアカウント名とキーを解析（一度だけ実行）
-try:
-    account_name = settings.AZURE_STORAGE_CONNECTION_STRING.split('AccountName=')[1].split(';')[0]
-    account_key = settings.AZURE_STORAGE_CONNECTION_STRING.split('AccountKey=')[1].split(';')[0]
-except (IndexError, AttributeError):
-    raise RuntimeError("Azureの接続文字列(AZURE_STORAGE_CONNECTION_STRING)が無効です。")
 
+# Azurite（ローカルの Blob エミュレータ）の既定のアカウント（UseDevelopmentStorage=true の場合に使う。公開されている値）
+DEVELOPMENT_STORAGE = {
+    "AccountName": "devstoreaccount1",
+    "AccountKey": "Eby8vdM02xNOcqFlqUwJPLlmEtlCDXJ1OUzFT50uSRZ6IFsuFq2UVErCz4I6tq/K1SZFPTOtr/KBHBeksoGMGw==",
+    "BlobEndpoint": "http://127.0.0.1:10000/devstoreaccount1",
+}
 
-def generate_read_sas_url(blob_name: str) -> str:
+
+def parse_connection_string(connection_string: str) -> dict[str, str]:
     """
-    指定されたBlob名に対して、読み取り専用のSASトークン付きURLを生成する。
-    この関数は他のルーターから呼び出して使用します。
+    接続文字列（Key=Value;...）を dict にする。UseDevelopmentStorage=true は Azurite の既定値に展開する。
     """
-    if not blob_name:
-        return ""
+    values = {}
+    for part in (connection_string or "").split(";"):
+        key, sep, value = part.strip().partition("=")
+        if sep:
+            values[key] = value
+    if values.get("UseDevelopmentStorage", "").lower() == "true":
+        values = {**DEVELOPMENT_STORAGE, **values}
+    return values
+
+
+@lru_cache(maxsize=1)
+def storage_config() -> tuple[str, str, str, str]:
+    """
+    接続文字列から (アカウント名, キー, コンテナ名, Blob のエンドポイント) を返す（初回のみ解析）。
+    エンドポイントは BlobEndpoint があればそれを（Azurite など）、なければアカウント名から作る。
+    設定の読み込みと Azure SDK の import は、起動を遅くしないよう最初の署名まで遅らせる。
+    """
+    from api.config import settings
+
+    values = parse_connection_string(settings.AZURE_STORAGE_CONNECTION_STRING)
+    account_name, account_key = values.get("AccountName"), values.get("AccountKey")
+    if not account_name or not account_key:
+        raise RuntimeError("Azureの接続文字列(AZURE_STORAGE_CONNECTION_STRING)が無効です。")
+    endpoint = values.get("BlobEndpoint") or (
+        f"{values.get('DefaultEndpointsProtocol', 'https')}://{account_name}.blob."
+        f"{values.get('EndpointSuffix', 'core.windows.net')}"
+    )
+    return account_name, account_key, settings.AZURE_STORAGE_CONTAINER_NAME, endpoint.rstrip("/")
+
+
+def storage_account() -> tuple[str, str, str]:
+    """
+    (アカウント名, キー, コンテナ名) を返す。
+    """
+    return storage_config()[:3]
+
+
+def blob_url(blob_name: str) -> str:
+    """
+    Blob の（SAS なしの）URL。DB にはこの形で保存する。
+    """
+    _, _, container_name, endpoint = storage_config()
+    return f"{endpoint}/{container_name}/{blob_name}"
+
+
+def sign_write_url(blob_name: str, expires_on: datetime) -> str:
+    """
+    Blob への書き込み（作成・上書き・ブロックの追加）用の SAS 付き URL を署名して返す。
+    """
+    from azure.storage.blob import generate_blob_sas, BlobSasPermissions
+
+    account_name, account_key, container_name = storage_account()
+    token = generate_blob_sas(
+        account_name=account_name,
+        container_name=container_name,
+        blob_name=blob_name,
+        account_key=account_key,
+        permission=BlobSasPermissions(create=True, write=True),
+        expiry=expires_on,
+    )
+    return f"{blob_url(blob_name)}?{token}"
 
+
+def _sign_read_url(blob_name: str) -> str:
+    """
+    指定されたBlob名に対して、読み取り専用のSASトークン付きURLを実際に署名して生成する。
+    キャッシュを通さないため、通常は read_url_signer 経由で呼び出す。
+    """
+    from azure.storage.blob import generate_blob_sas, BlobSasPermissions
+
+    account_name, account_key, container_name = storage_account()
     # 読み取り用SASトークンの有効期限（例：1時間）
     sas_expires_on = datetime.now(timezone.utc) + timedelta(days=365*5)
 
     # 読み取り(Read)権限のみを持つSASトークンを生成
     token = generate_blob_sas(
         account_name=account_name,
-        container_name=settings.AZURE_STORAGE_CONTAINER_NAME,
+        container_name=container_name,
         blob_name=blob_name,
         account_key=account_key,
         permission=BlobSasPermissions(read=True), # 権限を 'read' に設定
@@ -39,7 +108,33 @@ def generate_read_sas_url(blob_name: str) -> str:
     )
 
     # 完全な読み取り用URLを返す
-    return f"https://{account_name}.blob.core.windows.net/{settings.AZURE_STORAGE_CONTAINER_NAME}/{blob_name}?{token}"
+    return f"{blob_url(blob_name)}?{token}"
+
+
+# 読み取り用SAS付きURLの署名器（Blob名ごとにキャッシュ。トークンの有効期限は5年なので再署名は不要）
+read_url_signer = SasUrlSigner(
+    _sign_read_url,
+    maxsize=int(os.getenv("SAS_CACHE_MAXSIZE", "10000")),
+    ttl_seconds=float(os.getenv("SAS_CACHE_TTL_SECONDS", str(60 * 60 * 24))),
+    offload_threshold=int(os.getenv("SAS_OFFLOAD_THRESHOLD", "50")),
+)
+
+
+def blob_name_from_url(url: str) -> str:
+    """
+    DBに保存されたURL（SASトークン付きの場合も含む）からBlob名を取り出す。
+    """
+    if not url:
+        return ""
+    return os.path.basename(url.split('?')[0])
+
+
+def generate_read_sas_url(blob_name: str) -> str:
+    """
+    指定されたBlob名に対して、読み取り専用のSASトークン付きURLを返す。
+    この関数は他のルーターから呼び出して使用します。
+    """
+    return read_url_signer.sign(blob_name)
 
 
 @router.post("/generate-sas-token", response_model=SasTokenResponse)
@@ -52,18 +147,8 @@ async def create_sas_token_for_upload(request: SasTokenRequest):
 
     try:
         sas_expires_on = datetime.now(timezone.utc) + timedelta(minutes=15)
-
-        token = generate_blob_sas(
-            account_name=account_name,
-            container_name=settings.AZURE_STORAGE_CONTAINER_NAME,
-            blob_name=request.file_name,
-            account_key=account_key,
-            permission=BlobSasPermissions(create=True, write=True),
-            expiry=sas_expires_on,
-        )
-
-        sas_url = f"https://{account_name}.blob.core.windows.net/{settings.AZURE_STORAGE_CONTAINER_NAME}/{request.file_name}?{token}"
-        storage_url = f"https://{account_name}.blob.core.windows.net/{settings.AZURE_STORAGE_CONTAINER_NAME}/{request.file_name}"
+        sas_url = sign_write_url(request.file_name, sas_expires_on)
+        storage_url = blob_url(request.file_name)
 
         return SasTokenResponse(sasUrl=sas_url, storageUrl=storage_url)
 
@@ -72,4 +157,18 @@ async def create_sas_token_for_upload(request: SasTokenRequest):
         raise HTTPException(
             status_code=500,
             detail="SASトークンの生成に失敗しました。"
-        )
\ No newline at end of file
+        )
+
+
+@router.post("/renditions", response_model=RenditionResponse, status_code=202)
+async def request_renditions(request: RenditionRequest):
+    """
+    アップロード済みの画像について、縮小版（rendition）の生成を予約するエンドポイント。
+    生成はバックグラウンドで行うため、完了を待たずに 202 を返す。
+    """
+    blob_name = blob_name_from_url(request.file_name)
+    if not blob_name:
+        raise HTTPException(status_code=400, detail="fileNameは必須です。")
+
+    queued = rendition_worker.enqueue(blob_name)
+    return RenditionResponse(fileName=blob_name, queued=queued)
@@ -0,0 +1,89 @@
+from fastapi import APIRouter
+
+from api.database import get_engine
+from api.database_project import get_project_engine
+from api.database_engine import pool_stats
+from api.routers.storage import read_url_signer
+from api.response_cache import response_cache
+from api.renditions import rendition_worker
+from api.audit import audit_log_writer
+from api.offload import loop_lag_monitor
+from api.admission import admission_controller
+from api.startup import startup_profile
+
+router = APIRouter(prefix="/system", tags=["system"])
+
+
+# SAS署名器の統計（GET /system/sas-signer）
+@router.get("/sas-signer")
+async def read_sas_signer_metrics():
+    """
+    読み取り用SAS署名キャッシュのヒット率・署名時間などを返す。
+    """
+    return read_url_signer.metrics()
+
+
+# コネクションプールの統計（GET /system/db-pool）
+@router.get("/db-pool")
+async def read_db_pool_stats():
+    """
+    メインDB・プロジェクトDBのコネクションプールの使用状況と接続待ち時間を返す。
+    """
+    return {
+        "main": pool_stats(get_engine()),
+        "project": pool_stats(get_project_engine()),
+    }
+
+
+# 読み取りキャッシュの統計（GET /system/response-cache）
+@router.get("/response-cache")
+async def read_response_cache_metrics():
+    """
+    GET レスポンスキャッシュのバックエンドとヒット率を返す。
+    """
+    return response_cache.metrics()
+
+
+# 縮小版生成ワーカーの統計（GET /system/renditions）
+@router.get("/renditions")
+async def read_rendition_metrics():
+    """
+    縮小版（rendition）生成キューの滞留数・処理件数・失敗件数を返す。
+    """
+    return rendition_worker.metrics()
+
+
+# 操作ログライターの統計（GET /system/audit）
+@router.get("/audit")
+async def read_audit_metrics():
+    """
+    操作ログのキューの滞留数・書き込み件数・破棄件数を返す。
+    """
+    return audit_log_writer.metrics()
+
+
+# イベントループの停止の統計（GET /system/event-loop）
+@router.get("/event-loop")
+async def read_event_loop_metrics():
+    """
+    しきい値を超えたイベントループの停止の回数・最大遅延と、原因となったルートを返す。
+    """
+    return loop_lag_monitor.metrics()
+
+
+# 起動時間の内訳（GET /system/startup）
+@router.get("/startup")
+async def read_startup_profile():
+    """
+    起動完了までの時間と、モジュールの import・起動処理ごとの所要時間を返す。
+    """
+    return startup_profile.report()
+
+
+# 同時実行数の制限の統計（GET /system/admission）
+@router.get("/admission")
+async def read_admission_metrics():
+    """
+    ルートの種類ごとの同時実行数・待ち数と、受け付け・拒否・待ち時間切れの件数を返す。
+    """
+    return admission_controller.metrics()
@@ -0,0 +1,65 @@
+from fastapi import APIRouter, HTTPException
+
+from api.schemas import UploadSessionsRequest, UploadSessionsResponse, UploadSessionOut, UploadCommitResponse
+from api.uploads import UploadIncomplete, create_upload_session_manager_from_env
+
+router = APIRouter(prefix="/uploads", tags=["uploads"])
+
+# ブロック分割アップロードのマネージャー（状態を持たないため、プロセスに1つ）
+upload_sessions = create_upload_session_manager_from_env()
+
+
+def load_session(upload_id: str):
+    try:
+        return upload_sessions.decode(upload_id)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+# ブロック分割アップロードの開始（POST /uploads）
+@router.post("/", response_model=UploadSessionsResponse)
+async def create_upload_sessions(request: UploadSessionsRequest):
+    """
+    ファイルごとにアップロードを開始し、全ブロックの書き込み用URLを返す。
+    セミナー動画など複数ファイルは、1回のリクエストでまとめて開始できる。
+    """
+    if not request.files:
+        raise HTTPException(status_code=400, detail="filesは必須です。")
+    if len(request.files) > upload_sessions.max_files:
+        raise HTTPException(status_code=400, detail=f"一度に開始できるのは{upload_sessions.max_files}件までです。")
+    try:
+        sessions = [upload_sessions.create(file.file_name, file.size, file.content_type) for file in request.files]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "sessions": [upload_sessions.describe(upload_sessions.encode(session), session, set()) for session in sessions]
+    }
+
+
+# アップロードの状態（GET /uploads/{upload_id}）
+@router.get("/{upload_id}", response_model=UploadSessionOut)
+async def read_upload_session(upload_id: str):
+    """
+    届いているブロックと、届いていないブロックの新しい書き込み用URLを返す。
+    中断したアップロードの再開や、書き込み用URLの期限切れのときに使う。
+    """
+    session = load_session(upload_id)
+    staged = await upload_sessions.staged_blocks(session)
+    return upload_sessions.describe(upload_id, session, staged)
+
+
+# アップロードの確定（POST /uploads/{upload_id}/commit）
+@router.post("/{upload_id}/commit", response_model=UploadCommitResponse)
+async def commit_upload_session(upload_id: str):
+    """
+    全ブロックが届いていれば、ブロックをつなげてファイルを確定する。
+    届いていないブロックがあれば 409 と、その番号を返す。
+    """
+    session = load_session(upload_id)
+    try:
+        await upload_sessions.commit(session)
+    except UploadIncomplete as e:
+        raise HTTPException(status_code=409, detail={"message": "Upload is incomplete", "missingBlocks": e.missing})
+    return UploadCommitResponse(
+        fileName=session.blob_name, storageUrl=upload_sessions.blob_url(session.blob_name), size=session.size
+    )
@@ -0,0 +1,151 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable
+
+from api.offload import run_blocking
+
+
+class SasUrlSigner:
+    """
+    Blob名をキーに、読み取り用SAS付きURLを LRU + TTL でキャッシュする署名器。
+    署名処理（HMAC）そのものは sign_func に委譲する。
+
+    - sign(): 1件署名（キャッシュ優先）
+    - sign_many(): 複数件をまとめて署名（重複は1回だけ署名）
+    - sign_many_async(): 未署名の件数が多い場合はスレッドに逃がしてイベントループを塞がない
+    - metrics(): キャッシュヒット率・署名時間などの統計
+    """
+
+    def __init__(
+        self,
+        sign_func: Callable[[str], str],
+        maxsize: int = 10000,
+        ttl_seconds: float = 60 * 60 * 24,
+        offload_threshold: int = 50,
+    ):
+        self.sign_func = sign_func
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.offload_threshold = offload_threshold
+
+        # blob_name -> (URL, 有効期限(monotonic))
+        self._cache: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._signed = 0
+        self._sign_seconds = 0.0
+        self._offloaded_batches = 0
+
+    def _get_cached(self, blob_name: str):
+        with self._lock:
+            entry = self._cache.get(blob_name)
+            if entry is None:
+                self._misses += 1
+                return None
+            url, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._cache[blob_name]
+                self._misses += 1
+                return None
+            self._cache.move_to_end(blob_name)
+            self._hits += 1
+            return url
+
+    def _sign_and_store(self, blob_names: Iterable[str]) -> dict[str, str]:
+        signed = {}
+        started = time.perf_counter()
+        for blob_name in blob_names:
+            signed[blob_name] = self.sign_func(blob_name)
+        elapsed = time.perf_counter() - started
+
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._signed += len(signed)
+            self._sign_seconds += elapsed
+            for blob_name, url in signed.items():
+                self._cache[blob_name] = (url, expires_at)
+                self._cache.move_to_end(blob_name)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return signed
+
+    def _partition(self, blob_names: list[str]):
+        # キャッシュ済みのものと、署名が必要なもの（重複除去）に分ける
+        resolved: dict[str, str] = {}
+        missing: list[str] = []
+        seen = set()
+        for blob_name in blob_names:
+            if not blob_name or blob_name in seen:
+                continue
+            seen.add(blob_name)
+            url = self._get_cached(blob_name)
+            if url is None:
+                missing.append(blob_name)
+            else:
+                resolved[blob_name] = url
+        return resolved, missing
+
+    def sign(self, blob_name: str) -> str:
+        """
+        Blob名に対する読み取り用SAS付きURLを返す。空のBlob名には空文字を返す。
+        """
+        if not blob_name:
+            return ""
+        url = self._get_cached(blob_name)
+        if url is None:
+            url = self._sign_and_store([blob_name])[blob_name]
+        return url
+
+    def sign_many(self, blob_names: Iterable[str]) -> list[str]:
+        """
+        複数のBlob名をまとめて署名し、入力と同じ順序でURLのリストを返す。
+        """
+        blob_names = list(blob_names)
+        resolved, missing = self._partition(blob_names)
+        if missing:
+            resolved.update(self._sign_and_store(missing))
+        return [resolved.get(blob_name, "") if blob_name else "" for blob_name in blob_names]
+
+    async def sign_many_async(self, blob_names: Iterable[str]) -> list[str]:
+        """
+        sign_many の非同期版。未署名の件数が offload_threshold を超える場合は
+        署名処理をオフロード用のスレッドプールで実行し、イベントループをブロックしない。
+        """
+        blob_names = list(blob_names)
+        resolved, missing = self._partition(blob_names)
+        if len(missing) > self.offload_threshold:
+            with self._lock:
+                self._offloaded_batches += 1
+            resolved.update(await run_blocking(self._sign_and_store, missing))
+        elif missing:
+            resolved.update(self._sign_and_store(missing))
+        return [resolved.get(blob_name, "") if blob_name else "" for blob_name in blob_names]
+
+    def clear(self):
+        """
+        キャッシュを破棄する（統計値はそのまま）。
+        """
+        with self._lock:
+            self._cache.clear()
+
+    def metrics(self) -> dict:
+        """
+        キャッシュと署名処理の統計を返す。
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "cache_size": len(self._cache),
+                "cache_maxsize": self.maxsize,
+                "cache_ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "signed": self._signed,
+                "sign_seconds_total": self._sign_seconds,
+                "sign_seconds_avg": self._sign_seconds / self._signed if self._signed else 0.0,
+                "offloaded_batches": self._offloaded_batches,
+            }
@@ -1,23 +1,24 @@
 from pydantic import BaseModel, Field
-from datetime import date
-from typing import Optional
+from datetime import date, datetime
+from typing import Any, Dict, List, Literal, Optional
 
+# 作成・更新の文字列の max_length は DB の列の長さ（api/models.py）に合わせる
 # employee 基本情報
 
 class EmployeeCreate(BaseModel):
     employee_id: int
-    name: str
-    kana: str = None
+    name: str = Field(..., max_length=100)
+    kana: str = Field(None, max_length=100)
     birthdate: date = None
-    hometown: Optional[str] = None
-    elementary_school: Optional[str] = None
-    junior_high_school: Optional[str] = None
-    high_school: Optional[str] = None
-    university: Optional[str] = None
-    faculty: Optional[str] = None
-    graduate_school: Optional[str] = None
-    major: Optional[str] = None
-    photo_url: Optional[str] = None
+    hometown: Optional[str] = Field(None, max_length=100)
+    elementary_school: Optional[str] = Field(None, max_length=100)
+    junior_high_school: Optional[str] = Field(None, max_length=100)
+    high_school: Optional[str] = Field(None, max_length=100)
+    university: Optional[str] = Field(None, max_length=100)
+    faculty: Optional[str] = Field(None, max_length=100)
+    graduate_school: Optional[str] = Field(None, max_length=100)
+    major: Optional[str] = Field(None, max_length=100)
+    photo_url: Optional[str] = Field(None, max_length=500)
 
     class Config:
         from_attributes = True
@@ -25,6 +26,26 @@ class EmployeeCreate(BaseModel):
 
 class EmployeeUpdate(BaseModel):
     employee_id: int = None
+    name: Optional[str] = Field(None, max_length=100)
+    kana: Optional[str] = Field(None, max_length=100)
+    birthdate: Optional[date] = None
+    hometown: Optional[str] = Field(None, max_length=100)
+    elementary_school: Optional[str] = Field(None, max_length=100)
+    junior_high_school: Optional[str] = Field(None, max_length=100)
+    high_school: Optional[str] = Field(None, max_length=100)
+    university: Optional[str] = Field(None, max_length=100)
+    faculty: Optional[str] = Field(None, max_length=100)
+    graduate_school: Optional[str] = Field(None, max_length=100)
+    major: Optional[str] = Field(None, max_length=100)
+    photo_url: Optional[str] = Field(None, max_length=500)
+
+    class Config:
+        from_attributes = True
+
+
+class EmployeeOut(BaseModel):
+    id: int
+    employee_id: int
     name: Optional[str] = None
     kana: Optional[str] = None
     birthdate: Optional[date] = None
@@ -42,20 +63,12 @@ class EmployeeUpdate(BaseModel):
         from_attributes = True
 
 
-class EmployeeOut(BaseModel):
+# 社員一覧（GET /directory）の1行。一覧表示に必要な列だけを返す
+class DirectoryEntry(BaseModel):
     id: int
     employee_id: int
     name: Optional[str] = None
     kana: Optional[str] = None
-    birthdate: Optional[date] = None
-    hometown: Optional[str] = None
-    elementary_school: Optional[str] = None
-    junior_high_school: Optional[str] = None
-    high_school: Optional[str] = None
-    university: Optional[str] = None
-    faculty: Optional[str] = None
-    graduate_school: Optional[str] = None
-    major: Optional[str] = None
     photo_url: Optional[str] = None
 
     class Config:
@@ -66,20 +79,20 @@ class EmployeeOut(BaseModel):
 
 class EmploymentHistoryCreate(BaseModel):
     employee_id: int
-    company_name: Optional[str] = None
-    job_title: Optional[str] = None
-    start_date: Optional[str] = None
-    end_date: Optional[str] = None
-    description: Optional[str] = None
-    knowledge: Optional[str] = None
+    company_name: Optional[str] = Field(None, max_length=100)
+    job_title: Optional[str] = Field(None, max_length=100)
+    start_date: Optional[str] = Field(None, max_length=100)
+    end_date: Optional[str] = Field(None, max_length=100)
+    description: Optional[str] = Field(None, max_length=500)
+    knowledge: Optional[str] = Field(None, max_length=500)
 
 class EmploymentHistoryUpdate(BaseModel):
-    company_name: Optional[str] = None
-    job_title: Optional[str] = None
-    start_date: Optional[str] = None
-    end_date: Optional[str] = None
-    description: Optional[str] = None
-    knowledge: Optional[str] = None
+    company_name: Optional[str] = Field(None, max_length=100)
+    job_title: Optional[str] = Field(None, max_length=100)
+    start_date: Optional[str] = Field(None, max_length=100)
+    end_date: Optional[str] = Field(None, max_length=100)
+    description: Optional[str] = Field(None, max_length=500)
+    knowledge: Optional[str] = Field(None, max_length=500)
 
 class EmploymentHistoryOut(BaseModel):
     id: int
@@ -129,14 +142,14 @@ class ProjectInfoOut(BaseModel):
 
 class InsightInfoCreate(BaseModel):
     employee_id: int
-    insight: Optional[str] = None
-    skill: Optional[str] = None
-    comment: Optional[str] = None
+    insight: Optional[str] = Field(None, max_length=50)
+    skill: Optional[str] = Field(None, max_length=500)
+    comment: Optional[str] = Field(None, max_length=500)
 
 class InsightInfoUpdate(BaseModel):
-    insight: Optional[str] = None
-    skill: Optional[str] = None
-    comment: Optional[str] = None
+    insight: Optional[str] = Field(None, max_length=50)
+    skill: Optional[str] = Field(None, max_length=500)
+    comment: Optional[str] = Field(None, max_length=500)
 
 class InsightInfoOut(BaseModel):
     id: int
@@ -168,48 +181,48 @@ class SkillInfoOut(BaseModel):
 
 class PrivateInfoCreate(BaseModel):
     employee_id: int
-    blood_type: Optional[str] = None
-    nickname: Optional[str] = None
-    mbti: Optional[str] = None
-    family_structure: Optional[str] = None
-    father_job: Optional[str] = None
-    mother_job: Optional[str] = None
-    lessons: Optional[str] = None
-    club_activities: Optional[str] = None
-    jobs: Optional[str] = None
-    circles: Optional[str] = None
-    hobbies: Optional[str] = None
-    favorite_foods: Optional[str] = None
-    disliked_foods: Optional[str] = None
-    holiday_activities: Optional[str] = None
-    favorite_celebrities: Optional[str] = None
-    favorite_characters: Optional[str] = None
-    favorite_artists: Optional[str] = None
-    favorite_comedians: Optional[str] = None
-    activities_free :Optional[str] = None
-    favorite_things_free :Optional[str] = None
+    blood_type: Optional[str] = Field(None, max_length=50)
+    nickname: Optional[str] = Field(None, max_length=100)
+    mbti: Optional[str] = Field(None, max_length=50)
+    family_structure: Optional[str] = Field(None, max_length=100)
+    father_job: Optional[str] = Field(None, max_length=100)
+    mother_job: Optional[str] = Field(None, max_length=100)
+    lessons: Optional[str] = Field(None, max_length=500)
+    club_activities: Optional[str] = Field(None, max_length=100)
+    jobs: Optional[str] = Field(None, max_length=500)
+    circles: Optional[str] = Field(None, max_length=100)
+    hobbies: Optional[str] = Field(None, max_length=100)
+    favorite_foods: Optional[str] = Field(None, max_length=100)
+    disliked_foods: Optional[str] = Field(None, max_length=100)
+    holiday_activities: Optional[str] = Field(None, max_length=100)
+    favorite_celebrities: Optional[str] = Field(None, max_length=100)
+    favorite_characters: Optional[str] = Field(None, max_length=100)
+    favorite_artists: Optional[str] = Field(None, max_length=100)
+    favorite_comedians: Optional[str] = Field(None, max_length=100)
+    activities_free: Optional[str] = Field(None, max_length=500)
+    favorite_things_free: Optional[str] = Field(None, max_length=500)
 
 class PrivateInfoUpdate(BaseModel):
-    blood_type: Optional[str] = None
-    nickname: Optional[str] = None
-    mbti: Optional[str] = None
-    family_structure: Optional[str] = None
-    father_job: Optional[str] = None
-    mother_job: Optional[str] = None
-    lessons: Optional[str] = None
-    club_activities: Optional[str] = None
-    jobs: Optional[str] = None
-    circles: Optional[str] = None
-    hobbies: Optional[str] = None
-    favorite_foods: Optional[str] = None
-    disliked_foods: Optional[str] = None
-    holiday_activities: Optional[str] = None
-    favorite_celebrities: Optional[str] = None
-    favorite_characters: Optional[str] = None
-    favorite_artists: Optional[str] = None
-    favorite_comedians: Optional[str] = None
-    activities_free :Optional[str] = None
-    favorite_things_free :Optional[str] = None
+    blood_type: Optional[str] = Field(None, max_length=50)
+    nickname: Optional[str] = Field(None, max_length=100)
+    mbti: Optional[str] = Field(None, max_length=50)
+    family_structure: Optional[str] = Field(None, max_length=100)
+    father_job: Optional[str] = Field(None, max_length=100)
+    mother_job: Optional[str] = Field(None, max_length=100)
+    lessons: Optional[str] = Field(None, max_length=500)
+    club_activities: Optional[str] = Field(None, max_length=100)
+    jobs: Optional[str] = Field(None, max_length=500)
+    circles: Optional[str] = Field(None, max_length=100)
+    hobbies: Optional[str] = Field(None, max_length=100)
+    favorite_foods: Optional[str] = Field(None, max_length=100)
+    disliked_foods: Optional[str] = Field(None, max_length=100)
+    holiday_activities: Optional[str] = Field(None, max_length=100)
+    favorite_celebrities: Optional[str] = Field(None, max_length=100)
+    favorite_characters: Optional[str] = Field(None, max_length=100)
+    favorite_artists: Optional[str] = Field(None, max_length=100)
+    favorite_comedians: Optional[str] = Field(None, max_length=100)
+    activities_free: Optional[str] = Field(None, max_length=500)
+    favorite_things_free: Optional[str] = Field(None, max_length=500)
 
 class PrivateInfoOut(BaseModel):
     id: int
@@ -243,14 +256,14 @@ class PrivateInfoOut(BaseModel):
 
 class RelatedInfoCreate(BaseModel):
     employee_id: int
-    profile_video: Optional[str] = None
-    profile_thumbnail_url: Optional[str] = None
+    profile_video: Optional[str] = Field(None, max_length=500)
+    profile_thumbnail_url: Optional[str] = Field(None, max_length=500)
     seminar_videos: Optional[str] = None
     seminar_thumbnail_url: Optional[str] = None
 
 class RelatedInfoUpdate(BaseModel):
-    profile_video: Optional[str] = None
-    profile_thumbnail_url: Optional[str] = None
+    profile_video: Optional[str] = Field(None, max_length=500)
+    profile_thumbnail_url: Optional[str] = Field(None, max_length=500)
     seminar_videos: Optional[str] = None
     seminar_thumbnail_url: Optional[str] = None
 
@@ -264,6 +277,56 @@ class RelatedInfoOut(BaseModel):
     class Config:
         orm_mode = True
 
+# seminar_videos / employee_skills / employee_projects 社員ごとの一覧（position 順）
+# 旧テーブルにはカンマ区切りで同期するため、値にカンマは使えない（案件の獲得スキルはカンマの代わりに '\' で保存するため、'\' が使えない）
+NO_COMMA = r"^[^,]*$"
+NO_BACKSLASH = r"^[^\\]*$"
+
+class SeminarVideoUpdate(BaseModel):
+    video_url: Optional[str] = Field(None, max_length=500, pattern=NO_COMMA)
+    thumbnail_url: Optional[str] = Field(None, max_length=500, pattern=NO_COMMA)
+
+class SeminarVideoOut(BaseModel):
+    id: int
+    employee_id: int
+    position: int
+    video_url: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+    class Config:
+        orm_mode = True
+
+
+class EmployeeSkillUpdate(BaseModel):
+    skill: str = Field(..., min_length=1, max_length=100, pattern=NO_COMMA)
+
+class EmployeeSkillOut(BaseModel):
+    id: int
+    employee_id: int
+    position: int
+    skill: Optional[str] = None
+    class Config:
+        orm_mode = True
+
+
+class EmployeeProjectUpdate(BaseModel):
+    project: Optional[str] = Field(None, max_length=50, pattern=NO_COMMA)
+    skill: Optional[str] = Field(None, max_length=500, pattern=NO_BACKSLASH)
+    comment: Optional[str] = Field(None, max_length=500, pattern=NO_COMMA)
+    start_date: Optional[str] = Field(None, max_length=100, pattern=NO_COMMA)
+    end_date: Optional[str] = Field(None, max_length=100, pattern=NO_COMMA)
+
+class EmployeeProjectOut(BaseModel):
+    id: int
+    employee_id: int
+    position: int
+    project: Optional[str] = None
+    skill: Optional[str] = None
+    comment: Optional[str] = None
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    class Config:
+        orm_mode = True
+
 # operation_logs 履歴管理
 
 class OperationLogsCreate(BaseModel):
@@ -272,14 +335,14 @@ class OperationLogsCreate(BaseModel):
     target_id: Optional[int] = None
     operation_type: Optional[str] = None
     operation_user: Optional[str] = None
-    operation_datetime: Optional[date] = None
+    operation_datetime: Optional[datetime] = None
 
 class OperationLogsUpdate(BaseModel):
     target_table: Optional[str] = None
     target_id: Optional[int] = None
     operation_type: Optional[str] = None
     operation_user: Optional[str] = None
-    operation_datetime: Optional[date] = None
+    operation_datetime: Optional[datetime] = None
 
 class OperationLogsOut(BaseModel):
     id: int
@@ -288,7 +351,7 @@ class OperationLogsOut(BaseModel):
     target_id: Optional[int] = None
     operation_type: Optional[str] = None
     operation_user: Optional[str] = None
-    operation_datetime: Optional[date] = None
+    operation_datetime: Optional[datetime] = None
     class Config:
         orm_mode = True
 
@@ -303,4 +366,135 @@ class SasTokenRequest(BaseModel):
 # SASトークン発行レスポンス
 class SasTokenResponse(BaseModel):
     sas_url: str = Field(..., alias="sasUrl", description="アップロードに使う一時的な署名付きURL")
-    storage_url: str = Field(..., alias="storageUrl", description="DBに保存する永続的なファイルのURL")
\ No newline at end of file
+    storage_url: str = Field(..., alias="storageUrl", description="DBに保存する永続的なファイルのURL")
+
+# 縮小版（rendition）生成リクエスト
+class RenditionRequest(BaseModel):
+    file_name: str = Field(..., alias="fileName", description="アップロード済みのファイル名")
+
+# 縮小版（rendition）生成レスポンス
+class RenditionResponse(BaseModel):
+    file_name: str = Field(..., alias="fileName")
+    queued: bool = Field(..., description="生成を受け付けたか（キューが満杯の場合は false）")
+
+# ブロック分割アップロードの開始リクエスト（1ファイル分）
+class UploadFileRequest(BaseModel):
+    file_name: str = Field(..., alias="fileName", description="アップロードするファイル名（Blob名）")
+    size: int = Field(..., description="ファイルの大きさ（バイト）")
+    content_type: Optional[str] = Field(None, alias="contentType", description="確定時に設定する Content-Type")
+
+# ブロック分割アップロードの開始リクエスト（複数ファイルをまとめて開始できる）
+class UploadSessionsRequest(BaseModel):
+    files: List[UploadFileRequest]
+
+# ブロック1つ分の書き込み用URL
+class UploadBlockGrant(BaseModel):
+    index: int
+    block_id: str = Field(..., alias="blockId", description="base64 にしたブロック ID")
+    offset: int = Field(..., description="ファイル内の開始位置（バイト）")
+    length: int
+    url: str = Field(..., description="Put Block に使う署名付きURL")
+
+# アップロードの状態と、届いていないブロックの書き込み用URL
+class UploadSessionOut(BaseModel):
+    upload_id: str = Field(..., alias="uploadId", description="再開・確定に使うアップロード ID")
+    file_name: str = Field(..., alias="fileName")
+    storage_url: str = Field(..., alias="storageUrl", description="DBに保存する永続的なファイルのURL")
+    size: int
+    block_size: int = Field(..., alias="blockSize")
+    block_count: int = Field(..., alias="blockCount")
+    staged_blocks: List[int] = Field(..., alias="stagedBlocks", description="届いているブロックの番号")
+    grants: List[UploadBlockGrant] = Field(..., description="届いていないブロックの書き込み用URL")
+    grants_expire_on: datetime = Field(..., alias="grantsExpireOn")
+    session_expires_on: datetime = Field(..., alias="sessionExpiresOn")
+
+class UploadSessionsResponse(BaseModel):
+    sessions: List[UploadSessionOut]
+
+# ブロック分割アップロードの確定レスポンス
+class UploadCommitResponse(BaseModel):
+    file_name: str = Field(..., alias="fileName")
+    storage_url: str = Field(..., alias="storageUrl")
+    size: int
+
+# profiles 全テーブルをまとめたプロフィール
+
+class ProfileOut(BaseModel):
+    employee: EmployeeOut
+    employment_history: Optional[EmploymentHistoryOut] = None
+    project_info: Optional[ProjectInfoOut] = None
+    insight_info: Optional[InsightInfoOut] = None
+    skill_info: Optional[SkillInfoOut] = None
+    private_info: Optional[PrivateInfoOut] = None
+    related_info: Optional[RelatedInfoOut] = None
+    seminar_videos: List[SeminarVideoOut] = []
+    employee_skills: List[EmployeeSkillOut] = []
+    employee_projects: List[EmployeeProjectOut] = []
+
+
+class ProfileCreate(BaseModel):
+    employee: EmployeeCreate
+    employment_history: Optional[EmploymentHistoryUpdate] = None
+    project_info: Optional[ProjectInfoUpdate] = None
+    insight_info: Optional[InsightInfoUpdate] = None
+    skill_info: Optional[SkillInfoUpdate] = None
+    private_info: Optional[PrivateInfoUpdate] = None
+    related_info: Optional[RelatedInfoUpdate] = None
+    seminar_videos: Optional[List[SeminarVideoUpdate]] = None
+    employee_skills: Optional[List[EmployeeSkillUpdate]] = None
+    employee_projects: Optional[List[EmployeeProjectUpdate]] = None
+
+
+# プロフィールの一括取り込み（POST /profiles/import）
+
+class ProfileImportRowError(BaseModel):
+    line: int
+    employee_id: Optional[int] = None
+    errors: List[Dict[str, Any]] = Field(description="列の位置（loc）とメッセージ（message）")
+
+
+class ProfileImportResult(BaseModel):
+    imported: int
+    failed: int
+    dry_run: bool
+    errors: List[ProfileImportRowError]
+    errors_truncated: bool = False
+
+
+# 人物検索（GET /search）
+
+class PeopleSearchHit(BaseModel):
+    id: int
+    employee_id: int
+    name: Optional[str] = None
+    score: float
+    matched_fields: List[str] = Field(default_factory=list, description="一致した列（テーブル名.列名）")
+
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+
+class PeopleSearchResponse(BaseModel):
+    total: int
+    items: List[PeopleSearchHit]
+    facets: Dict[str, List[FacetCount]]
+    took_ms: float
+
+
+# 変更フィード（GET /changes）
+
+class ChangeEntry(BaseModel):
+    table: str
+    operation: Literal["upsert", "delete"]
+    id: int
+    employee_id: Optional[int] = None
+    changed_at: datetime
+    row: Optional[Dict[str, Any]] = Field(None, description="変更後の行（削除の場合は null）")
+
+
+class ChangesResponse(BaseModel):
+    changes: List[ChangeEntry]
+    next: str = Field(..., description="次回の since に渡すトークン")
+    has_more: bool
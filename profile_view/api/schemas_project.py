@@ -29,5 +29,44 @@ class ProjectMemberResponse(BaseModel):
     member_names: str  # カンマ区切りの文字列
 
 
+class ProjectTeammate(BaseModel):
+    id: int
+    member_name: str
+    role_title: Optional[str] = None
+    employee_id: Optional[int] = None  # プロフィールDBの社員番号（一致する社員がいなければ None）
+
+
+class EmployeeProject(BaseModel):
+    id: int
+    code: Optional[str] = None
+    name: str
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    client_name: Optional[str] = None
+    industry_categories: Optional[Any] = None
+    type_categories: Optional[Any] = None
+    role_title: Optional[str] = None  # 本人の役割
+    members: List[ProjectTeammate]    # 本人を含むメンバー
+
+
+class EmployeeProjectsResponse(BaseModel):
+    employee_id: int
+    name: str
+    projects: List[EmployeeProject]
+
+
 class ProjectListResponse(BaseModel):
-    projects: List[ProjectOut]
\ No newline at end of file
+    projects: List[ProjectOut]
+
+
+class MemberSearchHit(BaseModel):
+    id: int
+    project_id: int
+    member_name: str
+    role_title: Optional[str] = None
+    score: float
+
+
+class MemberSearchResponse(BaseModel):
+    total: int
+    items: List[MemberSearchHit]
@@ -0,0 +1,132 @@
+import time
+from collections import Counter, defaultdict
+
+from api.search.text_normalize import index_grams, ngrams, search_keys
+
+
+class MemberSearchIndex:
+    """
+    プロジェクトメンバー名のインメモリ検索インデックス。
+    名前（と読みがな）を正規化した表記の文字 unigram / bigram で転置インデックスを作り、
+    検索時は bigram（1文字の検索語は unigram）を共有する候補だけをスコアリングする（テーブル全体は走査しない）。
+    """
+
+    def __init__(self, min_score: float = 0.3):
+        self.min_score = min_score
+        self.members: dict[int, dict] = {}
+        self.keys: dict[int, set[str]] = {}
+        self.postings: dict[str, set[int]] = defaultdict(set)
+        self.readings: dict[str, str] = {}
+        self.max_id = 0
+        # 最後に更新・再構築した時刻（time.monotonic）。未構築なら None
+        self.refreshed_at: float | None = None
+        self.rebuilt_at: float | None = None
+
+    def _reading_for(self, name: str):
+        return self.readings.get(name.replace(" ", "").replace("　", ""))
+
+    def set_readings(self, readings: dict[str, str]):
+        """
+        漢字名 → 読みがな の対応を設定する（社員テーブルの name / kana から作る）。
+        キーの名前は空白を除いた形で渡す。
+        """
+        self.readings = readings
+
+    def add(self, members):
+        """
+        メンバー（id, project_id, member_name, role_title を持つ dict）を追加・更新する。
+        """
+        for member in members:
+            id = member["id"]
+            if id in self.members:
+                self.remove(id)
+            keys = search_keys(member["member_name"], self._reading_for(member["member_name"]))
+            self.members[id] = member
+            self.keys[id] = keys
+            for key in keys:
+                for gram in index_grams(key):
+                    self.postings[gram].add(id)
+            self.max_id = max(self.max_id, id)
+        self.refreshed_at = time.monotonic()
+
+    def remove(self, id: int):
+        for key in self.keys.pop(id, ()):
+            for gram in index_grams(key):
+                ids = self.postings.get(gram)
+                if ids is not None:
+                    ids.discard(id)
+                    if not ids:
+                        del self.postings[gram]
+        self.members.pop(id, None)
+
+    def build(self, members) -> "MemberSearchIndex":
+        """
+        同じ設定・読みがなで、members だけを持つ新しいインデックスを作って返す（self は変更しない）。
+        CPU を使うため、run_blocking でスレッドプールから呼ぶ。
+        """
+        index = MemberSearchIndex(self.min_score)
+        index.readings = self.readings
+        index.add(members)
+        return index
+
+    def replace_with(self, other: "MemberSearchIndex"):
+        """
+        other の内容に差し替える。イベントループ上で呼び、検索が作りかけのインデックスを見ないようにする。
+        """
+        self.members, self.keys, self.postings, self.max_id = other.members, other.keys, other.postings, other.max_id
+        self.refreshed_at = self.rebuilt_at = time.monotonic()
+
+    def rebuild(self, members):
+        """
+        インデックスを作り直す（削除・更新されたメンバーを反映するための全件再構築）。
+        """
+        self.replace_with(self.build(members))
+
+    @staticmethod
+    def _score(query_key: str, key: str) -> float:
+        if key == query_key:
+            return 1.0
+        if key.startswith(query_key):
+            return 0.9
+        if query_key in key:
+            return 0.75
+        query_grams, key_grams = ngrams(query_key), ngrams(key)
+        overlap = len(query_grams & key_grams)
+        return 0.6 * 2 * overlap / (len(query_grams) + len(key_grams))
+
+    def search(self, query: str, limit: int = 20, offset: int = 0):
+        """
+        名前で検索し、(スコア順に並べた該当件数の合計, ページ分の結果) を返す。
+        結果は member の dict に score を加えたもの。
+        """
+        query_keys = search_keys(query)
+        if not query_keys:
+            return 0, []
+
+        # bigram を共有する候補を集める（一定割合以上共有しているものだけを残す）
+        scores: dict[int, float] = {}
+        for query_key in query_keys:
+            grams = ngrams(query_key, 2) if len(query_key) > 1 else ngrams(query_key, 1)
+            counts = Counter()
+            for gram in grams:
+                counts.update(self.postings.get(gram, ()))
+            required = max(1, len(grams) // 2)
+            for id, count in counts.items():
+                if count < required:
+                    continue
+                best = max(self._score(query_key, key) for key in self.keys[id])
+                if best > scores.get(id, 0.0):
+                    scores[id] = best
+
+        ranked = sorted(
+            (
+                (score, id) for id, score in scores.items()
+                if score >= self.min_score
+            ),
+            key=lambda item: (-item[0], self.members[item[1]]["member_name"], item[1]),
+        )
+        page = ranked[offset:offset + limit]
+        return len(ranked), [{**self.members[id], "score": round(score, 3)} for score, id in page]
+
+
+member_index = MemberSearchIndex()
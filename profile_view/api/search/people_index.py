@@ -0,0 +1,270 @@
+import re
+import time
+from collections import Counter, defaultdict
+
+from api.search.text_normalize import index_grams, ngrams, normalize_text, to_hiragana
+
+# 人物検索の対象列と重み（テーブル名 → {列名: 重み}）
+SEARCH_FIELDS = {
+    "employees": {
+        "name": 3.0,
+        "kana": 3.0,
+        "hometown": 1.0,
+        "elementary_school": 1.0,
+        "junior_high_school": 1.0,
+        "high_school": 1.0,
+        "university": 1.5,
+        "faculty": 1.0,
+        "graduate_school": 1.0,
+        "major": 1.0,
+    },
+    "skill_info": {"skill": 3.0},
+    "project_info": {"project": 1.5, "skill": 2.0, "comment": 1.0},
+    "insight_info": {"insight": 1.5, "skill": 2.0, "comment": 1.0},
+    "employment_history": {"knowledge": 2.0, "company_name": 1.0, "job_title": 1.0, "description": 1.0},
+    "private_info": {
+        "hobbies": 2.0,
+        "nickname": 1.0,
+        "lessons": 1.0,
+        "club_activities": 1.5,
+        "circles": 1.0,
+        "holiday_activities": 1.0,
+        "activities_free": 1.0,
+        "favorite_things_free": 1.0,
+    },
+}
+
+# ファセット名 → (テーブル名, 列名)
+FACET_FIELDS = {
+    "university": ("employees", "university"),
+    "hometown": ("employees", "hometown"),
+    "mbti": ("private_info", "mbti"),
+    "blood_type": ("private_info", "blood_type"),
+}
+
+# 「Python, Java」「釣り・キャンプ」のような列挙を語に分ける区切り
+_TOKEN_SEPARATORS = re.compile(r"[\s　,，、/／・|｜;；]+")
+
+
+def index_text(value: str) -> str:
+    """
+    索引・検索で比較する形にそろえる（NFKC・小文字化・空白除去・カタカナ→ひらがな）。
+    """
+    return to_hiragana(normalize_text(value or ""))
+
+
+class PeopleSearchIndex:
+    """
+    プロフィール各テーブルを社員（employee_id）単位の文書にまとめたインメモリ全文検索インデックス。
+    文書の文字 n-gram で転置インデックスを作り、検索語のすべての n-gram を含む社員だけを
+    候補として部分一致を確認・スコアリングする。
+    行単位（テーブル名 + 行の id）で保持するため、CRUD の書き込みごとに差分で更新できる。
+    """
+
+    def __init__(self, facet_limit: int = 20):
+        self.facet_limit = facet_limit
+        # (テーブル名, 行の id) → (employee_id, {列名: (比較用の文字列, 語の集合)})
+        self.rows: dict[tuple[str, int], tuple[int, dict[str, tuple[str, frozenset[str]]]]] = {}
+        self.rows_by_employee: dict[int, set[tuple[str, int]]] = defaultdict(set)
+        # employee_id → {"id": employees.id, "employee_id", "name"}
+        self.people: dict[int, dict] = {}
+        # employee_id → {ファセット名: 値}
+        self.facets: dict[int, dict[str, str]] = defaultdict(dict)
+        self.grams: dict[int, set[str]] = {}
+        self.postings: dict[str, set[int]] = defaultdict(set)
+        # 最後に全件再構築した時刻（time.monotonic）。未構築なら None
+        self.rebuilt_at: float | None = None
+
+    # --- 更新 ---
+
+    def _reindex(self, employee_id: int):
+        grams = set()
+        for key in self.rows_by_employee.get(employee_id, ()):
+            for text, _ in self.rows[key][1].values():
+                grams |= index_grams(text)
+
+        old = self.grams.get(employee_id, set())
+        for gram in old - grams:
+            ids = self.postings.get(gram)
+            if ids is not None:
+                ids.discard(employee_id)
+                if not ids:
+                    del self.postings[gram]
+        for gram in grams - old:
+            self.postings[gram].add(employee_id)
+
+        if grams:
+            self.grams[employee_id] = grams
+        else:
+            self.grams.pop(employee_id, None)
+
+    def _set_facets(self, table: str, employee_id: int, row):
+        for facet, (facet_table, column) in FACET_FIELDS.items():
+            if facet_table != table:
+                continue
+            value = (getattr(row, column, None) or "").strip() if row is not None else ""
+            if value:
+                self.facets[employee_id][facet] = value
+            else:
+                self.facets[employee_id].pop(facet, None)
+
+    def _put(self, table: str, row):
+        fields = SEARCH_FIELDS.get(table)
+        if fields is None:
+            return None
+        employee_id = row.employee_id
+        key = (table, row.id)
+
+        values = {}
+        for column in fields:
+            raw = getattr(row, column, None)
+            text = index_text(raw)
+            if text:
+                tokens = frozenset(filter(None, (index_text(token) for token in _TOKEN_SEPARATORS.split(raw))))
+                values[column] = (text, tokens)
+        self.rows[key] = (employee_id, values)
+        self.rows_by_employee[employee_id].add(key)
+
+        if table == "employees":
+            self.people[employee_id] = {"id": row.id, "employee_id": employee_id, "name": row.name}
+        self._set_facets(table, employee_id, row)
+        return employee_id
+
+    def _remove(self, table: str, id: int):
+        entry = self.rows.pop((table, id), None)
+        if entry is None:
+            return None
+        employee_id = entry[0]
+        self.rows_by_employee[employee_id].discard((table, id))
+        if not self.rows_by_employee[employee_id]:
+            del self.rows_by_employee[employee_id]
+        if table == "employees":
+            self.people.pop(employee_id, None)
+        self._set_facets(table, employee_id, None)
+        if not self.facets[employee_id]:
+            del self.facets[employee_id]
+        return employee_id
+
+    def apply_write(self, table: str, operation: str, row):
+        """
+        CRUD の書き込み（operation は "create" / "update" / "delete"）をインデックスに反映する。
+        row は少なくとも id と employee_id を持つオブジェクト。未構築の間は何もしない
+        （初回の検索時に全件を読み込むため）。
+        """
+        if self.rebuilt_at is None or table not in SEARCH_FIELDS:
+            return
+        affected = {self._remove(table, row.id)}
+        if operation != "delete":
+            affected.add(self._put(table, row))
+        for employee_id in affected - {None}:
+            self._reindex(employee_id)
+
+    def rebuild(self, rows):
+        """
+        (テーブル名, 行) の列からインデックスを作り直す。
+        """
+        self.rows.clear()
+        self.rows_by_employee.clear()
+        self.people.clear()
+        self.facets.clear()
+        self.grams.clear()
+        self.postings.clear()
+        employee_ids = {self._put(table, row) for table, row in rows}
+        for employee_id in employee_ids - {None}:
+            self._reindex(employee_id)
+        self.rebuilt_at = time.monotonic()
+
+    # --- 検索 ---
+
+    def _candidates(self, term: str) -> set[int]:
+        # 2文字以上の語は bigram だけで絞り込める（unigram の posting は大きいので使わない）
+        grams = ngrams(term, 2) if len(term) > 1 else ngrams(term, 1)
+        sets = sorted((self.postings.get(gram, set()) for gram in grams), key=len)
+        if not sets:
+            return set()
+        return set.intersection(*sets)
+
+    def _match(self, employee_id: int, term: str):
+        """
+        検索語に一致する列を探し、(最も高いスコア, 一致した "テーブル名.列名" のリスト) を返す。
+        語として完全一致 > 語の前方一致 > 部分一致 の順に高くする。
+        """
+        best = 0.0
+        matched = []
+        for key in self.rows_by_employee.get(employee_id, ()):
+            table = key[0]
+            for column, (text, tokens) in self.rows[key][1].items():
+                if term not in text:
+                    continue
+                if term in tokens:
+                    bonus = 2.0
+                elif any(token.startswith(term) for token in tokens):
+                    bonus = 1.5
+                else:
+                    bonus = 1.0
+                best = max(best, SEARCH_FIELDS[table][column] * bonus)
+                matched.append(f"{table}.{column}")
+        return best, matched
+
+    def search(self, query: str = "", filters: dict[str, str] | None = None, limit: int = 20, offset: int = 0):
+        """
+        全文検索とファセットでの絞り込みを行い、(該当件数, ページ分の結果, ファセットの集計) を返す。
+        query は空白区切りの AND 検索。空の場合はファセットの条件だけで絞り込む。
+        結果は {"id", "employee_id", "name", "score", "matched_fields"}、
+        ファセットは {ファセット名: [{"value", "count"}...]}（絞り込み後の結果での件数）。
+        """
+        terms = [index_text(term) for term in _TOKEN_SEPARATORS.split(query or "")]
+        terms = [term for term in terms if term]
+        filters = {facet: value.strip() for facet, value in (filters or {}).items() if value and value.strip()}
+
+        if terms:
+            candidates = None
+            for term in sorted(terms, key=lambda term: -len(term)):
+                ids = self._candidates(term)
+                candidates = ids if candidates is None else candidates & ids
+                if not candidates:
+                    break
+        else:
+            candidates = set(self.people)
+
+        results = []
+        for employee_id in candidates or ():
+            person = self.people.get(employee_id)
+            if person is None:
+                continue
+            facets = self.facets.get(employee_id, {})
+            if any(facets.get(facet) != value for facet, value in filters.items()):
+                continue
+            score = 0.0
+            matched_fields = []
+            for term in terms:
+                term_score, matched = self._match(employee_id, term)
+                if not term_score:
+                    break
+                score += term_score
+                matched_fields += [field for field in matched if field not in matched_fields]
+            else:
+                results.append((score, person, matched_fields))
+
+        results.sort(key=lambda item: (-item[0], item[1]["name"] or "", item[1]["employee_id"]))
+
+        counts = {facet: Counter() for facet in FACET_FIELDS}
+        for _, person, _ in results:
+            for facet, value in self.facets.get(person["employee_id"], {}).items():
+                counts[facet][value] += 1
+        facets = {
+            facet: [
+                {"value": value, "count": count}
+                for value, count in sorted(counter.items(), key=lambda item: (-item[1], item[0]))[:self.facet_limit]
+            ]
+            for facet, counter in counts.items()
+        }
+
+        items = [
+            {**person, "score": round(score, 3), "matched_fields": matched_fields}
+            for score, person, matched_fields in results[offset:offset + limit]
+        ]
+        return len(results), items, facets
+
+
+people_index = PeopleSearchIndex()
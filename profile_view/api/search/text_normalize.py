@@ -0,0 +1,167 @@
+import re
+import unicodedata
+
+# 検索用の文字列正規化
+# 漢字・かな・ローマ字の表記ゆれを吸収するため、名前ごとに次の形を作って索引に登録する。
+#   - NFKC + 小文字化 + 空白除去した元の表記
+#   - カタカナをひらがなにそろえた表記
+#   - かなをローマ字（ヘボン式ベース）に変換し、表記ゆれをそろえた表記
+
+_SPACES = re.compile(r"[\s　・･.\-_'’]+")
+
+_ROMAJI = {
+    "あ": "a", "い": "i", "う": "u", "え": "e", "お": "o",
+    "か": "ka", "き": "ki", "く": "ku", "け": "ke", "こ": "ko",
+    "さ": "sa", "し": "shi", "す": "su", "せ": "se", "そ": "so",
+    "た": "ta", "ち": "chi", "つ": "tsu", "て": "te", "と": "to",
+    "な": "na", "に": "ni", "ぬ": "nu", "ね": "ne", "の": "no",
+    "は": "ha", "ひ": "hi", "ふ": "fu", "へ": "he", "ほ": "ho",
+    "ま": "ma", "み": "mi", "む": "mu", "め": "me", "も": "mo",
+    "や": "ya", "ゆ": "yu", "よ": "yo",
+    "ら": "ra", "り": "ri", "る": "ru", "れ": "re", "ろ": "ro",
+    "わ": "wa", "ゐ": "i", "ゑ": "e", "を": "o", "ん": "n",
+    "が": "ga", "ぎ": "gi", "ぐ": "gu", "げ": "ge", "ご": "go",
+    "ざ": "za", "じ": "ji", "ず": "zu", "ぜ": "ze", "ぞ": "zo",
+    "だ": "da", "ぢ": "ji", "づ": "zu", "で": "de", "ど": "do",
+    "ば": "ba", "び": "bi", "ぶ": "bu", "べ": "be", "ぼ": "bo",
+    "ぱ": "pa", "ぴ": "pi", "ぷ": "pu", "ぺ": "pe", "ぽ": "po",
+    "ゔ": "vu",
+    "ぁ": "a", "ぃ": "i", "ぅ": "u", "ぇ": "e", "ぉ": "o",
+    "ゃ": "ya", "ゅ": "yu", "ょ": "yo", "ゎ": "wa",
+}
+
+# 拗音（きゃ など）は2文字まとめて変換する
+_YOON = {
+    "ゃ": "a", "ゅ": "u", "ょ": "o",
+}
+_YOON_BASE = {
+    "き": "ky", "ぎ": "gy", "し": "sh", "じ": "j", "ち": "ch", "ぢ": "j",
+    "に": "ny", "ひ": "hy", "び": "by", "ぴ": "py", "み": "my", "り": "ry",
+}
+
+# ローマ字の表記ゆれ（訓令式・長音など）をそろえる置換。順番に適用する
+_ROMAJI_VARIANTS = [
+    (re.compile(r"sy([aueo])"), r"sh\1"),
+    (re.compile(r"(?:ty|cy)([aueo])"), r"ch\1"),
+    (re.compile(r"(?:zy|jy|dy)([aueo])"), r"j\1"),
+    (re.compile(r"si"), "shi"),
+    (re.compile(r"ti"), "chi"),
+    (re.compile(r"tu"), "tsu"),
+    (re.compile(r"(?<![sc])hu"), "fu"),
+    (re.compile(r"(?:zi|di)"), "ji"),
+    (re.compile(r"du"), "zu"),
+    (re.compile(r"m(?=[bpm])"), "n"),
+    (re.compile(r"nn"), "n"),
+    (re.compile(r"oh(?![aiueo])"), "o"),
+    (re.compile(r"o[ou]"), "o"),
+    (re.compile(r"uu"), "u"),
+    (re.compile(r"aa"), "a"),
+    (re.compile(r"ii"), "i"),
+]
+
+
+def normalize_text(text: str) -> str:
+    """
+    NFKC 正規化・小文字化し、空白や区切り記号を取り除く。
+    """
+    if not text:
+        return ""
+    return _SPACES.sub("", unicodedata.normalize("NFKC", text).lower())
+
+
+def to_hiragana(text: str) -> str:
+    """
+    カタカナをひらがなに変換する（それ以外の文字はそのまま）。
+    """
+    return "".join(
+        chr(ord(ch) - 0x60) if "ァ" <= ch <= "ヶ" else ch
+        for ch in text
+    )
+
+
+def is_kana(text: str) -> bool:
+    return bool(text) and all("ぁ" <= ch <= "ゟ" or ch == "ー" for ch in to_hiragana(text))
+
+
+def is_romaji(text: str) -> bool:
+    return bool(text) and all("a" <= ch <= "z" for ch in text)
+
+
+def kana_to_romaji(text: str) -> str:
+    """
+    かな（ひらがな・カタカナ）をローマ字に変換する。かな以外の文字はそのまま残す。
+    """
+    text = to_hiragana(text)
+    result = []
+    i = 0
+    double_next = False
+    while i < len(text):
+        ch = text[i]
+        next_ch = text[i + 1] if i + 1 < len(text) else ""
+
+        if ch == "っ":
+            double_next = True
+            i += 1
+            continue
+        if ch == "ー":
+            # 長音は直前の母音を伸ばすだけなので、表記ゆれ吸収のため読み飛ばす
+            i += 1
+            continue
+
+        if ch in _YOON_BASE and next_ch in _YOON:
+            romaji = _YOON_BASE[ch] + _YOON[next_ch]
+            i += 2
+        else:
+            romaji = _ROMAJI.get(ch, ch)
+            i += 1
+
+        if double_next:
+            romaji = ("t" if romaji.startswith("ch") else romaji[0]) + romaji
+            double_next = False
+        result.append(romaji)
+    return "".join(result)
+
+
+def normalize_romaji(text: str) -> str:
+    """
+    ローマ字の表記ゆれ（si/shi, tu/tsu, 長音の ou/oo など）をそろえる。
+    """
+    for pattern, replacement in _ROMAJI_VARIANTS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def search_keys(text: str, reading: str | None = None) -> set[str]:
+    """
+    名前（と読みがな）から、索引・検索に使う正規化済みの表記の集合を作る。
+    reading には漢字名の読み（かな）を指定できる。
+    """
+    keys = set()
+    for value in (text, reading):
+        normalized = normalize_text(value or "")
+        if not normalized:
+            continue
+        keys.add(normalized)
+        hiragana = to_hiragana(normalized)
+        keys.add(hiragana)
+        if is_kana(hiragana):
+            keys.add(normalize_romaji(kana_to_romaji(hiragana)))
+        elif is_romaji(normalized):
+            keys.add(normalize_romaji(normalized))
+    return keys
+
+
+def ngrams(text: str, n: int = 2) -> set[str]:
+    """
+    文字 n-gram の集合を返す。n 文字未満の文字列はそれ自体を返す。
+    """
+    if len(text) < n:
+        return {text} if text else set()
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def index_grams(text: str) -> set[str]:
+    """
+    1文字の検索語にも対応するため、unigram と bigram の両方を使う。
+    """
+    return ngrams(text, 1) | ngrams(text, 2)
@@ -0,0 +1,80 @@
+import datetime
+import json
+import types
+import typing
+from functools import lru_cache
+from typing import Type
+
+from pydantic import BaseModel
+
+# レスポンス本文の JSON シリアライズ
+# orjson があれば使い、なければ標準の json で同じ形の出力を作る。
+# DB から読んだ行は型が確定しているため、列が単純な型（int / str / 日付など）だけのスキーマは
+# Pydantic の検証を通さず、スキーマの列名で値を取り出してそのままシリアライズする。
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson が無い環境では標準の json を使う
+    orjson = None
+
+# 検証を省いても Pydantic の mode="json" と同じ出力になる型
+_PLAIN_TYPES = (int, float, str, bool, datetime.date, datetime.datetime, type(None))
+
+
+def _default(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value) -> bytes:
+    """
+    JSON 互換の値（日付を含んでもよい）を UTF-8 の JSON バイト列にする。
+    """
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+def _is_plain(annotation) -> bool:
+    if annotation in _PLAIN_TYPES:
+        return True
+    if typing.get_origin(annotation) in (typing.Union, types.UnionType):
+        return all(_is_plain(arg) for arg in typing.get_args(annotation))
+    return False
+
+
+@lru_cache(maxsize=None)
+def plain_fields(schema_out: Type[BaseModel]) -> tuple[str, ...] | None:
+    """
+    スキーマの全列が単純な型であれば列名のタプルを、そうでなければ None を返す。
+    """
+    fields = schema_out.model_fields
+    if all(_is_plain(field.annotation) and field.alias is None for field in fields.values()):
+        return tuple(fields)
+    return None
+
+
+def row_to_dict(schema_out: Type[BaseModel], item) -> dict:
+    """
+    ORM オブジェクトなどを、スキーマの列だけを持つ dict に変換する。
+    model_validate(from_attributes=True).model_dump(exclude_unset=True) と同じく、持っていない列は含めない。
+    単純な型だけのスキーマは検証を省き、それ以外は Pydantic で変換する。
+    """
+    names = plain_fields(schema_out)
+    if names is None:
+        return schema_out.model_validate(item, from_attributes=True).model_dump(mode="json", exclude_unset=True)
+    missing = object()
+    row = {}
+    for name in names:
+        value = getattr(item, name, missing)
+        if value is not missing:
+            row[name] = value
+    return row
+
+
+def dump_rows(schema_out: Type[BaseModel], items) -> bytes:
+    """
+    行のリストを JSON 配列のバイト列にする。
+    """
+    return dumps([row_to_dict(schema_out, item) for item in items])
@@ -0,0 +1,96 @@
+import logging
+import os
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+logger = logging.getLogger(__name__)
+
+# 起動時間の計測（コールドスタートの内訳）
+# モジュールの import と、起動処理（エンジン作成・接続の事前確立など）の所要時間を記録し、
+# 起動完了時にログへ出力する。GET /system/startup でも確認できる。
+#   STARTUP_BUDGET_MS     起動時間の目標・ミリ秒（既定: 0 = 判定しない）。超えたら警告をログに出す
+
+
+def process_uptime() -> float | None:
+    """
+    プロセスの開始からの経過秒数（Linux のみ。取得できなければ None）。
+    インタープリタ自体や uvicorn の import など、api.main より前の時間も含めて見るために使う。
+    """
+    try:
+        with open("/proc/self/stat") as f:
+            # comm に空白が含まれても崩れないよう、最後の ')' の後ろから数える
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class StartupProfile:
+    """
+    起動の各段階（import / init）の所要時間の記録。
+    """
+
+    def __init__(self, budget_ms: float = 0):
+        self.budget_ms = budget_ms
+        self.started = time.perf_counter()
+        self.process_started_before = process_uptime()
+        self.phases: list[dict] = []
+        self.ready_ms: float | None = None
+
+    def _elapsed_ms(self, since: float) -> float:
+        return round((time.perf_counter() - since) * 1000, 1)
+
+    @contextmanager
+    def phase(self, kind: str, name: str):
+        """
+        with ブロックの所要時間を記録する。kind は "import" または "init"。
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append({"kind": kind, "name": name, "ms": self._elapsed_ms(started)})
+
+    @asynccontextmanager
+    async def async_phase(self, kind: str, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append({"kind": kind, "name": name, "ms": self._elapsed_ms(started)})
+
+    def ready(self):
+        """
+        起動完了（リクエストを受け付けられる状態）を記録し、内訳をログに出す。
+        """
+        self.ready_ms = self._elapsed_ms(self.started)
+        report = self.report()
+        logger.info(
+            "起動完了: %.0f ms（プロセス開始から %s ms）。内訳: %s",
+            report["ready_ms"],
+            report["process_ready_ms"],
+            ", ".join(f"{p['name']}={p['ms']:.0f}ms" for p in report["slowest"]),
+        )
+        if report["over_budget"]:
+            logger.warning("起動時間が目標（%.0f ms）を超えました: %.0f ms", self.budget_ms, report["ready_ms"])
+
+    def report(self) -> dict:
+        total = {kind: round(sum(p["ms"] for p in self.phases if p["kind"] == kind), 1) for kind in ("import", "init")}
+        process_ready_ms = None
+        if self.process_started_before is not None and self.ready_ms is not None:
+            process_ready_ms = round(self.process_started_before * 1000 + self.ready_ms, 1)
+        return {
+            "ready_ms": self.ready_ms,
+            "process_ready_ms": process_ready_ms,
+            "import_ms": total["import"],
+            "init_ms": total["init"],
+            "budget_ms": self.budget_ms or None,
+            "over_budget": bool(self.budget_ms and self.ready_ms is not None and self.ready_ms > self.budget_ms),
+            "slowest": sorted(self.phases, key=lambda p: p["ms"], reverse=True)[:5],
+            "phases": list(self.phases),
+        }
+
+
+startup_profile = StartupProfile(budget_ms=float(os.getenv("STARTUP_BUDGET_MS", "0")))
@@ -0,0 +1,248 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from urllib.parse import quote
+
+# 大きなファイル（セミナー動画など）のブロック分割アップロード
+# ブラウザはファイルをブロックに分けて、ブロックごとの書き込み用 URL（SAS）へ並列に Put Block し、
+# 全ブロックが揃ったらサーバーが Put Block List で Blob を確定する。
+# セッションの状態はサーバーに持たない。アップロード ID は設定（Blob 名・サイズ・ブロックの大きさ）を署名したトークンで、
+# 届いたブロックは Blob サービスのブロックの一覧から求める。そのため再起動や複数レプリカでも、
+# 中断したアップロードを届いていないブロックから再開できる。
+#   UPLOAD_BLOCK_SIZE        ブロックの大きさ・バイト（既定: 8MiB。ブロック数が MAX_BLOCKS を超える場合は大きくする）
+#   UPLOAD_MAX_BYTES         1ファイルの大きさの上限・バイト（既定: 5GiB）
+#   UPLOAD_MAX_FILES         1回のリクエストで作れるセッションの数（既定: 20）
+#   UPLOAD_GRANT_MINUTES     ブロックの書き込み用 SAS の有効期間・分（既定: 15）
+#   UPLOAD_SESSION_HOURS     アップロード ID の有効期間・時間（既定: 168。未確定のブロックが Blob サービスに残る7日間）
+#   UPLOAD_SESSION_SECRET    アップロード ID の署名鍵（既定: ストレージのアカウントキーから作る）
+
+# Blob 1つあたりのブロック数の上限（Blob サービスの制限）
+MAX_BLOCKS = 50000
+MIB = 1024 * 1024
+
+
+class UploadIncomplete(Exception):
+    """
+    確定しようとしたが、届いていないブロックがある。
+    """
+
+    def __init__(self, missing: list[int]):
+        super().__init__(f"{len(missing)} blocks are missing")
+        self.missing = missing
+
+
+@dataclass(frozen=True)
+class UploadSession:
+    """
+    1ファイルのアップロードの設定。nonce はブロック ID に含め、同じ Blob への別のアップロードのブロックと区別する。
+    """
+    blob_name: str
+    size: int
+    block_size: int
+    content_type: str | None
+    nonce: str
+    expires_at: int
+
+    @property
+    def block_count(self) -> int:
+        return -(-self.size // self.block_size)
+
+    def block_id(self, index: int) -> str:
+        # 1つの Blob のブロック ID はすべて同じ長さにする必要がある
+        return f"{self.nonce}-{index:06d}"
+
+    def block_range(self, index: int) -> tuple[int, int]:
+        offset = index * self.block_size
+        return offset, min(self.block_size, self.size - offset)
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+class UploadSessionManager:
+    """
+    アップロード ID の発行・検証と、ブロックの書き込み URL の発行、ブロックの確認と確定を行う。
+    署名と URL の組み立ては sign_write_url / blob_url に、ブロックの操作は Blob バックエンドに委譲する。
+    """
+
+    def __init__(
+        self,
+        backend_factory,
+        sign_write_url,
+        blob_url,
+        secret_factory,
+        block_size: int = 8 * MIB,
+        max_bytes: int = 5 * 1024 * MIB,
+        max_files: int = 20,
+        grant_minutes: float = 15,
+        session_hours: float = 24 * 7,
+    ):
+        self.backend_factory = backend_factory
+        self.sign_write_url = sign_write_url
+        self.blob_url = blob_url
+        self.secret_factory = secret_factory
+        self.block_size = block_size
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.grant_minutes = grant_minutes
+        self.session_hours = session_hours
+        self._secret: bytes | None = None
+
+    def secret(self) -> bytes:
+        if self._secret is None:
+            self._secret = self.secret_factory()
+        return self._secret
+
+    def create(self, blob_name: str, size: int, content_type: str | None = None) -> UploadSession:
+        """
+        新しいアップロードを作る。Blob 名・サイズが不正なら ValueError を送出する。
+        """
+        if not blob_name or "/" in blob_name or "\\" in blob_name or blob_name in (".", ".."):
+            raise ValueError(f"Invalid file name: {blob_name!r}")
+        if size < 1 or size > self.max_bytes:
+            raise ValueError(f"File size must be between 1 and {self.max_bytes} bytes")
+        block_size = max(self.block_size, -(-size // MAX_BLOCKS))
+        return UploadSession(
+            blob_name=blob_name,
+            size=size,
+            block_size=block_size,
+            content_type=content_type,
+            nonce=secrets.token_hex(6),
+            expires_at=int(time.time() + self.session_hours * 3600),
+        )
+
+    def encode(self, session: UploadSession) -> str:
+        """
+        アップロードの設定を署名し、アップロード ID（URL にそのまま使える文字列）にする。
+        """
+        payload = _b64encode(json.dumps(
+            [session.blob_name, session.size, session.block_size, session.content_type, session.nonce, session.expires_at],
+            ensure_ascii=False, separators=(",", ":"),
+        ).encode("utf-8"))
+        signature = _b64encode(hmac.new(self.secret(), payload.encode("ascii"), hashlib.sha256).digest())
+        return f"{payload}.{signature}"
+
+    def decode(self, upload_id: str) -> UploadSession:
+        """
+        アップロード ID を検証して設定に戻す。改ざん・期限切れ・形式の誤りは LookupError を送出する。
+        """
+        payload, _, signature = upload_id.partition(".")
+        expected = _b64encode(hmac.new(self.secret(), payload.encode("ascii", "replace"), hashlib.sha256).digest())
+        if not hmac.compare_digest(signature, expected):
+            raise LookupError("Unknown upload")
+        try:
+            session = UploadSession(*json.loads(_b64decode(payload)))
+        except (ValueError, TypeError):
+            raise LookupError("Unknown upload") from None
+        if session.expires_at < time.time():
+            raise LookupError("Upload expired")
+        return session
+
+    async def staged_blocks(self, session: UploadSession) -> set[int]:
+        """
+        届いている（大きさも正しい）ブロックの番号を返す。確定済みのブロックも含める（確定の再試行のため）。
+        """
+        committed, uncommitted = await self.backend_factory().block_list(session.blob_name)
+        staged = set()
+        for index in range(session.block_count):
+            block_id = session.block_id(index)
+            size = uncommitted.get(block_id, committed.get(block_id))
+            if size == session.block_range(index)[1]:
+                staged.add(index)
+        return staged
+
+    def grants(self, session: UploadSession, indexes) -> tuple[list[dict], datetime]:
+        """
+        ブロックごとの書き込み URL を返す。SAS は Blob 単位のため1回だけ署名し、ブロックの URL で共有する。
+        """
+        expires_on = datetime.now(timezone.utc) + timedelta(minutes=self.grant_minutes)
+        sas_url = self.sign_write_url(session.blob_name, expires_on)
+        grants = []
+        for index in indexes:
+            block_id = base64.b64encode(session.block_id(index).encode("utf-8")).decode("ascii")
+            offset, length = session.block_range(index)
+            grants.append({
+                "index": index,
+                "blockId": block_id,
+                "offset": offset,
+                "length": length,
+                "url": f"{sas_url}&comp=block&blockid={quote(block_id, safe='')}",
+            })
+        return grants, expires_on
+
+    def describe(self, upload_id: str, session: UploadSession, staged: set[int]) -> dict:
+        """
+        アップロードの状態と、届いていないブロックの書き込み URL を返す（UploadSessionOut の形）。
+        """
+        missing = [index for index in range(session.block_count) if index not in staged]
+        grants, expires_on = self.grants(session, missing)
+        return {
+            "uploadId": upload_id,
+            "fileName": session.blob_name,
+            "storageUrl": self.blob_url(session.blob_name),
+            "size": session.size,
+            "blockSize": session.block_size,
+            "blockCount": session.block_count,
+            "stagedBlocks": sorted(staged),
+            "grants": grants,
+            "grantsExpireOn": expires_on,
+            "sessionExpiresOn": datetime.fromtimestamp(session.expires_at, timezone.utc),
+        }
+
+    async def commit(self, session: UploadSession):
+        """
+        全ブロックが揃っていれば Blob を確定する。届いていないブロックがあれば UploadIncomplete を送出する。
+        同じアップロードを確定し直しても同じ内容になる。
+        """
+        staged = await self.staged_blocks(session)
+        missing = [index for index in range(session.block_count) if index not in staged]
+        if missing:
+            raise UploadIncomplete(missing)
+        await self.backend_factory().commit_blocks(
+            session.blob_name,
+            [session.block_id(index) for index in range(session.block_count)],
+            session.content_type,
+        )
+
+
+def upload_session_secret() -> bytes:
+    """
+    アップロード ID の署名鍵。UPLOAD_SESSION_SECRET が無ければストレージのアカウントキーから作る。
+    """
+    secret = os.getenv("UPLOAD_SESSION_SECRET")
+    if secret:
+        return secret.encode("utf-8")
+    from api.routers.storage import storage_account
+
+    return hashlib.sha256(b"upload-session:" + storage_account()[1].encode("utf-8")).digest()
+
+
+def create_upload_session_manager_from_env() -> UploadSessionManager:
+    """
+    環境変数の設定からマネージャーを作る。
+    """
+    from api.blob_backend import get_blob_backend
+    from api.routers.storage import blob_url, sign_write_url
+
+    return UploadSessionManager(
+        get_blob_backend,
+        sign_write_url,
+        blob_url,
+        upload_session_secret,
+        block_size=int(os.getenv("UPLOAD_BLOCK_SIZE", str(8 * MIB))),
+        max_bytes=int(os.getenv("UPLOAD_MAX_BYTES", str(5 * 1024 * MIB))),
+        max_files=int(os.getenv("UPLOAD_MAX_FILES", "20")),
+        grant_minutes=float(os.getenv("UPLOAD_GRANT_MINUTES", "15")),
+        session_hours=float(os.getenv("UPLOAD_SESSION_HOURS", str(24 * 7))),
+    )
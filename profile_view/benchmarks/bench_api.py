@@ -0,0 +1,409 @@
+"""
+API のベンチマーク
+
+api.main.app を、ローカルの代替 DB（既定は SQLite + aiosqlite）と偽の SAS 署名器で起動し、
+社員 N 人分のプロフィール（employees + 関連6テーブル）とプロジェクトメンバーを投入したうえで、
+主なエンドポイントのスループットと p50 / p95 / p99 レイテンシを測定して JSON に保存する。
+
+使い方（profile_view ディレクトリで実行）:
+    pip install -r requirements.txt -r benchmarks/requirements.txt
+    python -m benchmarks.bench_api --employees 500 --requests 300 --concurrency 10
+    python -m benchmarks.bench_api --compare benchmarks/results/<前回の結果>.json
+
+ローカルの SQL Server コンテナで測る場合は --database-url / --project-database-url に
+mssql+aioodbc://... を指定する（テーブルがなければ作成し、データを追加する。本番 DB には向けないこと）。
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import types
+from datetime import datetime, timezone
+from pathlib import Path
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+SKILLS = ["Python", "Java", "Go", "TypeScript", "React", "Kubernetes", "Docker", "AWS", "Azure", "SQL"]
+HOBBIES = ["テニス", "キャンプ", "釣り", "読書", "映画", "料理", "ランニング", "ゴルフ"]
+HOMETOWNS = ["東京", "大阪", "福岡", "北海道", "愛知", "京都"]
+UNIVERSITIES = ["東京大学", "京都大学", "大阪大学", "早稲田大学", "慶應義塾大学"]
+FAMILY_NAMES = [("山田", "やまだ"), ("佐藤", "さとう"), ("鈴木", "すずき"), ("高橋", "たかはし"), ("田中", "たなか")]
+GIVEN_NAMES = [("太郎", "たろう"), ("花子", "はなこ"), ("翔太", "しょうた"), ("美咲", "みさき"), ("健", "けん")]
+
+
+# --- 環境の準備 ---
+
+def configure_environment(args, workdir: Path):
+    """
+    api を import する前に、接続先・キャッシュ・Blob などの設定を環境変数で差し替える。
+    """
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite+aiosqlite:///{workdir / 'profile.db'}"
+    os.environ["PROJECT_DATABASE_URL"] = args.project_database_url or f"sqlite+aiosqlite:///{workdir / 'project.db'}"
+    os.environ["RESPONSE_CACHE_BACKEND"] = args.response_cache
+    os.environ["BLOB_BACKEND"] = "filesystem"
+    os.environ["BLOB_FILESYSTEM_ROOT"] = str(workdir / "blobs")
+    os.environ.setdefault(
+        "AZURE_STORAGE_CONNECTION_STRING",
+        "DefaultEndpointsProtocol=https;AccountName=bench;AccountKey=YmVuY2g=;EndpointSuffix=core.windows.net",
+    )
+    os.environ.setdefault("AZURE_STORAGE_CONTAINER_NAME", "bench")
+
+    # api/config.py は秘密情報を含むためリポジトリにない。なければ環境変数から同じ形の設定を作る
+    try:
+        import api.config  # noqa: F401
+    except ModuleNotFoundError:
+        config = types.ModuleType("api.config")
+        config.settings = types.SimpleNamespace(
+            AZURE_STORAGE_CONNECTION_STRING=os.environ["AZURE_STORAGE_CONNECTION_STRING"],
+            AZURE_STORAGE_CONTAINER_NAME=os.environ["AZURE_STORAGE_CONTAINER_NAME"],
+        )
+        sys.modules["api.config"] = config
+
+
+def use_fake_signer():
+    """
+    SAS 署名を、HMAC を計算しない偽の署名器に差し替える（Azure の資格情報なしで測定するため）。
+    """
+    from api.routers.storage import read_url_signer
+
+    read_url_signer.sign_func = lambda blob_name: f"https://bench.invalid/bench/{blob_name}?sig=fake"
+    read_url_signer.clear()
+
+
+async def create_schema():
+    from api.database import Base, engine
+    from api.database_project import ProjectBase, project_engine
+    import api.models  # noqa: F401
+    import api.models_project  # noqa: F401
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with project_engine.begin() as conn:
+        await conn.run_sync(ProjectBase.metadata.create_all)
+
+
+def profile_payload(employee_id: int, rng: random.Random) -> dict:
+    """
+    社員1人分のプロフィール（POST /profiles の形式）を作る。
+    """
+    family, family_kana = rng.choice(FAMILY_NAMES)
+    given, given_kana = rng.choice(GIVEN_NAMES)
+    return {
+        "employee": {
+            "employee_id": employee_id,
+            "name": f"{family} {given}",
+            "kana": f"{family_kana} {given_kana}",
+            "hometown": rng.choice(HOMETOWNS),
+            "university": rng.choice(UNIVERSITIES),
+            "faculty": "工学部",
+            "photo_url": f"https://bench.blob.core.windows.net/bench/photo-{employee_id}.png",
+        },
+        "employment_history": {
+            "company_name": "株式会社ベンチ",
+            "job_title": "エンジニア",
+            "knowledge": ", ".join(rng.sample(SKILLS, 3)),
+            "description": "業務システムの開発",
+        },
+        "project_info": {"project": f"案件{employee_id % 50}", "skill": ", ".join(rng.sample(SKILLS, 2))},
+        "insight_info": {"insight": "業務改善", "skill": rng.choice(SKILLS), "comment": "知見の共有"},
+        "skill_info": {"skill": ", ".join(rng.sample(SKILLS, 4))},
+        "private_info": {
+            "hobbies": "・".join(rng.sample(HOBBIES, 2)),
+            "mbti": rng.choice(["INTJ", "ENFP", "ISTJ", "ESFP"]),
+            "blood_type": rng.choice(["A", "B", "O", "AB"]),
+            "nickname": f"bench{employee_id}",
+        },
+        "related_info": {
+            "profile_thumbnail_url": f"https://bench.blob.core.windows.net/bench/thumb-{employee_id}.png",
+            "seminar_videos": ",".join(
+                f"https://bench.blob.core.windows.net/bench/seminar-{employee_id}-{i}.mp4" for i in range(3)
+            ),
+            "seminar_thumbnail_url": ",".join(
+                f"https://bench.blob.core.windows.net/bench/seminar-{employee_id}-{i}.png" for i in range(3)
+            ),
+        },
+    }
+
+
+async def seed(employees: int, rng: random.Random) -> dict:
+    """
+    社員 employees 人分のプロフィールとプロジェクトメンバーを投入し、測定に使う id などを返す。
+    """
+    from api.database import AsyncSessionLocal
+    from api.database_project import AsyncProjectSessionLocal
+    from api.crud.profiles import PROFILE_MODELS
+    from api.crud.child_lists import CHILD_LIST_CRUDS
+    from api.models import Employee
+    from api.models_project import Project, TeamMember
+
+    names = []
+    async with AsyncSessionLocal() as db:
+        for i in range(employees):
+            payload = profile_payload(100000 + i, rng)
+            names.append(payload["employee"]["name"])
+            db.add(Employee(**payload["employee"]))
+            for key, model in PROFILE_MODELS.items():
+                db.add(model(employee_id=100000 + i, **payload[key]))
+            # 一覧（子テーブル）は旧テーブルのカンマ区切り列から作る（移行スクリプトと同じ内容）
+            for crud in CHILD_LIST_CRUDS.values():
+                legacy = types.SimpleNamespace(**payload[crud.legacy.model.__tablename__])
+                for position, item in enumerate(crud.legacy.split(legacy)):
+                    db.add(crud.model(employee_id=100000 + i, position=position, **item))
+        await db.commit()
+
+    async with AsyncProjectSessionLocal() as db:
+        projects = max(1, employees // 5)
+        db.add_all(Project(id=i + 1, name=f"案件{i}") for i in range(projects))
+        db.add_all(
+            TeamMember(project_id=i % projects + 1, member_name=name, role_title="メンバー")
+            for i, name in enumerate(names * 2)
+        )
+        await db.commit()
+
+    return {"employee_ids": list(range(1, employees + 1)), "names": names}
+
+
+# --- 測定 ---
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(p / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float, cpu: float = 0.0, sizes=()) -> dict:
+    ordered = sorted(latencies)
+    count = len(ordered)
+    wire_bytes = sum(wire for wire, _ in sizes)
+    body_bytes = sum(body for _, body in sizes)
+    return {
+        "requests": count,
+        "errors": errors,
+        "throughput_rps": round(count / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(ordered) / count * 1000, 3) if count else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3) if count else 0.0,
+        # プロセスの CPU 時間（アプリとベンチマーク側の HTTP クライアントの合計）
+        "cpu_ms_per_request": round(cpu / count * 1000, 3) if count else 0.0,
+        # 転送量（圧縮後）と、展開後の本文の大きさ
+        "wire_bytes_mean": round(wire_bytes / len(sizes)) if sizes else 0,
+        "body_bytes_mean": round(body_bytes / len(sizes)) if sizes else 0,
+    }
+
+
+async def run_scenario(client, make_request, total: int, concurrency: int, warmup: int) -> dict:
+    """
+    make_request(client, i) を total 回、concurrency 並列で実行して集計する（最初の warmup 回は集計しない）。
+    """
+    for i in range(warmup):
+        await make_request(client, -1 - i)
+
+    latencies: list[float] = []
+    sizes: list[tuple[int, int]] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            started = time.perf_counter()
+            response = await make_request(client, i)
+            latencies.append(time.perf_counter() - started)
+            sizes.append((response.num_bytes_downloaded, len(response.content)))
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started, time.process_time() - cpu_started, sizes)
+
+
+def scenarios(data: dict, rng: random.Random, employees: int) -> dict:
+    ids = data["employee_ids"]
+    names = data["names"]
+    next_employee_id = iter(range(900000, 10**7))
+
+    async def list_employees(client, i):
+        return await client.get("/employees/", params={"limit": 100, "after_id": rng.choice(ids) - 1})
+
+    async def directory(client, i):
+        return await client.get("/directory/", params={"sort": "kana", "limit": 100})
+
+    async def list_private_info(client, i):
+        return await client.get("/private_info/")
+
+    async def get_profile(client, i):
+        return await client.get(f"/profiles/{rng.choice(ids)}")
+
+    async def update_skill(client, i):
+        return await client.put(f"/skill_info/{rng.choice(ids)}", json={"skill": f"{rng.choice(SKILLS)}, bench {i}"})
+
+    async def update_seminar_video(client, i):
+        return await client.put(
+            f"/seminar_videos/{100000 + rng.choice(ids) - 1}/{rng.randrange(3)}",
+            json={"thumbnail_url": f"https://bench.blob.core.windows.net/bench/seminar-{i}.png"},
+        )
+
+    async def create_profile(client, i):
+        return await client.post("/profiles/", json=profile_payload(next(next_employee_id), rng))
+
+    async def member_search(client, i):
+        return await client.get("/project-management/members/search", params={"q": rng.choice(names).split()[0]})
+
+    async def employee_projects(client, i):
+        return await client.get(f"/project-management/employees/{100000 + rng.choice(ids) - 1}/projects")
+
+    async def people_search(client, i):
+        return await client.get("/search/", params={"q": rng.choice(SKILLS)})
+
+    return {
+        "list_employees": list_employees,
+        "directory": directory,
+        "list_private_info": list_private_info,
+        "get_profile": get_profile,
+        "update_skill": update_skill,
+        "update_seminar_video": update_seminar_video,
+        "create_profile": create_profile,
+        "member_search": member_search,
+        "employee_projects": employee_projects,
+        "people_search": people_search,
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True)
+        return commit + ("-dirty" if dirty.stdout.strip() else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> dict:
+    import httpx
+
+    rng = random.Random(args.seed)
+    await create_schema()
+    data = await seed(args.employees, rng)
+
+    from api.main import app
+
+    use_fake_signer()
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        from api.startup import startup_profile
+
+        startup = {key: value for key, value in startup_profile.report().items() if key != "phases"}
+        headers = {"Accept-Encoding": args.accept_encoding}
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+            for name, make_request in scenarios(data, rng, args.employees).items():
+                if args.only and name not in args.only:
+                    continue
+                results[name] = await run_scenario(client, make_request, args.requests, args.concurrency, args.warmup)
+                print(f"{name:20s} {json.dumps(results[name], ensure_ascii=False)}", flush=True)
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": os.environ["DATABASE_URL"].split(":", 1)[0],
+            "employees": args.employees,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "warmup": args.warmup,
+            "response_cache": args.response_cache,
+            "accept_encoding": args.accept_encoding,
+            "seed": args.seed,
+            # api.main の import からの起動時間（SQLite・偽の署名器での値。内訳の比較用）
+            "startup": startup,
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> bool:
+    """
+    前回の結果と比べて変化率を表示する。p95 が threshold を超えて悪化したシナリオがあれば False を返す。
+    """
+    ok = True
+    print(f"\n比較: {baseline['meta'].get('commit')} → {current['meta'].get('commit')}")
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if not before:
+            continue
+
+        def change(key):
+            return (result[key] - before[key]) / before[key] if before[key] else 0.0
+
+        regressed = change("p95_ms") > threshold
+        ok = ok and not regressed
+        print(
+            f"{name:20s} p50 {change('p50_ms'):+.1%}  p95 {change('p95_ms'):+.1%}  "
+            f"p99 {change('p99_ms'):+.1%}  rps {change('throughput_rps'):+.1%}"
+            + (f"  cpu {change('cpu_ms_per_request'):+.1%}" if "cpu_ms_per_request" in before else "")
+            + (f"  bytes {change('wire_bytes_mean'):+.1%}" if "wire_bytes_mean" in before else "")
+            + ("  ← 悪化" if regressed else "")
+        )
+    return ok
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="API のベンチマーク（SQLite などの代替 DB を使う）")
+    parser.add_argument("--employees", type=int, default=200, help="投入する社員数")
+    parser.add_argument("--requests", type=int, default=200, help="シナリオごとのリクエスト数")
+    parser.add_argument("--concurrency", type=int, default=10, help="同時リクエスト数")
+    parser.add_argument("--warmup", type=int, default=10, help="集計しないウォームアップのリクエスト数")
+    parser.add_argument("--seed", type=int, default=1, help="乱数のシード")
+    parser.add_argument("--only", nargs="*", help="実行するシナリオ名")
+    parser.add_argument(
+        "--response-cache", choices=["none", "memory"], default="none",
+        help="読み取りキャッシュ（既定は none で、毎回 DB まで通す）",
+    )
+    parser.add_argument(
+        "--accept-encoding", default="br, gzip",
+        help="リクエストの Accept-Encoding（identity で圧縮なしの転送量・CPU 時間と比べられる）",
+    )
+    parser.add_argument("--database-url", help="メイン DB の接続URL（既定: 一時ディレクトリの SQLite）")
+    parser.add_argument("--project-database-url", help="プロジェクト DB の接続URL（既定: 一時ディレクトリの SQLite）")
+    parser.add_argument("--output", type=Path, help="結果の JSON の保存先（既定: benchmarks/results/）")
+    parser.add_argument("--compare", type=Path, help="比較する前回の結果の JSON")
+    parser.add_argument("--fail-threshold", type=float, default=0.2, help="p95 の悪化をエラーにする割合")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix="profile-bench-") as workdir:
+        configure_environment(args, Path(workdir))
+        report = asyncio.run(run(args))
+
+    output = args.output or RESULTS_DIR / (
+        f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{report['meta']['commit'] or 'unknown'}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"\n結果を保存しました: {output}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        if not compare(report, baseline, args.fail_threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
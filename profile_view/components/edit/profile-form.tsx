@@ -11,7 +11,6 @@ import { useRouter } from "next/navigation"
 import Image from "next/image"
 import axios from 'axios'
 import { DelimitedTextarea } from "../DelimitedTextarea"
-import { BlockBlobClient } from "@azure/storage-blob"
 
 
 // UIコンポーネントのインポート
@@ -29,6 +28,7 @@ import { Separator } from "@/components/ui/separator"
 
 // APIと型定義のインポート
 import { api } from "@/lib/api"
+import { uploadFiles } from "@/lib/upload"
 import type { EmployeeOut } from "@/types/employee"
 import type { EmploymentHistoryOut } from "@/types/employment_history";
 import type { ProjectInfoOut } from "@/types/project_info";
@@ -210,31 +210,17 @@ const ProfileForm: FC<Props> = ({ id }) => {
   useEffect(() => {
     const fetchAll = async () => {
       try {
-        const [
-          resEmployee,
-          resEmployment,
-          resProject,
-          resInsight,
-          resSkill,
-          resPrivate,
-          resRelated
-        ] = await Promise.all([
-          api.get(`/employees/${id}`),
-          api.get(`/employment_history/${id}`),
-          api.get(`/project_info/${id}`),
-          api.get(`/insight_info/${id}`),
-          api.get(`/skill_info/${id}`),
-          api.get(`/private_info/${id}`),
-          api.get(`/related_info/${id}`),
-        ]);
-
-        setEmployees(resEmployee.data);
-        setEmploymentHistory(resEmployment.data);
-        setProjectInfo(resProject.data);
-        setInsightInfo(resInsight.data);
-        setSkillInfo(resSkill.data);
-        setPrivateInfo(resPrivate.data);
-        setRelatedInfo(resRelated.data);
+        // プロフィール（7テーブル分）を1リクエストで取得
+        const resProfile = await api.get(`/profiles/${id}`);
+        const profile = resProfile.data;
+
+        setEmployees(profile.employee);
+        setEmploymentHistory(profile.employment_history);
+        setProjectInfo(profile.project_info);
+        setInsightInfo(profile.insight_info);
+        setSkillInfo(profile.skill_info);
+        setPrivateInfo(profile.private_info);
+        setRelatedInfo(profile.related_info);
       } catch (err: any) {
         console.error("データ取得に失敗:", err.response?.data || err);
       } finally {
@@ -316,36 +302,31 @@ const ProfileForm: FC<Props> = ({ id }) => {
     }
   };
 
-  const uploadImageAndGetUrl = async (
+  const uploadFileName = (
     file: File,
     type: "profile" | "profile_video" | "seminar_video",
     index?: number
-  ): Promise<string | null> => {
-    setIsUploading(true);
-    try {
-      const fileExtension = file.name.split('.').pop();
-      let fileName = "";
-
-      // typeに応じてファイル名を決定
-      if (type === "profile") {
-        fileName = `${id}_profile_image.${fileExtension}`;
-      } else if (type === "profile_video") {
-        fileName = `${id}_profile_video_thumbnail.${fileExtension}`;
-      } else if (type === "seminar_video" && index !== undefined) {
-        fileName = `${id}_seminar_video_thumbnail_${index}.${fileExtension}`;
-      } else {
-        throw new Error("Invalid upload type or missing index.");
-      }
-
-      const sasResponse = await api.post(`/generate-sas-token`, { fileName });
-      const { sasUrl, storageUrl } = sasResponse.data;
-      if (!sasUrl || !storageUrl) throw new Error("SASトークンの取得に失敗しました。");
+  ): string => {
+    const fileExtension = file.name.split('.').pop();
 
-      const blobClient = new BlockBlobClient(sasUrl);
-      await blobClient.uploadData(file, { blobHTTPHeaders: { blobContentType: file.type } });
-
-      return storageUrl;
+    // typeに応じてファイル名を決定
+    if (type === "profile") {
+      return `${id}_profile_image.${fileExtension}`;
+    } else if (type === "profile_video") {
+      return `${id}_profile_video_thumbnail.${fileExtension}`;
+    } else if (type === "seminar_video" && index !== undefined) {
+      return `${id}_seminar_video_thumbnail_${index}.${fileExtension}`;
+    }
+    throw new Error("Invalid upload type or missing index.");
+  };
 
+  // ファイルをブロック分割でアップロードし、DBに保存するURLを返す（失敗した場合は null）
+  const uploadImagesAndGetUrls = async (
+    files: { file: File; type: "profile" | "profile_video" | "seminar_video"; index?: number }[]
+  ): Promise<string[] | null> => {
+    setIsUploading(true);
+    try {
+      return await uploadFiles(files.map(({ file, type, index }) => ({ file, fileName: uploadFileName(file, type, index) })));
     } catch (error) {
       console.error("アップロードエラー:", error);
       return null;
@@ -354,6 +335,15 @@ const ProfileForm: FC<Props> = ({ id }) => {
     }
   };
 
+  const uploadImageAndGetUrl = async (
+    file: File,
+    type: "profile" | "profile_video" | "seminar_video",
+    index?: number
+  ): Promise<string | null> => {
+    const urls = await uploadImagesAndGetUrls([{ file, type, index }]);
+    return urls ? urls[0] : null;
+  };
+
   const addSkill = () => setValue("skill_info", [...(skills || []), { skill: "" }]);
   const removeSkill = (index: number) => setValue("skill_info", skills.filter((_, i) => i !== index));
   const addWorkHistory = () => setValue("employment_history", [...(workHistory || []), { company_name: "", job_title: "", start_date: undefined, end_date: undefined, description: "", knowledge: "" }]);
@@ -467,23 +457,22 @@ const ProfileForm: FC<Props> = ({ id }) => {
       api.put(`/reset_profile_thumbnail/${id}`);
     }
 
-    // --- セミナー動画サムネイルの処理 ---
-    if (selectedSeminarFiles && selectedSeminarFiles.length > 0) {
-
-      for (const [index, file] of selectedSeminarFiles.entries()) {
-        // file が null または undefined の場合はスキップ
-        if (file != null) {
-          const newThumbnailUrl = await uploadImageAndGetUrl(file, "seminar_video", index);
-          if (newThumbnailUrl) {
-            if (finalData.seminar_videos && finalData.seminar_videos[index]) {
-              finalData.seminar_videos[index].seminar_thumbnail_url = newThumbnailUrl;
-            }
-          } else {
-            alert(`セミナー動画${index + 1}の画像アップロードに失敗したため、保存を中断しました。`);
-            return;
-          }
-        }
+    // --- セミナー動画サムネイルの処理（複数ファイルはまとめてアップロードを開始する） ---
+    const seminarUploads = selectedSeminarFiles.flatMap((file, index) =>
+      // file が null または undefined の場合はスキップ
+      file != null ? [{ file, type: "seminar_video" as const, index }] : []
+    );
+    if (seminarUploads.length > 0) {
+      const newThumbnailUrls = await uploadImagesAndGetUrls(seminarUploads);
+      if (!newThumbnailUrls) {
+        alert("セミナー動画の画像アップロードに失敗したため、保存を中断しました。");
+        return;
       }
+      seminarUploads.forEach(({ index }, i) => {
+        if (finalData.seminar_videos && finalData.seminar_videos[index]) {
+          finalData.seminar_videos[index].seminar_thumbnail_url = newThumbnailUrls[i];
+        }
+      });
     }
 
     const noUploadedThumbnails = selectedSeminarFiles.every((file) => !file);
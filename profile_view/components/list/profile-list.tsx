@@ -104,43 +104,9 @@ const addNewEmployeeToDatabase = async (emp: Employee) => {
     name: emp.name ?? null,
   }
 
-  const payload = {
-    employee_id: emp.employee_id,
-  }
-
   try {
-    console.log("payload for private_info:", payload)
-
-    // 複数のリクエストを順番に実行（失敗したら例外を投げる）
-    await api.post("/employees/", payload_name, {
-      headers: { "Content-Type": "application/json" },
-    });
-
-    await api.post("/employment_history/", payload, {
-      headers: { "Content-Type": "application/json" },
-    });
-
-    await api.post("/project_info/", payload, {
-      headers: { "Content-Type": "application/json" },
-    });
-
-    await api.post("/skill_info/", payload, {
-      headers: { "Content-Type": "application/json" },
-    });
-
-    await api.post("/insight_info/", payload, {
-      headers: { "Content-Type": "application/json" },
-    });
-
-    await api.post("/private_info/", payload, {
-      headers: { "Content-Type": "application/json" },
-    });
-
-    await api.post("/related_info/", payload, {
-      headers: { "Content-Type": "application/json" },
-    });
-
-    await api.post("/operation_logs/", payload, {
+    // 社員と関連テーブルの行をサーバー側で1トランザクションで作成
+    await api.post("/profiles/", { employee: payload_name }, {
       headers: { "Content-Type": "application/json" },
     });
 
@@ -153,7 +119,8 @@ const addNewEmployeeToDatabase = async (emp: Employee) => {
 
   const reloadEmployeeList = async () => {
     try {
-      const res = await api.get("/employees/");
+      // 一覧に必要な列（id・社員番号・氏名・かな・サムネイル）だけを返す軽量な一覧API
+      const res = await api.get("/directory/", { params: { photo_size: "thumb" } });
       const loadedEmployees: Employee[] = res.data.map((emp: EmployeeOut ) => ({
         ...emp,
         selected: false,
@@ -203,35 +170,8 @@ const addNewEmployeeToDatabase = async (emp: Employee) => {
     const selectedEmployees = employees.filter((emp) => emp.selected && emp.readOnly)
     for (const emp of selectedEmployees) {
       try {
-          await api.delete(`/employment_history/${emp.id}`, {
-            headers: { "Content-Type": "application/json" },
-          });
-
-          await api.delete(`/project_info/${emp.id}`, {
-            headers: { "Content-Type": "application/json" },
-          });
-
-          await api.delete(`/skill_info/${emp.id}`, {
-            headers: { "Content-Type": "application/json" },
-          });
-
-          await api.delete(`/insight_info/${emp.id}` ,{
-            headers: { "Content-Type": "application/json" },
-          });
-
-          await api.delete(`/private_info/${emp.id}`,{
-            headers: { "Content-Type": "application/json" },
-          });
-
-          await api.delete(`/related_info/${emp.id}`,{
-            headers: { "Content-Type": "application/json" },
-          });
-
-          await api.delete(`/operation_logs/${emp.id}`,  {
-            headers: { "Content-Type": "application/json" },
-          });
-
-          await api.delete(`/employees/${emp.id}`, {
+          // 社員と関連テーブルの行をサーバー側で1トランザクションで削除
+          await api.delete(`/profiles/${emp.id}`, {
             headers: { "Content-Type": "application/json" },
           });
 
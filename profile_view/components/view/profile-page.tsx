@@ -14,7 +14,7 @@ import { InsightInfoOut } from "@/types/insight_info";
 import { SkillInfoOut } from "@/types/skill_info";
 import { PrivateInfoOut } from "@/types/private_info";
 import { RelatedInfoOut } from "@/types/related_info";
-import { ProjectMember, ProjectInfo } from "@/types/project_management";
+import { EmployeeProject } from "@/types/project_management";
 import {
   User,
   Briefcase,
@@ -62,8 +62,7 @@ const ProfilePage: FC<Props> = ({ id }) => {
   const [skillInfo, setSkillInfo] = useState<SkillInfoOut | null>(null);
   const [privateInfo, setPrivateInfo] = useState<PrivateInfoOut | null>(null);
   const [relatedInfo, setRelatedInfo] = useState<RelatedInfoOut | null>(null);
-  const [projectMembers, setProjectMembers] = useState<ProjectMember[]>([]);
-  const [managementProjects, setManagementProjects] = useState<ProjectInfo[]>([]);
+  const [managementProjects, setManagementProjects] = useState<EmployeeProject[]>([]);
   const [isLoading, setIsLoading] = useState(true);
   const router = useRouter()
 
@@ -185,53 +184,25 @@ const ProfilePage: FC<Props> = ({ id }) => {
   useEffect(() => {
     const fetchAll = async () => {
       try {
-        const [
-          resEmployee,
-          resEmployment,
-          resProject,
-          resInsight,
-          resSkill,
-          resPrivate,
-          resRelated
-        ] = await Promise.all([
-          api.get(`/employees/${id}`),
-          api.get(`/employment_history/${id}`),
-          api.get(`/project_info/${id}`),
-          api.get(`/insight_info/${id}`),
-          api.get(`/skill_info/${id}`),
-          api.get(`/private_info/${id}`),
-          api.get(`/related_info/${id}`),
-        ]);
-
-        setEmployees(resEmployee.data);
-        setEmploymentHistory(resEmployment.data);
-        setProjectInfo(resProject.data);
-        setInsightInfo(resInsight.data);
-        setSkillInfo(resSkill.data);
-        setPrivateInfo(resPrivate.data);
-        setRelatedInfo(resRelated.data);
-
-        // 従業員名が取得できたら、プロジェクト管理データベースからも情報を取得
-        if (resEmployee.data?.name) {
+        // プロフィール（7テーブル分）を1リクエストで取得
+        const resProfile = await api.get(`/profiles/${id}`);
+        const profile = resProfile.data;
+
+        setEmployees(profile.employee);
+        setEmploymentHistory(profile.employment_history);
+        setProjectInfo(profile.project_info);
+        setInsightInfo(profile.insight_info);
+        setSkillInfo(profile.skill_info);
+        setPrivateInfo(profile.private_info);
+        setRelatedInfo(profile.related_info);
+
+        // 社員番号が取得できたら、プロジェクト管理データベースからも参画プロジェクトとメンバーを取得
+        if (profile.employee?.employee_id) {
           try {
-            // 1. チームメンバー情報を取得
-            const resTeamMembers = await api.get(
-              `/project-management/team-members/${resEmployee.data.name}`
+            const resManagementProjects = await api.get(
+              `/project-management/employees/${profile.employee.employee_id}/projects`
             );
-            setProjectMembers(resTeamMembers.data);
-
-            // 2. プロジェクトIDを抽出
-            const projectIds = resTeamMembers.data.map(
-              (member: ProjectMember) => member.project_id
-            );
-
-            if (projectIds.length > 0) {
-              // 3. プロジェクト情報を取得
-              const resManagementProjects = await api.get(
-                `/project-management/projects?project_ids=${projectIds.join(',')}`
-              );
-              setManagementProjects(resManagementProjects.data);
-            }
+            setManagementProjects(resManagementProjects.data.projects);
           } catch (projectErr) {
             console.warn("プロジェクト管理データの取得に失敗:", projectErr);
             // プロジェクト管理データの取得失敗は致命的エラーではないため、続行
@@ -553,29 +524,26 @@ const ProfilePage: FC<Props> = ({ id }) => {
                               </div>
 
                               {/* このプロジェクトのチームメンバー表示 */}
-                              {projectMembers
-                                .filter(member => member.project_id === project.id)
-                                .map(member => (
-                                  <div key={member.project_id} className="mt-2">
-                                    <p className="text-xs text-slate-500">チームメンバー:</p>
-                                    <div className="flex flex-wrap gap-1">
-                                      {member.member_names.split(',').map((name, nameIndex) => (
-                                        <Badge
-                                          key={nameIndex}
-                                          variant="outline"
-                                          className={`text-xs ${
-                                            name.trim() === employees?.name
-                                              ? 'bg-yellow-200 border-yellow-400'
-                                              : ''
-                                          }`}
-                                        >
-                                          {name.trim()}
-                                        </Badge>
-                                      ))}
-                                    </div>
+                              {project.members.length > 0 && (
+                                <div className="mt-2">
+                                  <p className="text-xs text-slate-500">チームメンバー:</p>
+                                  <div className="flex flex-wrap gap-1">
+                                    {project.members.map((member) => (
+                                      <Badge
+                                        key={member.id}
+                                        variant="outline"
+                                        className={`text-xs ${
+                                          member.employee_id === employees?.employee_id
+                                            ? 'bg-yellow-200 border-yellow-400'
+                                            : ''
+                                        }`}
+                                      >
+                                        {member.member_name}
+                                      </Badge>
+                                    ))}
                                   </div>
-                                ))
-                              }
+                                </div>
+                              )}
                             </CardContent>
                           </Card>
                       </div>
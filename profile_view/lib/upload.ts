@@ -0,0 +1,106 @@
+import { api } from "@/lib/api"
+
+// ブロック分割アップロード（POST /uploads）
+// ファイルをブロックに分けて並列に Put Block し、全ブロックが届いたらサーバーで確定する。
+// 途中で失敗しても、アップロード ID を localStorage に残しておき、届いていないブロックから再開する。
+
+export type UploadItem = {
+  file: File
+  fileName: string
+}
+
+type BlockGrant = {
+  index: number
+  blockId: string
+  offset: number
+  length: number
+  url: string
+}
+
+type UploadSession = {
+  uploadId: string
+  fileName: string
+  storageUrl: string
+  size: number
+  blockSize: number
+  blockCount: number
+  stagedBlocks: number[]
+  grants: BlockGrant[]
+}
+
+// 1ファイルあたりの同時に送るブロック数
+const PARALLEL_BLOCKS = 4
+// 届かなかったブロックを送り直す回数
+const MAX_ROUNDS = 3
+
+const resumeKey = ({ file, fileName }: UploadItem) => `upload:${fileName}:${file.size}:${file.lastModified}`
+
+const putBlock = async (file: File, grant: BlockGrant) => {
+  const response = await fetch(grant.url, {
+    method: "PUT",
+    headers: { "Content-Type": "application/octet-stream" },
+    body: file.slice(grant.offset, grant.offset + grant.length),
+  })
+  if (!response.ok) throw new Error(`ブロック${grant.index}の送信に失敗しました (${response.status})`)
+}
+
+// grants を PARALLEL_BLOCKS 本ずつ並列に送る。失敗したブロックは次の回で送り直すため、ここでは例外にしない
+const putBlocks = async (file: File, grants: BlockGrant[]) => {
+  const queue = [...grants]
+  const worker = async () => {
+    for (let grant = queue.shift(); grant; grant = queue.shift()) {
+      try {
+        await putBlock(file, grant)
+      } catch (error) {
+        console.warn(error)
+      }
+    }
+  }
+  await Promise.all(Array.from({ length: Math.min(PARALLEL_BLOCKS, grants.length) }, worker))
+}
+
+const resumeSession = async (item: UploadItem): Promise<UploadSession | null> => {
+  const uploadId = localStorage.getItem(resumeKey(item))
+  if (!uploadId) return null
+  try {
+    const response = await api.get(`/uploads/${encodeURIComponent(uploadId)}`)
+    return response.data
+  } catch {
+    localStorage.removeItem(resumeKey(item))
+    return null
+  }
+}
+
+const uploadSession = async (item: UploadItem, session: UploadSession): Promise<string> => {
+  localStorage.setItem(resumeKey(item), session.uploadId)
+  const path = `/uploads/${encodeURIComponent(session.uploadId)}`
+  for (let round = 0; round < MAX_ROUNDS; round++) {
+    await putBlocks(item.file, session.grants)
+    try {
+      const response = await api.post(`${path}/commit`)
+      localStorage.removeItem(resumeKey(item))
+      return response.data.storageUrl
+    } catch (error: any) {
+      if (error?.response?.status !== 409) throw error
+      // 届いていないブロックの新しい書き込み用URLを受け取り直す
+      session = (await api.get(path)).data
+    }
+  }
+  throw new Error(`${item.fileName} のアップロードを完了できませんでした。`)
+}
+
+/**
+ * 複数のファイルをブロック分割でアップロードし、DBに保存するURLを同じ順で返す。
+ * 新しく始めるファイルのアップロードは、1回のリクエストでまとめて開始する。
+ */
+export const uploadFiles = async (items: UploadItem[]): Promise<string[]> => {
+  const resumed = await Promise.all(items.map(resumeSession))
+  const fresh = items.filter((_, i) => !resumed[i])
+  const started: UploadSession[] = fresh.length
+    ? (await api.post(`/uploads/`, {
+        files: fresh.map(({ file, fileName }) => ({ fileName, size: file.size, contentType: file.type || undefined })),
+      })).data.sessions
+    : []
+  const sessions = resumed.map((session) => session ?? started.shift()!)
+  return Promise.all(items.map((item, i) => uploadSession(item, sessions[i])))
+}
@@ -0,0 +1,30 @@
+-- operation_logs を操作ログ（監査ログ）として使うための変更
+--   * employee_id の一意制約を外す（社員ごとに複数の操作を記録する）
+--   * operation_datetime を日付から日時に変更する
+--   * 社員別・対象行別に引くためのインデックスを追加する
+
+-- employee_id の一意制約・一意インデックスを名前に関係なく削除する
+DECLARE @sql NVARCHAR(MAX) = N'';
+
+SELECT @sql += N'ALTER TABLE dbo.operation_logs DROP CONSTRAINT ' + QUOTENAME(kc.name) + N';'
+FROM sys.key_constraints kc
+JOIN sys.index_columns ic ON ic.object_id = kc.parent_object_id AND ic.index_id = kc.unique_index_id
+JOIN sys.columns c ON c.object_id = ic.object_id AND c.column_id = ic.column_id
+WHERE kc.parent_object_id = OBJECT_ID(N'dbo.operation_logs') AND kc.type = 'UQ' AND c.name = N'employee_id';
+
+SELECT @sql += N'DROP INDEX ' + QUOTENAME(i.name) + N' ON dbo.operation_logs;'
+FROM sys.indexes i
+JOIN sys.index_columns ic ON ic.object_id = i.object_id AND ic.index_id = i.index_id
+JOIN sys.columns c ON c.object_id = ic.object_id AND c.column_id = ic.column_id
+WHERE i.object_id = OBJECT_ID(N'dbo.operation_logs') AND i.is_unique = 1 AND i.is_primary_key = 0
+  AND i.is_unique_constraint = 0 AND c.name = N'employee_id';
+
+EXEC sp_executesql @sql;
+GO
+
+ALTER TABLE dbo.operation_logs ALTER COLUMN operation_datetime DATETIME2(3) NULL;
+GO
+
+CREATE INDEX ix_operation_logs_employee_id_datetime ON dbo.operation_logs (employee_id, operation_datetime);
+CREATE INDEX ix_operation_logs_target ON dbo.operation_logs (target_table, target_id);
+GO
@@ -0,0 +1,99 @@
+-- カンマ区切りで1行に詰めていた一覧を、社員ごと・position 順の子テーブルに分ける
+--   * related_info.seminar_videos / seminar_thumbnail_url → seminar_videos
+--   * skill_info.skill                                     → employee_skills
+--   * project_info.project / skill / comment / start_date / end_date → employee_projects
+--     （project_info.skill の中のスキル区切りは '\'。子テーブルではカンマに戻す）
+-- 旧列は移行期間中も API が書き込みのたびに同期するため、そのまま残す。
+-- STRING_SPLIT の ordinal 引数を使うため、SQL Server 2022 以降 / Azure SQL Database が必要。
+
+CREATE TABLE dbo.seminar_videos (
+    id INT IDENTITY(1, 1) NOT NULL PRIMARY KEY,
+    employee_id INT NOT NULL,
+    position INT NOT NULL,
+    video_url NVARCHAR(500) NULL,
+    thumbnail_url NVARCHAR(500) NULL,
+    CONSTRAINT uq_seminar_videos_employee_position UNIQUE (employee_id, position)
+);
+
+CREATE TABLE dbo.employee_skills (
+    id INT IDENTITY(1, 1) NOT NULL PRIMARY KEY,
+    employee_id INT NOT NULL,
+    position INT NOT NULL,
+    skill NVARCHAR(100) NOT NULL,
+    CONSTRAINT uq_employee_skills_employee_position UNIQUE (employee_id, position)
+);
+
+CREATE TABLE dbo.employee_projects (
+    id INT IDENTITY(1, 1) NOT NULL PRIMARY KEY,
+    employee_id INT NOT NULL,
+    position INT NOT NULL,
+    project NVARCHAR(50) NULL,
+    skill NVARCHAR(500) NULL,
+    comment NVARCHAR(500) NULL,
+    start_date NVARCHAR(100) NULL,
+    end_date NVARCHAR(100) NULL,
+    CONSTRAINT uq_employee_projects_employee_position UNIQUE (employee_id, position)
+);
+GO
+
+-- 既存データの移行（API と同じく、動画URL・スキル名・案件名が空の要素は捨てて詰める）
+WITH videos AS (
+    SELECT r.employee_id, s.ordinal, NULLIF(TRIM(s.value), N'') AS value
+    FROM dbo.related_info r
+    CROSS APPLY STRING_SPLIT(r.seminar_videos, N',', 1) s
+),
+thumbnails AS (
+    SELECT r.employee_id, s.ordinal, NULLIF(TRIM(s.value), N'') AS value
+    FROM dbo.related_info r
+    CROSS APPLY STRING_SPLIT(r.seminar_thumbnail_url, N',', 1) s
+)
+INSERT INTO dbo.seminar_videos (employee_id, position, video_url, thumbnail_url)
+SELECT v.employee_id,
+       ROW_NUMBER() OVER (PARTITION BY v.employee_id ORDER BY v.ordinal) - 1,
+       v.value,
+       t.value
+FROM videos v
+LEFT JOIN thumbnails t ON t.employee_id = v.employee_id AND t.ordinal = v.ordinal
+WHERE v.value IS NOT NULL;
+
+INSERT INTO dbo.employee_skills (employee_id, position, skill)
+SELECT s.employee_id, ROW_NUMBER() OVER (PARTITION BY s.employee_id ORDER BY s.ordinal) - 1, s.value
+FROM (
+    SELECT k.employee_id, p.ordinal, NULLIF(TRIM(p.value), N'') AS value
+    FROM dbo.skill_info k
+    CROSS APPLY STRING_SPLIT(k.skill, N',', 1) p
+) s
+WHERE s.value IS NOT NULL;
+
+WITH parts AS (
+    SELECT p.employee_id, N'project' AS name, s.ordinal, NULLIF(TRIM(s.value), N'') AS value
+    FROM dbo.project_info p CROSS APPLY STRING_SPLIT(p.project, N',', 1) s
+    UNION ALL
+    SELECT p.employee_id, N'skill', s.ordinal, NULLIF(REPLACE(TRIM(s.value), N'\', N','), N'')
+    FROM dbo.project_info p CROSS APPLY STRING_SPLIT(p.skill, N',', 1) s
+    UNION ALL
+    SELECT p.employee_id, N'comment', s.ordinal, NULLIF(TRIM(s.value), N'')
+    FROM dbo.project_info p CROSS APPLY STRING_SPLIT(p.comment, N',', 1) s
+    UNION ALL
+    SELECT p.employee_id, N'start_date', s.ordinal, NULLIF(TRIM(s.value), N'')
+    FROM dbo.project_info p CROSS APPLY STRING_SPLIT(p.start_date, N',', 1) s
+    UNION ALL
+    SELECT p.employee_id, N'end_date', s.ordinal, NULLIF(TRIM(s.value), N'')
+    FROM dbo.project_info p CROSS APPLY STRING_SPLIT(p.end_date, N',', 1) s
+),
+projects AS (
+    SELECT employee_id, ordinal,
+           MAX(CASE WHEN name = N'project' THEN value END) AS project,
+           MAX(CASE WHEN name = N'skill' THEN value END) AS skill,
+           MAX(CASE WHEN name = N'comment' THEN value END) AS comment,
+           MAX(CASE WHEN name = N'start_date' THEN value END) AS start_date,
+           MAX(CASE WHEN name = N'end_date' THEN value END) AS end_date
+    FROM parts
+    GROUP BY employee_id, ordinal
+)
+INSERT INTO dbo.employee_projects (employee_id, position, project, skill, comment, start_date, end_date)
+SELECT employee_id, ROW_NUMBER() OVER (PARTITION BY employee_id ORDER BY ordinal) - 1,
+       project, skill, comment, start_date, end_date
+FROM projects
+WHERE project IS NOT NULL;
+GO
@@ -0,0 +1,8 @@
+-- 社員一覧（GET /directory）用のカバリングインデックス
+-- 並び順（社員番号・氏名・かな）ごとに、一覧に返す列を INCLUDE してキー参照なしで読めるようにする。
+-- 並びが同じ行は id で順序を決める（キーセットページングのため）。
+
+CREATE INDEX ix_employees_directory_employee_id ON dbo.employees (employee_id, id) INCLUDE (name, kana, photo_url);
+CREATE INDEX ix_employees_directory_name ON dbo.employees (name, id) INCLUDE (employee_id, kana, photo_url);
+CREATE INDEX ix_employees_directory_kana ON dbo.employees (kana, id) INCLUDE (employee_id, name, photo_url);
+GO
@@ -0,0 +1,39 @@
+-- 変更フィード（GET /changes）のための変更
+--   * プロフィールの各テーブルに updated_at（UTC）を追加する。既存の行は移行時刻で埋める。
+--     以後は API が作成・更新のたびに値を入れる
+--   * updated_at の順に読むためのインデックス（クラスタ化キーの id も含まれるため、(updated_at, id) の順で読める）
+--   * 削除の記録（トゥームストーン）を残す deleted_rows テーブル
+
+ALTER TABLE dbo.employees ADD updated_at DATETIME2(3) NOT NULL CONSTRAINT df_employees_updated_at DEFAULT SYSUTCDATETIME();
+ALTER TABLE dbo.employment_history ADD updated_at DATETIME2(3) NOT NULL CONSTRAINT df_employment_history_updated_at DEFAULT SYSUTCDATETIME();
+ALTER TABLE dbo.project_info ADD updated_at DATETIME2(3) NOT NULL CONSTRAINT df_project_info_updated_at DEFAULT SYSUTCDATETIME();
+ALTER TABLE dbo.insight_info ADD updated_at DATETIME2(3) NOT NULL CONSTRAINT df_insight_info_updated_at DEFAULT SYSUTCDATETIME();
+ALTER TABLE dbo.skill_info ADD updated_at DATETIME2(3) NOT NULL CONSTRAINT df_skill_info_updated_at DEFAULT SYSUTCDATETIME();
+ALTER TABLE dbo.private_info ADD updated_at DATETIME2(3) NOT NULL CONSTRAINT df_private_info_updated_at DEFAULT SYSUTCDATETIME();
+ALTER TABLE dbo.related_info ADD updated_at DATETIME2(3) NOT NULL CONSTRAINT df_related_info_updated_at DEFAULT SYSUTCDATETIME();
+ALTER TABLE dbo.seminar_videos ADD updated_at DATETIME2(3) NOT NULL CONSTRAINT df_seminar_videos_updated_at DEFAULT SYSUTCDATETIME();
+ALTER TABLE dbo.employee_skills ADD updated_at DATETIME2(3) NOT NULL CONSTRAINT df_employee_skills_updated_at DEFAULT SYSUTCDATETIME();
+ALTER TABLE dbo.employee_projects ADD updated_at DATETIME2(3) NOT NULL CONSTRAINT df_employee_projects_updated_at DEFAULT SYSUTCDATETIME();
+GO
+
+CREATE INDEX ix_dbo_employees_updated_at ON dbo.employees (updated_at);
+CREATE INDEX ix_dbo_employment_history_updated_at ON dbo.employment_history (updated_at);
+CREATE INDEX ix_dbo_project_info_updated_at ON dbo.project_info (updated_at);
+CREATE INDEX ix_dbo_insight_info_updated_at ON dbo.insight_info (updated_at);
+CREATE INDEX ix_dbo_skill_info_updated_at ON dbo.skill_info (updated_at);
+CREATE INDEX ix_dbo_private_info_updated_at ON dbo.private_info (updated_at);
+CREATE INDEX ix_dbo_related_info_updated_at ON dbo.related_info (updated_at);
+CREATE INDEX ix_dbo_seminar_videos_updated_at ON dbo.seminar_videos (updated_at);
+CREATE INDEX ix_dbo_employee_skills_updated_at ON dbo.employee_skills (updated_at);
+CREATE INDEX ix_dbo_employee_projects_updated_at ON dbo.employee_projects (updated_at);
+GO
+
+CREATE TABLE dbo.deleted_rows (
+    id INT IDENTITY(1, 1) NOT NULL PRIMARY KEY,
+    table_name NVARCHAR(50) NOT NULL,
+    row_id INT NOT NULL,
+    employee_id INT NULL,
+    deleted_at DATETIME2(3) NOT NULL
+);
+CREATE INDEX ix_deleted_rows_deleted_at ON dbo.deleted_rows (deleted_at, id);
+GO
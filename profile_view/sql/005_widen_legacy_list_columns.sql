@@ -0,0 +1,16 @@
+-- 一覧をカンマ区切りで詰めている旧列（002_child_list_tables.sql で子テーブルに分けたもの）を NVARCHAR(MAX) に広げる
+-- API は子テーブルへの書き込みのたびに旧列も同期するため、一覧の件数が増えると元の長さ（案件名は 50 文字）を超えて
+-- 書き込みが失敗していた。
+--   * related_info.seminar_videos / seminar_thumbnail_url
+--   * skill_info.skill
+--   * project_info.project / skill / comment / start_date / end_date
+
+ALTER TABLE dbo.related_info ALTER COLUMN seminar_videos NVARCHAR(MAX) NULL;
+ALTER TABLE dbo.related_info ALTER COLUMN seminar_thumbnail_url NVARCHAR(MAX) NULL;
+ALTER TABLE dbo.skill_info ALTER COLUMN skill NVARCHAR(MAX) NULL;
+ALTER TABLE dbo.project_info ALTER COLUMN project NVARCHAR(MAX) NULL;
+ALTER TABLE dbo.project_info ALTER COLUMN skill NVARCHAR(MAX) NULL;
+ALTER TABLE dbo.project_info ALTER COLUMN comment NVARCHAR(MAX) NULL;
+ALTER TABLE dbo.project_info ALTER COLUMN start_date NVARCHAR(MAX) NULL;
+ALTER TABLE dbo.project_info ALTER COLUMN end_date NVARCHAR(MAX) NULL;
+GO
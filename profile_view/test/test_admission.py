@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from api.admission import AdmissionController, Overloaded, RouteClass, classify
+
+
+def controller(capacity=1):
+    return AdmissionController(capacity, [
+        RouteClass("read", limit=1, queue=2, timeout=1.0, priority=0),
+        RouteClass("bulk", limit=1, queue=1, timeout=0.05, priority=3),
+        RouteClass("sas", limit=1, queue=0, timeout=1.0, priority=1, uses_db=False),
+    ])
+
+
+def test_freed_slot_goes_to_reads_before_bulk_and_full_queues_fail_fast():
+    async def run():
+        admission = controller()
+        await admission.acquire("read")
+        # SAS は DB の容量に数えないため、DB が埋まっていても通る
+        await admission.acquire("sas")
+        with pytest.raises(Overloaded):
+            await admission.acquire("sas")
+
+        order = []
+
+        async def request(name):
+            await admission.acquire(name)
+            order.append(name)
+
+        bulk = asyncio.create_task(request("bulk"))
+        await asyncio.sleep(0)
+        read = asyncio.create_task(request("read"))
+        await asyncio.sleep(0)
+        admission.release("read")
+        await read
+        assert order == ["read"]
+        # bulk は待ち時間の上限で打ち切られる
+        with pytest.raises(Overloaded):
+            await bulk
+        return admission.metrics()
+
+    metrics = asyncio.run(run())
+    assert metrics["classes"]["bulk"]["timed_out"] == 1
+    assert metrics["classes"]["sas"]["rejected"] == 1
+    assert metrics["active_db"] == 1 and metrics["classes"]["bulk"]["waiting"] == 0
+
+
+def test_classify_routes():
+    assert classify("GET", "/employees/1") == "read"
+    assert classify("PUT", "/employees/1") == "write"
+    assert classify("GET", "/search/") == "search"
+    assert classify("POST", "/generate-sas-token") == "sas"
+    assert classify("GET", "/profiles/export") == "bulk"
+    assert classify("GET", "/system/admission") is None
+    assert classify("OPTIONS", "/employees/") is None
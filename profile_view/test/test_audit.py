@@ -0,0 +1,48 @@
+import asyncio
+from types import SimpleNamespace
+
+from api.audit import AuditLogWriter, current_operation_user, operation_event
+
+
+def make_writer(**kwargs):
+    batches = []
+
+    async def write_batch(rows):
+        batches.append(rows)
+
+    return AuditLogWriter(write_batch, **kwargs), batches
+
+
+def test_events_are_flushed_in_batches_and_drained_on_stop():
+    writer, batches = make_writer(batch_size=3, flush_seconds=10)
+
+    async def run():
+        await writer.start()
+        for i in range(7):
+            await writer.record({"target_id": i})
+        await writer.stop()
+
+    asyncio.run(run())
+    assert [len(batch) for batch in batches] == [3, 3, 1]
+    assert writer.metrics()["written"] == 7
+
+
+def test_full_queue_waits_then_drops():
+    writer, _ = make_writer(queue_size=1, put_timeout=0.01)
+
+    async def run():
+        assert await writer.record({"target_id": 1})
+        assert not await writer.record({"target_id": 2})
+
+    asyncio.run(run())
+    assert writer.metrics()["dropped"] == 1
+
+
+def test_operation_event_uses_current_user():
+    token = current_operation_user.set("yamada")
+    try:
+        event = operation_event("skill_info", "update", SimpleNamespace(id=5, employee_id=101))
+    finally:
+        current_operation_user.reset(token)
+    assert event["operation_user"] == "yamada"
+    assert (event["employee_id"], event["target_table"], event["target_id"]) == (101, "skill_info", 5)
@@ -0,0 +1,57 @@
+import asyncio
+import gzip
+
+from api.compression import CompressionMiddleware, choose_encoding
+
+
+def test_choose_encoding_respects_q_values_and_server_order():
+    assert choose_encoding("gzip, br", ["br", "gzip"]) == "br"
+    assert choose_encoding("br;q=0.5, gzip", ["br", "gzip"]) == "gzip"
+    assert choose_encoding("identity", ["br", "gzip"]) is None
+    assert choose_encoding("*", ["gzip"]) == "gzip"
+    assert choose_encoding("gzip;q=0", ["gzip"]) is None
+    assert choose_encoding(None, ["gzip"]) is None
+
+
+def run(app, accept_encoding="gzip"):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "headers": [(b"accept-encoding", accept_encoding.encode())]}
+    asyncio.run(app(scope, receive, send))
+    return dict(messages[0]["headers"]), b"".join(m.get("body", b"") for m in messages[1:])
+
+
+def test_compresses_whole_and_streamed_bodies_above_threshold():
+    body = b'[{"name":"yamada"}' + b',{"name":"yamada"}' * 200 + b"]"
+
+    async def whole(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [
+            (b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()), (b"etag", b'"x"'),
+        ]})
+        await send({"type": "http.response.body", "body": body})
+
+    async def streamed(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+        for chunk in (body[:100], body[100:]):
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+
+    for app in (whole, streamed):
+        headers, content = run(CompressionMiddleware(app, encodings=["gzip"]))
+        assert headers[b"content-encoding"] == b"gzip"
+        assert gzip.decompress(content) == body
+        assert len(content) < len(body) // 5
+    headers, content = run(CompressionMiddleware(whole, encodings=["gzip"]))
+    assert headers[b"etag"] == b'W/"x"'
+    assert headers[b"content-length"] == str(len(content)).encode()
+
+    headers, content = run(CompressionMiddleware(whole, encodings=["gzip"], min_bytes=len(body) + 1))
+    assert b"content-encoding" not in headers and content == body
+    headers, content = run(CompressionMiddleware(whole, encodings=["gzip"]), accept_encoding="identity")
+    assert b"content-encoding" not in headers and content == body
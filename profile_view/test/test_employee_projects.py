@@ -0,0 +1,31 @@
+from types import SimpleNamespace
+
+from api.crud.project_management import compact_name, group_employee_projects
+
+
+def project(id, name):
+    return SimpleNamespace(
+        id=id, code=None, name=name, start_date=None, end_date=None, client_name=None,
+        industry_categories=["製造"], type_categories=None,
+    )
+
+
+def test_group_employee_projects_sets_role_and_links_members():
+    members = [
+        {"id": 1, "project_id": 10, "member_name": "山田　太郎", "role_title": "PM"},
+        {"id": 2, "project_id": 10, "member_name": "佐藤花子", "role_title": "メンバー"},
+        {"id": 3, "project_id": 20, "member_name": "山田太郎", "role_title": "メンバー"},
+        {"id": 4, "project_id": 30, "member_name": "無関係", "role_title": None},
+    ]
+    employee_ids = {compact_name("佐藤 花子"): 100002, compact_name("山田 太郎"): 100001}
+
+    projects = group_employee_projects("山田太郎", [project(10, "A"), project(20, "B")], members, employee_ids)
+
+    assert [p["name"] for p in projects] == ["A", "B"]
+    assert [p["role_title"] for p in projects] == ["PM", "メンバー"]
+    assert [(m["member_name"], m["employee_id"]) for m in projects[0]["members"]] == [
+        ("山田　太郎", 100001),
+        ("佐藤花子", 100002),
+    ]
+    assert projects[0]["industry_categories"] == ["製造"]
+    assert [m["id"] for m in projects[1]["members"]] == [3]
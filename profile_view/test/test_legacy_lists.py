@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+import pydantic
+import pytest
+
+from api.legacy_lists import LegacyListFormat, diff_items
+from api.schemas import EmployeeProjectUpdate
+
+PROJECTS = LegacyListFormat(
+    model=None,
+    columns={"project": "project", "skill": "skill", "comment": "comment"},
+    key="project",
+    nested={"skill": "\\"},
+)
+
+
+def test_split_and_join_round_trip_with_nested_separator():
+    legacy = SimpleNamespace(project="A,,B", skill="Go\\SQL,x,", comment="c1")
+    items = PROJECTS.split(legacy)
+    assert items == [
+        {"project": "A", "skill": "Go,SQL", "comment": "c1"},
+        {"project": "B", "skill": None, "comment": None},
+    ]
+    assert PROJECTS.join(items) == {"project": "A,B", "skill": "Go\\SQL,", "comment": "c1,"}
+    assert PROJECTS.join([]) == {"project": None, "skill": None, "comment": None}
+
+
+def test_diff_only_touches_changed_positions():
+    existing = [SimpleNamespace(id=10 + i, skill=name) for i, name in enumerate(["Go", "SQL", "AWS"])]
+
+    updates, inserts, keep = diff_items(existing, [{"skill": "Go"}, {"skill": "Rust"}], ["skill"])
+    assert updates == [{"id": 11, "skill": "Rust"}]
+    assert inserts == []
+    assert keep == 2
+
+    updates, inserts, keep = diff_items(existing, [{"skill": s} for s in ["Go", "SQL", "AWS", "Docker"]], ["skill"])
+    assert updates == []
+    assert inserts == [{"position": 3, "skill": "Docker"}]
+    assert keep == 4
+
+
+def test_oversized_fields_are_detected_before_syncing_from_legacy():
+    from api.crud.child_lists import employee_projects_crud
+
+    items = employee_projects_crud.legacy.split(SimpleNamespace(project="A," + "x" * 51, skill=None))
+    assert employee_projects_crud.oversized_fields(items) == ["project"]
+    assert employee_projects_crud.oversized_fields(items[:1]) == []
+
+
+def test_values_with_separators_do_not_round_trip():
+    items = [{"project": "A", "skill": "Go,SQL", "comment": "設計, 実装"}, {"project": "B", "skill": None, "comment": None}]
+    # カンマを含む comment は split で別の要素として読まれてしまう
+    assert PROJECTS.split(SimpleNamespace(**PROJECTS.join(items))) != items
+    assert not PROJECTS.round_trips(items)
+    items[0]["comment"] = "設計と実装"
+    assert PROJECTS.split(SimpleNamespace(**PROJECTS.join(items))) == items
+    assert PROJECTS.round_trips(items)
+
+    with pytest.raises(pydantic.ValidationError):
+        EmployeeProjectUpdate(project="A", comment="設計, 実装")
+    with pytest.raises(pydantic.ValidationError):
+        EmployeeProjectUpdate(project="A", skill="Go\\SQL")
+    assert EmployeeProjectUpdate(project="A", skill="Go,SQL").skill == "Go,SQL"
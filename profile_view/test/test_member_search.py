@@ -0,0 +1,75 @@
+from api.search.member_index import MemberSearchIndex
+from api.search.text_normalize import kana_to_romaji, normalize_romaji, search_keys
+
+
+def test_kana_to_romaji():
+    assert kana_to_romaji("しょうた") == "shouta"
+    assert kana_to_romaji("ハットリ") == "hattori"
+    assert kana_to_romaji("まっちゃ") == "matcha"
+
+
+def test_romaji_variants_are_normalized():
+    assert normalize_romaji("satou") == normalize_romaji("sato")
+    assert normalize_romaji("syota") == normalize_romaji("shouta")
+    assert normalize_romaji("tutomu") == normalize_romaji("tsutomu")
+
+
+def test_search_keys_include_reading():
+    assert "yamadataro" in search_keys("山田 太郎", "やまだ たろう")
+
+
+def make_index():
+    index = MemberSearchIndex()
+    index.set_readings({"山田太郎": "やまだ たろう", "佐藤翔太": "さとう しょうた"})
+    index.rebuild([
+        {"id": 1, "project_id": 10, "member_name": "山田 太郎", "role_title": "PM"},
+        {"id": 2, "project_id": 11, "member_name": "佐藤 翔太", "role_title": None},
+        {"id": 3, "project_id": 12, "member_name": "山田 花子", "role_title": None},
+    ])
+    return index
+
+
+def test_search_by_kanji_kana_and_romaji():
+    index = make_index()
+    for query in ("山田太郎", "ヤマダ タロウ", "yamada tarou"):
+        total, items = index.search(query)
+        assert items[0]["id"] == 1, query
+    total, items = index.search("Sato Syota")
+    assert [item["id"] for item in items] == [2]
+
+
+def test_search_ranking_and_paging():
+    index = make_index()
+    total, items = index.search("山田")
+    assert total == 2
+    assert {item["id"] for item in items} == {1, 3}
+    total, page = index.search("山田", limit=1, offset=1)
+    assert total == 2 and len(page) == 1
+
+
+def test_incremental_add_and_remove():
+    index = make_index()
+    index.add([{"id": 4, "project_id": 13, "member_name": "田中 一郎", "role_title": None}])
+    assert index.max_id == 4
+    assert index.search("田中")[0] == 1
+    index.remove(4)
+    assert index.search("田中")[0] == 0
+
+
+def test_single_character_query():
+    index = make_index()
+    total, items = index.search("田")
+    assert total == 2
+    assert {item["id"] for item in items} == {1, 3}
+    index.remove(3)
+    assert index.search("花")[0] == 0
+
+
+def test_build_does_not_touch_the_live_index():
+    index = make_index()
+    built = index.build([{"id": 5, "project_id": 14, "member_name": "山田 次郎", "role_title": None}])
+    assert index.search("山田")[0] == 2
+    index.replace_with(built)
+    total, items = index.search("山田")
+    assert total == 1 and items[0]["id"] == 5
+    assert index.max_id == 5
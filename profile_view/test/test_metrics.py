@@ -0,0 +1,44 @@
+import asyncio
+from types import SimpleNamespace
+
+from api.metrics import MetricsMiddleware, RequestMetrics, record_sql
+
+
+async def app(scope, receive, send):
+    # ルーティング後のように scope にルートを設定し、SQL を2回実行したことにする
+    scope["route"] = SimpleNamespace(path="/employees/{id}")
+    record_sql(0.002, 1)
+    record_sql(0.003, 4)
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b'{"id": 1}'})
+
+
+def call(middleware, path="/employees/1"):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": path}
+    asyncio.run(middleware(scope, None, send))
+    return messages
+
+
+def test_server_timing_header_reports_db_time_and_queries():
+    messages = call(MetricsMiddleware(app, RequestMetrics()))
+    headers = dict(messages[0]["headers"])
+    assert b'desc="2 queries, 5 rows"' in headers[b"server-timing"]
+
+
+def test_metrics_are_recorded_per_route_template():
+    metrics = RequestMetrics()
+    middleware = MetricsMiddleware(app, metrics)
+    call(middleware, "/employees/1")
+    call(middleware, "/employees/2")
+
+    text = metrics.render()
+    assert 'http_requests_total{method="GET",route="/employees/{id}",status="200"} 2' in text
+    assert 'http_request_db_statements_bucket{method="GET",route="/employees/{id}",le="2"} 2' in text
+    assert 'http_request_db_rows_total{method="GET",route="/employees/{id}"} 10' in text
+    assert 'http_response_size_bytes_sum{method="GET",route="/employees/{id}"} 18' in text
+
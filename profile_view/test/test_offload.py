@@ -0,0 +1,43 @@
+import asyncio
+import threading
+import time
+from contextvars import ContextVar
+
+from api.offload import LoopLagMonitor, run_blocking, run_blocking_for
+
+user: ContextVar[str | None] = ContextVar("user", default=None)
+
+
+def test_run_blocking_uses_pool_and_keeps_context():
+    async def run():
+        user.set("yamada")
+        return await run_blocking(lambda: (user.get(), threading.current_thread().name))
+
+    value, thread_name = asyncio.run(run())
+    assert value == "yamada"
+    assert thread_name.startswith("offload")
+
+
+def test_run_blocking_for_small_counts_runs_inline():
+    async def run():
+        return await run_blocking_for(1, lambda: threading.current_thread().name)
+
+    assert asyncio.run(run()) == threading.current_thread().name
+
+
+def test_monitor_reports_stall_with_route():
+    monitor = LoopLagMonitor(interval=0.01, threshold=0.05)
+
+    async def run():
+        await monitor.start()
+        await asyncio.sleep(0.03)
+        monitor.active[asyncio.current_task()] = {"type": "http", "method": "GET", "path": "/private_info/"}
+        time.sleep(0.2)
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+    asyncio.run(run())
+    metrics = monitor.metrics()
+    assert metrics["stalls"] >= 1
+    assert metrics["max_lag_ms"] >= 100
+    assert "GET /private_info/" in metrics["by_route"]
@@ -0,0 +1,48 @@
+from types import SimpleNamespace as Row
+
+from api.search.people_index import PeopleSearchIndex
+
+
+def make_index():
+    index = PeopleSearchIndex()
+    index.rebuild([
+        ("employees", Row(id=1, employee_id=101, name="山田 太郎", kana="やまだ たろう", hometown="大阪", university="京都大学")),
+        ("employees", Row(id=2, employee_id=102, name="佐藤 花子", kana="さとう はなこ", hometown="東京", university="京都大学")),
+        ("employees", Row(id=3, employee_id=103, name="鈴木 一郎", kana="すずき いちろう", hometown="大阪", university="大阪大学")),
+        ("skill_info", Row(id=11, employee_id=101, skill="Python, Kubernetes")),
+        ("skill_info", Row(id=12, employee_id=102, skill="Java")),
+        ("private_info", Row(id=21, employee_id=101, hobbies="テニス・キャンプ", mbti="INTJ", blood_type="A")),
+        ("private_info", Row(id=23, employee_id=103, hobbies="てにす", mbti="ENFP", blood_type="O")),
+    ])
+    return index
+
+
+def test_search_ranks_and_reports_matched_fields():
+    total, items, _ = make_index().search("kubernetes")
+    assert total == 1
+    assert items[0]["id"] == 1
+    assert items[0]["matched_fields"] == ["skill_info.skill"]
+
+
+def test_search_is_and_across_tables_and_normalizes_kana():
+    index = make_index()
+    total, items, _ = index.search("大阪 テニス")
+    assert total == 2
+    assert {item["employee_id"] for item in items} == {101, 103}
+
+
+def test_facets_filter_and_count():
+    total, items, facets = make_index().search("", filters={"university": "京都大学"})
+    assert total == 2
+    assert facets["hometown"] == [{"value": "大阪", "count": 1}, {"value": "東京", "count": 1}]
+    assert facets["mbti"] == [{"value": "INTJ", "count": 1}]
+
+
+def test_apply_write_updates_index_incrementally():
+    index = make_index()
+    index.apply_write("skill_info", "update", Row(id=12, employee_id=102, skill="Go, Kubernetes"))
+    assert index.search("java")[0] == 0
+    assert index.search("kubernetes")[0] == 2
+
+    index.apply_write("employees", "delete", Row(id=1, employee_id=101))
+    assert index.search("kubernetes")[0] == 1
@@ -0,0 +1,52 @@
+import asyncio
+from types import SimpleNamespace
+
+from api.profile_formats import CSV_COLUMNS, iter_profile_records, profile_to_csv_row
+
+
+def parse(body: bytes, format: str, chunk_size: int):
+    async def chunks():
+        for start in range(0, len(body), chunk_size):
+            yield body[start:start + chunk_size]
+
+    async def collect():
+        return [record async for record in iter_profile_records(chunks(), format)]
+
+    return asyncio.run(collect())
+
+
+def test_csv_records_split_across_chunks_keep_quoted_newlines_and_line_numbers():
+    body = (
+        "﻿employee.employee_id,employee.name,employee.kana,employee.birthdate,private_info.hobbies\n"
+        '1,"山田\n太郎",やまだ,1990-01-01,"釣り,""読書"""\n'
+        "2,佐藤,さとう,not-a-date,\n"
+        "\n"
+        "3,鈴木,すずき,1991-02-03,\n"
+    ).encode("utf-8")
+
+    for chunk_size in (1, 5, len(body)):
+        records = parse(body, "csv", chunk_size)
+        assert [line for line, _ in records] == [2, 4, 6]
+        first, errors, last = (record for _, record in records)
+        assert first.employee.name == "山田\n太郎"
+        assert first.private_info.hobbies == '釣り,"読書"'
+        assert errors[0]["loc"] == "employee.birthdate"
+        assert last.private_info is None
+
+
+def test_ndjson_errors_and_csv_export_columns():
+    body = b'{"employee":{"employee_id":5,"name":"a","kana":"b","birthdate":"2000-01-01"}}\n{oops\n'
+    (line, record), (bad_line, errors) = parse(body, "ndjson", 7)
+    assert (line, record.employee.employee_id) == (1, 5)
+    assert bad_line == 2 and errors[0]["message"].startswith("Invalid JSON")
+
+    row = profile_to_csv_row({"employee": SimpleNamespace(employee_id=5, name="a"), "skill_info": None})
+    assert len(row) == len(CSV_COLUMNS)
+    assert row[CSV_COLUMNS.index("employee.employee_id")] == 5
+    assert row[CSV_COLUMNS.index("skill_info.skill")] == ""
+
+
+def test_values_longer_than_the_column_are_row_errors():
+    body = ('{"employee":{"employee_id":6,"name":"' + "あ" * 101 + '"}}\n').encode("utf-8")
+    ((line, errors),) = parse(body, "ndjson", len(body))
+    assert line == 1 and errors[0]["loc"] == "employee.name"
@@ -0,0 +1,49 @@
+import asyncio
+import io
+
+import pytest
+
+from api.blob_backend import FileSystemBlobBackend
+from api.renditions import RenditionRegistry, RenditionWorker, rendition_name
+
+
+def test_rendition_name_uses_size_and_format():
+    assert rendition_name("photo.png", "thumb", "webp") == "renditions/thumb/photo.png.webp"
+    assert rendition_name("photo.png", "small", "jpeg") == "renditions/small/photo.png.jpg"
+    # 拡張子だけが違う元画像の縮小版は別の名前になる
+    assert rendition_name("photo.jpg", "thumb", "webp") != rendition_name("photo.png", "thumb", "webp")
+
+
+def test_filesystem_backend_rejects_path_traversal(tmp_path):
+    backend = FileSystemBlobBackend(str(tmp_path))
+    with pytest.raises(ValueError):
+        backend.path("../outside.png")
+
+
+def test_worker_renders_all_sizes(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+
+    backend = FileSystemBlobBackend(str(tmp_path))
+    registry = RenditionRegistry(lambda: backend)
+    worker = RenditionWorker(lambda: backend, registry, sizes={"thumb": 16, "small": 64}, fmt="jpeg")
+    completed = []
+
+    async def on_complete():
+        completed.append(True)
+
+    async def run():
+        source = io.BytesIO()
+        Image.new("RGB", (200, 100), "red").save(source, "PNG")
+        await backend.upload("photo.png", source.getvalue())
+
+        await worker.start()
+        assert worker.enqueue("photo.png", on_complete=on_complete)
+        await worker.stop()
+
+    asyncio.run(run())
+
+    with Image.open(tmp_path / "renditions" / "thumb" / "photo.png.jpg") as thumb:
+        assert thumb.size == (16, 8)
+    assert registry.has("renditions/small/photo.png.jpg")
+    assert completed == [True]
+    assert worker.metrics()["processed"] == 1
@@ -0,0 +1,88 @@
+import asyncio
+
+from api.response_cache import MemoryCacheBackend, RedisCacheBackend, ResponseCache
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def incr(self, key):
+        # Redis と同様に文字列として保存し、整数を返す
+        value = int(self.data.get(key, 0)) + 1
+        self.data[key] = str(value)
+        return value
+
+
+def check_invalidation(cache):
+    async def scenario():
+        generation = await cache.generation("employees")
+        await cache.set_item("employees", 1, {"id": 1, "name": "a"}, generation)
+        await cache.set_query("employees", "limit=10", {"items": [{"id": 1}]}, generation)
+        assert await cache.get_item("employees", 1) == {"id": 1, "name": "a"}
+        assert await cache.get_query("employees", "limit=10", generation) == {"items": [{"id": 1}]}
+
+        await cache.invalidate("employees", 1)
+        generation = await cache.generation("employees")
+        assert await cache.get_item("employees", 1) is None
+        assert await cache.get_query("employees", "limit=10", generation) is None
+
+    asyncio.run(scenario())
+
+
+def test_memory_backend_invalidation():
+    check_invalidation(ResponseCache(MemoryCacheBackend()))
+
+
+def test_redis_backend_invalidation_with_fake_client():
+    check_invalidation(ResponseCache(RedisCacheBackend(FakeRedis())))
+
+
+def test_memory_backend_ttl():
+    cache = ResponseCache(MemoryCacheBackend(), ttl_seconds=0)
+
+    async def scenario():
+        await cache.set_item("employees", 1, {"id": 1}, 0)
+        assert await cache.get_item("employees", 1) is None
+
+    asyncio.run(scenario())
+
+
+def test_write_during_fetch_is_not_cached():
+    cache = ResponseCache(MemoryCacheBackend())
+
+    async def scenario():
+        # DB から読む前に世代を取得し、読んでいる間に書き込みがあった場合
+        generation = await cache.generation("employees")
+        await cache.invalidate("employees", 1)
+        await cache.set_item("employees", 1, {"id": 1, "name": "old"}, generation)
+        await cache.set_query("employees", "limit=10", {"items": ["old"]}, generation)
+
+        generation = await cache.generation("employees")
+        assert await cache.get_item("employees", 1) is None
+        assert await cache.get_query("employees", "limit=10", generation) is None
+
+    asyncio.run(scenario())
+
+
+def test_memory_backend_keeps_generation_counters():
+    cache = ResponseCache(MemoryCacheBackend(maxsize=2))
+
+    async def scenario():
+        await cache.invalidate("employees")
+        for i in range(5):
+            await cache.set_query("employees", f"limit={i}", {"items": []}, 1)
+        # LRU で値が追い出されても、世代カウンタは残る
+        assert await cache.generation("employees") == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,50 @@
+import asyncio
+
+from api.sas_signer import SasUrlSigner
+
+
+def make_signer(**kwargs):
+    calls = []
+
+    def sign(blob_name):
+        calls.append(blob_name)
+        return f"https://example/{blob_name}?sig"
+
+    return SasUrlSigner(sign, **kwargs), calls
+
+
+def test_sign_is_cached_per_blob_name():
+    signer, calls = make_signer()
+    assert signer.sign("a.png") == "https://example/a.png?sig"
+    assert signer.sign("a.png") == "https://example/a.png?sig"
+    assert signer.sign("") == ""
+    assert calls == ["a.png"]
+    assert signer.metrics()["hits"] == 1
+
+
+def test_sign_many_keeps_order_and_signs_duplicates_once():
+    signer, calls = make_signer()
+    urls = signer.sign_many(["b.png", "", "a.png", "b.png"])
+    assert urls == ["https://example/b.png?sig", "", "https://example/a.png?sig", "https://example/b.png?sig"]
+    assert calls == ["b.png", "a.png"]
+
+
+def test_lru_eviction_and_ttl_expiry():
+    signer, calls = make_signer(maxsize=2)
+    signer.sign_many(["a", "b", "c"])
+    signer.sign("a")
+    assert calls == ["a", "b", "c", "a"]
+
+    signer, calls = make_signer(ttl_seconds=0)
+    signer.sign("a")
+    signer.sign("a")
+    assert calls == ["a", "a"]
+
+
+def test_sign_many_async_offloads_large_batches():
+    signer, calls = make_signer(offload_threshold=2)
+    urls = asyncio.run(signer.sign_many_async(["a", "b", "c"]))
+    assert len(urls) == 3
+    assert signer.metrics()["offloaded_batches"] == 1
+    asyncio.run(signer.sign_many_async(["a", "b", "c"]))
+    assert signer.metrics()["offloaded_batches"] == 1
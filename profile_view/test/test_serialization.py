@@ -0,0 +1,30 @@
+import datetime
+import json
+from types import SimpleNamespace
+
+from api.schemas import EmployeeOut, ProfileOut
+from api.serialization import dump_rows, plain_fields, row_to_dict
+
+
+def test_rows_match_pydantic_output_without_validation():
+    rows = [
+        SimpleNamespace(id=1, employee_id=100001, name="山田 太郎", kana=None, birthdate=datetime.date(1990, 4, 1)),
+        SimpleNamespace(id=2, employee_id=100002, name="佐藤 花子", kana="さとう はなこ", birthdate=None, photo_url="x"),
+    ]
+    expected = [
+        EmployeeOut.model_validate(row, from_attributes=True).model_dump(mode="json", exclude_unset=True)
+        for row in rows
+    ]
+    assert json.loads(dump_rows(EmployeeOut, rows)) == expected
+    assert plain_fields(ProfileOut) is None
+
+
+def test_nested_schema_falls_back_to_pydantic():
+    employee = SimpleNamespace(id=1, employee_id=100001, name="山田 太郎")
+    profile = {
+        "employee": employee,
+        "seminar_videos": [],
+        "employee_skills": [],
+        "employee_projects": [],
+    }
+    assert row_to_dict(ProfileOut, profile)["employee"] == {"id": 1, "employee_id": 100001, "name": "山田 太郎"}
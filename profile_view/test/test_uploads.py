@@ -0,0 +1,66 @@
+import asyncio
+import base64
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from api.blob_backend import FileSystemBlobBackend
+from api.uploads import UploadIncomplete, UploadSessionManager
+
+
+def manager(backend, block_size=4):
+    return UploadSessionManager(
+        lambda: backend,
+        lambda name, expires_on: f"https://blob.example/c/{name}?sig=1",
+        lambda name: f"https://blob.example/c/{name}",
+        lambda: b"secret",
+        block_size=block_size,
+    )
+
+
+def test_resumed_upload_commits_blocks_in_order(tmp_path):
+    backend = FileSystemBlobBackend(str(tmp_path))
+    uploads = manager(backend)
+    data = b"0123456789"
+
+    async def put(grant):
+        # ブラウザの Put Block の代わりに、URL の blockid でバックエンドに直接書き込む
+        block_id = base64.b64decode(parse_qs(urlsplit(grant["url"]).query)["blockid"][0]).decode()
+        await backend.stage_block("video.mp4", block_id, data[grant["offset"]:grant["offset"] + grant["length"]])
+
+    async def run():
+        session = uploads.create("video.mp4", len(data), "video/mp4")
+        upload_id = uploads.encode(session)
+        first = uploads.describe(upload_id, session, set())
+        assert [(g["offset"], g["length"]) for g in first["grants"]] == [(0, 4), (4, 4), (8, 2)]
+
+        await put(first["grants"][2])
+        with pytest.raises(UploadIncomplete) as incomplete:
+            await uploads.commit(uploads.decode(upload_id))
+        assert incomplete.value.missing == [0, 1]
+
+        # 再開: 届いていないブロックの URL だけを受け取り直す
+        staged = await uploads.staged_blocks(session)
+        resumed = uploads.describe(upload_id, session, staged)
+        assert resumed["stagedBlocks"] == [2] and [g["index"] for g in resumed["grants"]] == [0, 1]
+        await asyncio.gather(*(put(grant) for grant in resumed["grants"]))
+        await uploads.commit(session)
+        # 確定のやり直しも同じ内容になる
+        await uploads.commit(session)
+        return await backend.download("video.mp4"), await backend.list_names()
+
+    content, names = asyncio.run(run())
+    assert content == data
+    assert names == ["video.mp4"]
+
+
+def test_upload_id_is_signed_and_validated(tmp_path):
+    uploads = manager(FileSystemBlobBackend(str(tmp_path)))
+    upload_id = uploads.encode(uploads.create("a.mp4", 10))
+    assert uploads.decode(upload_id).size == 10
+    payload, _, signature = upload_id.partition(".")
+    with pytest.raises(LookupError):
+        uploads.decode(payload[:-2] + "xx." + signature)
+    for name, size in (("../a.mp4", 10), ("a.mp4", 0)):
+        with pytest.raises(ValueError):
+            uploads.create(name, size)
@@ -15,4 +15,23 @@ export interface ProjectInfo {
 export interface ProjectManagementResponse {
   project_members: ProjectMember[];
   projects: ProjectInfo[];
-}
\ No newline at end of file
+}
+export interface ProjectTeammate {
+  id: number;
+  member_name: string;
+  role_title?: string;
+  employee_id?: number; // プロフィールの社員番号（一致する社員がいなければ null）
+}
+
+export interface EmployeeProject extends ProjectInfo {
+  code?: string;
+  client_name?: string;
+  role_title?: string;         // 本人の役割
+  members: ProjectTeammate[];  // 本人を含むメンバー
+}
+
+export interface EmployeeProjectsResponse {
+  employee_id: number;
+  name: string;
+  projects: EmployeeProject[];
+}